@@ -0,0 +1,50 @@
+from types import MappingProxyType
+from typing import Annotated
+
+from dependency_injector.wiring import Provide, inject
+from fastapi import Depends, Query
+from fastapi.responses import StreamingResponse
+
+from src.app.api.endpoints.auth import authorize_admin, authorize_admin_responses
+from src.app.api.schemas.export import ExportEntity, ExportFormat
+from src.app.services.export import ExportService
+from src.app.system.mdw_fastapi.api.docs import openapi
+from src.app.system.mdw_fastapi.api.route import statements_budget
+from src.app.system.resources import ApplicationContainer
+
+_MEDIA_TYPES = MappingProxyType({
+    ExportFormat.ndjson: 'application/x-ndjson',
+    ExportFormat.csv: 'text/csv',
+})
+
+
+@statements_budget(3)
+@openapi(
+    response_class=StreamingResponse,
+    dependencies=[Depends(authorize_admin)],
+    responses={
+        **authorize_admin_responses,
+        200: {
+            'description': 'Строки таблицы в порядке возрастания id.',
+            'content': {media_type: {} for media_type in _MEDIA_TYPES.values()},
+        },
+    },
+)
+@inject
+async def export(
+    entity: ExportEntity,
+    export_format: Annotated[ExportFormat, Query(
+        alias='format',
+        description='Формат выгрузки: NDJSON или CSV',
+    )] = ExportFormat.ndjson,
+    after_id: Annotated[int, Query(
+        ge=0,
+        description='Строки с id больше указанного, для продолжения - id последней строки',
+    )] = 0,
+    export_service: ExportService = Depends(Provide[ApplicationContainer.export_service]),
+) -> StreamingResponse:
+    """Выгрузить таблицу пользователей или кредитных карт."""
+    return StreamingResponse(
+        export_service.export(entity, export_format, after_id),
+        media_type=_MEDIA_TYPES[export_format],
+    )
@@ -4,7 +4,7 @@ from dependency_injector.wiring import Provide, inject
 from fastapi import Depends
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
 
-from src.app.api.errors import CredentialsError, TokenError, UserNotFoundError
+from src.app.api.errors import AdminAccessError, CredentialsError, TokenError, UserNotFoundError
 from src.app.api.schemas.auth import Token
 from src.app.external.db.models import UserModel
 from src.app.services.security import SecurityService
@@ -54,3 +54,20 @@ async def authorize(
     if not user:
         raise UserNotFoundError()
     return user
+
+
+authorize_admin_responses = {
+    **authorize_responses,
+    **AdminAccessError().response_schema,
+}
+
+
+@inject
+async def authorize_admin(
+    user: UserModel = Depends(authorize),
+    security_service: SecurityService = Depends(Provide[ApplicationContainer.security]),
+) -> UserModel:
+    """Аутентификация администратора: пользователь должен быть в списке admin.emails."""
+    if not security_service.is_admin(user.email):
+        raise AdminAccessError()
+    return user
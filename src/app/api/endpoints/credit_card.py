@@ -17,11 +17,13 @@ from src.app.api.schemas.common import ResponseMsg
 from src.app.external.db.models import CreditCardModel, UserModel
 from src.app.services.credit_cards import CreditCardService
 from src.app.system.mdw_fastapi.api.docs import openapi
+from src.app.system.mdw_fastapi.api.route import statements_budget
 from src.app.system.resources import ApplicationContainer
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl='auth/access_token')
 
 
+@statements_budget(6)
 @openapi(
     response_model=cc_schemas.CreditCard,
     responses={
@@ -45,9 +47,7 @@ async def add_card(
     if user.credit_card:
         raise CreditCardAlreadyExistError()
 
-    limit = credit_card_service.get_limit(requested_limit, user)
-
-    return await credit_card_service.add(limit=limit, user_id=user.id)
+    return await credit_card_service.issue(requested_limit, user)
 
 
 get_current_card_responses = {
@@ -56,6 +56,7 @@ get_current_card_responses = {
 }
 
 
+@statements_budget(3)
 @openapi(
     response_model=cc_schemas.CreditCard,
     responses={
@@ -72,6 +73,7 @@ async def get_current_card(
     return user.credit_card
 
 
+@statements_budget(6)
 @openapi(
     response_model=cc_schemas.CreditCard,
     responses={
@@ -100,21 +102,14 @@ async def increase_limit(
     Depends(Provide[ApplicationContainer.credit_card_service]),
 ):
     """Увеличить лимит по текущей карте."""
-    if not current_card.active:
-        raise CreditCardNotActiveError()
-    if current_card.limit >= requested_limit:
-        raise CreditCardSmallLimitError()
-
-    limit = credit_card_service.get_limit(requested_limit, user)
-    if current_card.limit >= limit:
-        raise CreditCardCantIncreaseLimitError()
-
-    return await credit_card_service.update_limit(
-        limit=limit,
+    return await credit_card_service.increase_limit(
+        requested_limit,
+        user=user,
         credit_card_db=current_card,
     )
 
 
+@statements_budget(6)
 @openapi(
     responses={
         **get_current_card_responses,
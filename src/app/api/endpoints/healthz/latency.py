@@ -0,0 +1,37 @@
+from src.app.api.schemas.latency import LatencyReport, OperationLatency
+from src.app.system.mdw_prometheus_metrics import global_registry
+
+# Поле ответа и уровень квантиля
+_QUANTILES = (
+    ('p50', 0.5),
+    ('p90', 0.9),
+    ('p99', 0.99),
+    ('p999', 0.999),
+)
+
+
+def _operation_latency(
+    kind: str,
+    operation: str,
+    count: int,
+    quantiles: dict[float, float | None],
+) -> OperationLatency:
+    return OperationLatency(
+        kind=kind,
+        operation=operation,
+        count=count,
+        **{name: quantiles[level] for name, level in _QUANTILES},
+    )
+
+
+async def get_latency() -> LatencyReport:
+    """Квантили задержек запросов по операциям за скользящее окно.
+
+    Считаются в текущем процессе: при нескольких воркерах каждый отвечает своими значениями.
+    """
+    sketches = global_registry().latency_sketches
+    levels = [level for _, level in _QUANTILES]
+    return LatencyReport(
+        window=sketches.window,
+        operations=[_operation_latency(*row) for row in sketches.quantiles(levels)],
+    )
@@ -1,12 +1,17 @@
 from enum import Enum
+from functools import partial
 from http import HTTPStatus
-from typing import Optional
+from typing import Callable, Optional
 
-import prometheus_client
 from dependency_injector.wiring import Provide, inject
-from fastapi import BackgroundTasks, Depends, Response
+from fastapi import BackgroundTasks, Depends, HTTPException, Request, Response
 
-from src.app.system.mdw_prometheus_metrics import global_analytics_registry, global_registry
+from src.app.system.mdw_prometheus_metrics import (
+    global_analytics_registry,
+    global_registry,
+    multiprocess,
+)
+from src.app.system.mdw_prometheus_metrics.exposition import MetricsExposition
 from src.app.system.mdw_prometheus_metrics.service.external import ExternalComponentsChecker
 from src.app.system.resources import ApplicationContainer
 
@@ -19,32 +24,61 @@ class MetricsGet(Enum):
     health = 'health'
 
 
+def _metrics_export(
+    metrics_type: MetricsGet,
+    reset: bool,
+) -> Callable[[multiprocess.Encoder], bytes]:
+    """Выгрузка метрик типа metrics_type, с reset - со сбросом в момент выгрузки."""
+    metrics_facade = global_registry()
+    if metrics_type == MetricsGet.analytics:
+        return partial(multiprocess.generate_latest, global_analytics_registry(), 'analytics')
+    if metrics_type == MetricsGet.health:
+        if reset:
+            return metrics_facade.snapshot_health_metrics
+        return metrics_facade.export_health_metrics
+    if reset:
+        return metrics_facade.snapshot_activity_metrics
+    return metrics_facade.export_activity_metrics
+
+
 @inject
 async def get_metrics(
     type: MetricsGet,  # noqa: WPS125 API
+    request: Request,
     background_tasks: BackgroundTasks,
+    reset: bool = False,
     components: ExternalComponentsChecker =
     Depends(Provide[ApplicationContainer.components_checker]),
+    exposition: MetricsExposition = Depends(Provide[ApplicationContainer.metrics_exposition]),
 ):
-    """Возвращает метрики в формате Prometheus.
+    """Возвращает метрики в формате Prometheus или OpenMetrics (по заголовку Accept).
 
     * activity - метрики активности сервиса
     * health - метрики по состоянию сервиса
     * analytics - кастомные аналитические метрики
+
+    Ответ кэшируется на metrics.exposition_cache_ttl секунд и сжимается, если клиент
+    принимает gzip. С reset=true метрики activity и health сбрасываются в момент выгрузки:
+    следующая выгрузка вернёт только значения, записанные после неё.
     """
+    if reset and type == MetricsGet.analytics:
+        raise HTTPException(
+            status_code=HTTPStatus.BAD_REQUEST,
+            detail='Analytics metrics can not be reset',
+        )
     if type == MetricsGet.health:
         background_tasks.add_task(components.minor_components_status)
-        return Response(
-            content=global_registry().export_health_metrics(),
-        )
-    elif type == MetricsGet.activity:
-        return Response(
-            content=global_registry().export_activity_metrics(),
-        )
-    elif type == MetricsGet.analytics:
-        return Response(
-            content=prometheus_client.generate_latest(global_analytics_registry()),
-        )
+    rendered = exposition.render(
+        type.value,
+        _metrics_export(type, reset),
+        accept=request.headers.get('Accept'),
+        accept_encoding=request.headers.get('Accept-Encoding'),
+        cached=not reset,
+    )
+    headers = {'Content-Type': rendered.content_type, 'Vary': 'Accept, Accept-Encoding'}
+    if rendered.content_encoding is not None:
+        headers['Content-Encoding'] = rendered.content_encoding
+    return Response(content=rendered.body, headers=headers)
 
 
 class MetricsDelete(Enum):
@@ -54,16 +88,21 @@ class MetricsDelete(Enum):
     health = 'health'
 
 
-async def delete_metrics(type: Optional[MetricsDelete] = None):  # noqa: WPS125 API
+@inject
+async def delete_metrics(
+    type: Optional[MetricsDelete] = None,  # noqa: WPS125 API
+    exposition: MetricsExposition = Depends(Provide[ApplicationContainer.metrics_exposition]),
+):
     """Сбрасывает метрики."""
     metrics_facade = global_registry()
+    exposition.clear()
     if type is None:
-        metrics_facade.new_activity_metrics()
-        metrics_facade.new_health_metrics()
+        metrics_facade.reset_activity_metrics()
+        metrics_facade.reset_health_metrics()
         return Response(status_code=int(HTTPStatus.OK))
     elif type == MetricsDelete.health:
-        metrics_facade.new_health_metrics()
+        metrics_facade.reset_health_metrics()
         return Response(status_code=int(HTTPStatus.OK))
     elif type == MetricsDelete.activity:
-        metrics_facade.new_activity_metrics()
+        metrics_facade.reset_activity_metrics()
         return Response(status_code=int(HTTPStatus.OK))
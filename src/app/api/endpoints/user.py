@@ -1,25 +1,49 @@
 from typing import Annotated
 
 from dependency_injector.wiring import Provide, inject
-from fastapi import Depends, File, HTTPException, Response, UploadFile, status
+from fastapi import Depends, File, HTTPException, Query, Response, UploadFile, status
 from fastapi.encoders import jsonable_encoder
 from fastapi.responses import JSONResponse
 from fastapi.security import OAuth2PasswordBearer
 
 from src.app.api.endpoints.auth import authorize, authorize_responses
-from src.app.api.errors import UserAlreadyExistError
+from src.app.api.errors import (
+    PhotoJobNotFoundError,
+    PhotoJobQueueFullError,
+    PhotoTooLargeError,
+    UserAlreadyExistError,
+)
+from src.app.api.schemas import photo_job as photo_job_schemas
 from src.app.api.schemas import user as user_schemas
 from src.app.api.schemas.common import ResponseMsg
 from src.app.external.db.models import UserModel
-from src.app.external.http_errors import HttpClientTimeoutError
+from src.app.external.http_errors import HttpClientTimeoutError, HttpClientUnavailableError
 from src.app.services.photo import PhotoService
+from src.app.services.photo_jobs import PhotoJobService
 from src.app.services.users import UserService
 from src.app.system.mdw_fastapi.api.docs import openapi
+from src.app.system.mdw_fastapi.api.route import statements_budget
 from src.app.system.resources import ApplicationContainer
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl='auth/access_token')
 
+photo_job_responses = {
+    **PhotoJobQueueFullError().response_schema,
+    status.HTTP_202_ACCEPTED: {
+        'model': photo_job_schemas.PhotoJob,
+        'description': 'Фотография принята на фоновую проверку (async=true).',
+    },
+}
+AsyncMode = Annotated[
+    bool,
+    Query(
+        alias='async',
+        description='Проверить фотографию в фоне: вернуть задачу /user/photo_jobs/{job_id}.',
+    ),
+]
+
 
+@statements_budget(3)
 @openapi(
     responses={
         **UserAlreadyExistError().response_schema,
@@ -41,6 +65,7 @@ async def register(
     return ResponseMsg(detail='success')
 
 
+@statements_budget(3)
 @openapi(
     response_model=user_schemas.User,
     responses={
@@ -54,6 +79,7 @@ async def get_user_me(
     return user
 
 
+@statements_budget(4)
 @openapi(
     status_code=status.HTTP_204_NO_CONTENT,
     responses={
@@ -70,11 +96,15 @@ async def update_user(
     return Response(status_code=status.HTTP_204_NO_CONTENT)
 
 
+@statements_budget(4)
 @openapi(
     response_model=ResponseMsg,
     responses={
         **authorize_responses,
         **HttpClientTimeoutError(service_name='PhotoService', timeout=2).response_schema,
+        **HttpClientUnavailableError(service_name='PhotoService').response_schema,
+        **PhotoTooLargeError().response_schema,
+        **photo_job_responses,
         status.HTTP_400_BAD_REQUEST: {
             'model': ResponseMsg,
             'description': 'Ошибка если фотография признаётся невалидной.',
@@ -88,11 +118,15 @@ async def update_user(
 )
 async def document_photo(
     file: Annotated[UploadFile, File(description='Фотография документа')],
+    async_mode: AsyncMode = False,
     user: UserModel = Depends(authorize),
     photo_service: PhotoService = Depends(Provide[ApplicationContainer.photo_service]),
     user_service: UserService = Depends(Provide[ApplicationContainer.user_service]),
+    photo_job_service: PhotoJobService = Depends(Provide[ApplicationContainer.photo_job_service]),
 ):
     """Приложить фотографию документа для проверки."""
+    if async_mode:
+        return await _submit_photo_job(photo_job_service, file, 'doc', user)
     status_photo = await photo_service.validate_photo(photo=file, photo_type='doc')
     await user_service.update_status_doc(status=status_photo, user_db=user)
     if status_photo:
@@ -103,11 +137,15 @@ async def document_photo(
     )
 
 
+@statements_budget(4)
 @openapi(
     response_model=ResponseMsg,
     responses={
         **authorize_responses,
         **HttpClientTimeoutError(service_name='PhotoService', timeout=2).response_schema,
+        **HttpClientUnavailableError(service_name='PhotoService').response_schema,
+        **PhotoTooLargeError().response_schema,
+        **photo_job_responses,
         status.HTTP_400_BAD_REQUEST: {
             'model': ResponseMsg,
             'description': 'Ошибка если фотография признаётся невалидной.',
@@ -121,11 +159,15 @@ async def document_photo(
 )
 async def face_photo(
     file: Annotated[UploadFile, File(description='Фотография лица')],
+    async_mode: AsyncMode = False,
     user: UserModel = Depends(authorize),
     photo_service: PhotoService = Depends(Provide[ApplicationContainer.photo_service]),
     user_service: UserService = Depends(Provide[ApplicationContainer.user_service]),
+    photo_job_service: PhotoJobService = Depends(Provide[ApplicationContainer.photo_job_service]),
 ):
     """Приложить фотографию лица для проверки."""
+    if async_mode:
+        return await _submit_photo_job(photo_job_service, file, 'face', user)
     status_photo = await photo_service.validate_photo(photo=file, photo_type='face')
     await user_service.update_status_face(status=status_photo, user_db=user)
     if status_photo:
@@ -134,3 +176,85 @@ async def face_photo(
         status_code=status.HTTP_400_BAD_REQUEST,
         content=jsonable_encoder(ResponseMsg(detail='not validated')),
     )
+
+
+@statements_budget(4)
+@openapi(
+    response_model=user_schemas.Verification,
+    responses={
+        **authorize_responses,
+        **HttpClientTimeoutError(service_name='PhotoService', timeout=2).response_schema,
+        **HttpClientUnavailableError(service_name='PhotoService').response_schema,
+        **PhotoTooLargeError().response_schema,
+        status.HTTP_400_BAD_REQUEST: {
+            'model': user_schemas.Verification,
+            'description': 'Ошибка если хотя бы одна из фотографий признаётся невалидной.',
+            'content': {
+                'application/json': {
+                    'example': user_schemas.Verification(
+                        status_document=True,
+                        status_face=False,
+                    ).model_dump(),
+                },
+            },
+        },
+    },
+)
+@inject
+async def verification(
+    document: Annotated[UploadFile, File(description='Фотография документа')],
+    face: Annotated[UploadFile, File(description='Фотография лица')],
+    user: UserModel = Depends(authorize),
+    photo_service: PhotoService = Depends(Provide[ApplicationContainer.photo_service]),
+    user_service: UserService = Depends(Provide[ApplicationContainer.user_service]),
+):
+    """Приложить фотографии документа и лица для проверки одним запросом.
+
+    Фотографии проверяются одновременно, оба статуса записываются одним запросом в базу.
+    """
+    status_document, status_face = await photo_service.validate_photos(
+        document=document,
+        face=face,
+    )
+    await user_service.update_statuses(
+        user_db=user,
+        status_document=status_document,
+        status_face=status_face,
+    )
+    result = user_schemas.Verification(status_document=status_document, status_face=status_face)
+    if status_document and status_face:
+        return result
+    return JSONResponse(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        content=jsonable_encoder(result),
+    )
+
+
+@statements_budget(3)
+@openapi(
+    responses={
+        **authorize_responses,
+        **PhotoJobNotFoundError().response_schema,
+    },
+)
+@inject
+async def get_photo_job(
+    job_id: str,
+    user: UserModel = Depends(authorize),
+    photo_job_service: PhotoJobService = Depends(Provide[ApplicationContainer.photo_job_service]),
+) -> photo_job_schemas.PhotoJob:
+    """Получить статус фоновой проверки фотографии."""
+    return photo_job_schemas.PhotoJob.model_validate(photo_job_service.get(job_id, user))
+
+
+async def _submit_photo_job(
+    photo_job_service: PhotoJobService,
+    photo: UploadFile,
+    photo_type: str,
+    user: UserModel,
+) -> JSONResponse:
+    job = await photo_job_service.submit(photo=photo, photo_type=photo_type, user=user)
+    return JSONResponse(
+        status_code=status.HTTP_202_ACCEPTED,
+        content=jsonable_encoder(photo_job_schemas.PhotoJob.model_validate(job)),
+    )
@@ -58,6 +58,13 @@ class TokenError(CustomHTTPException):
     detail: Any = 'Невозможно провалидировать токен.'
 
 
+class AdminAccessError(CustomHTTPException):
+    """Ошибка при обращении к служебной операции без прав администратора."""
+
+    status_code: int = status.HTTP_403_FORBIDDEN
+    detail: Any = 'Операция доступна только администраторам.'
+
+
 class UserNotFoundError(CustomHTTPException):
     """Ошибка при невозможности найти пользователя."""
 
@@ -106,3 +113,30 @@ class UserAlreadyExistError(CustomHTTPException):
 
     status_code: int = status.HTTP_400_BAD_REQUEST
     detail: Any = 'Пользователь с таким адресом электронной почты уже существует.'
+
+
+class PhotoTooLargeError(CustomHTTPException):
+    """Ошибка, когда размер фотографии превышает допустимый."""
+
+    status_code: int = status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+    detail: Any = 'Размер фотографии превышает допустимый.'
+
+    def __init__(self, max_size: int | None = None) -> None:
+        detail = self.detail
+        if max_size is not None:
+            detail = f'Размер фотографии превышает допустимые {max_size} байт.'
+        super().__init__(status_code=self.status_code, detail=detail)
+
+
+class PhotoJobNotFoundError(CustomHTTPException):
+    """Ошибка при невозможности найти задачу на проверку фотографии."""
+
+    status_code: int = status.HTTP_404_NOT_FOUND
+    detail: Any = 'Задача на проверку фотографии не найдена.'
+
+
+class PhotoJobQueueFullError(CustomHTTPException):
+    """Ошибка, когда очередь на проверку фотографий заполнена."""
+
+    status_code: int = status.HTTP_503_SERVICE_UNAVAILABLE
+    detail: Any = 'Очередь на проверку фотографий заполнена, повторите запрос позже.'
@@ -1,7 +1,7 @@
 from fastapi import APIRouter, FastAPI
 
-from src.app.api.endpoints import auth, credit_card, user
-from src.app.api.endpoints.healthz import metrics, ready, up
+from src.app.api.endpoints import admin, auth, credit_card, user
+from src.app.api.endpoints.healthz import latency, metrics, ready, up
 from src.app.system.mdw_fastapi.api.docs import add_delete, add_get, add_patch, add_post
 from src.app.system.mdw_fastapi.api.route import LoggedRoute
 
@@ -13,6 +13,7 @@ def setup_routes(app: FastAPI):
     add_get(monitoring_router, '/ready', ready.get_ready)
     add_get(monitoring_router, '/metrics', metrics.get_metrics)
     add_delete(monitoring_router, '/metrics', metrics.delete_metrics)
+    add_get(monitoring_router, '/latency', latency.get_latency)
     app.include_router(monitoring_router)
 
     auth_router = APIRouter(prefix='/auth', tags=['auth'])
@@ -25,6 +26,8 @@ def setup_routes(app: FastAPI):
     add_patch(user_router, '', user.update_user)
     add_post(user_router, '/document', user.document_photo)
     add_post(user_router, '/face', user.face_photo)
+    add_post(user_router, '/verification', user.verification)
+    add_get(user_router, '/photo_jobs/{job_id}', user.get_photo_job)
     app.include_router(user_router)
 
     credit_card_router = APIRouter(
@@ -37,3 +40,7 @@ def setup_routes(app: FastAPI):
     add_get(credit_card_router, '', credit_card.get_current_card)
     add_post(credit_card_router, '/close', credit_card.close_card)
     app.include_router(credit_card_router)
+
+    admin_router = APIRouter(prefix='/admin', tags=['admin'], route_class=LoggedRoute)
+    add_get(admin_router, '/export/{entity}', admin.export)
+    app.include_router(admin_router)
@@ -0,0 +1,11 @@
+import enum
+
+
+class ExportEntity(enum.Enum):
+    user = 'user'
+    credit_card = 'credit_card'
+
+
+class ExportFormat(enum.Enum):
+    ndjson = 'ndjson'
+    csv = 'csv'
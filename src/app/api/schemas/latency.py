@@ -0,0 +1,33 @@
+import enum
+
+from pydantic import BaseModel, Field
+
+
+class LatencyKind(enum.Enum):
+    server = 'server'
+    client = 'client'
+
+
+class OperationLatency(BaseModel):
+    """Квантили задержки операции за окно, в секундах."""
+
+    kind: LatencyKind = Field(
+        description='server - запросы к сервису, client - запросы во внешние сервисы',
+        example=LatencyKind.server,
+    )
+    operation: str = Field(
+        description='Метод и шаблон пути запроса',
+        example='POST /user/document',
+    )
+    count: int = Field(description='Количество запросов за окно', example=120)
+    p50: float = Field(example=0.012)
+    p90: float = Field(example=0.048)
+    p99: float = Field(example=0.2)
+    p999: float = Field(example=0.45)
+
+
+class LatencyReport(BaseModel):
+    """Квантили задержек запросов текущего процесса."""
+
+    window: float = Field(description='Окно, за которое посчитаны квантили, секунд', example=60)
+    operations: list[OperationLatency]
@@ -0,0 +1,34 @@
+import enum
+
+from pydantic import BaseModel, ConfigDict, Field
+
+
+class PhotoJobStatus(enum.Enum):
+    pending = 'pending'
+    processing = 'processing'
+    validated = 'validated'
+    not_validated = 'not_validated'
+    failed = 'failed'
+
+
+class PhotoJob(BaseModel):
+    """Задача на проверку фотографии."""
+
+    model_config = ConfigDict(from_attributes=True)
+
+    id: str = Field(
+        description='Идентификатор задачи',
+        example='0b8e0f5fd3b34a8f9c6c1b3a3b0f1d2e',
+    )
+    photo_type: str = Field(
+        description='Тип фотографии: doc - документ, face - лицо',
+        example='doc',
+    )
+    status: PhotoJobStatus = Field(
+        description='Статус проверки',
+        example=PhotoJobStatus.pending,
+    )
+    detail: str | None = Field(
+        None,
+        description='Описание ошибки, если проверка не удалась',
+    )
@@ -72,3 +72,16 @@ class User(BaseUser):
         description='Предоставлена ли валидная фотография лица.',
         example=False,
     )
+
+
+class Verification(BaseModel):
+    """Результат проверки фотографий документа и лица."""
+
+    status_document: bool = Field(
+        description='Признана ли валидной фотография документа.',
+        example=True,
+    )
+    status_face: bool = Field(
+        description='Признана ли валидной фотография лица.',
+        example=True,
+    )
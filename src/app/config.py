@@ -1,10 +1,15 @@
 from pathlib import Path
-from typing import Type, TypeVar
+from typing import Literal, Type, TypeVar
 
 import yaml
 from pydantic import BaseModel, SecretStr
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
+# Фотография отправляется в сервис проверки частями по 64 КиБ
+_PHOTO_CHUNK_SIZE = 65536
+# Фотографии меньше 256 КиБ отправляются в сервис проверки без уменьшения
+_PREPROCESSING_MIN_SIZE = 262144
+
 
 class ConfigModel(BaseSettings):
     model_config = SettingsConfigDict(env_prefix='CC_', env_nested_delimiter='__')
@@ -25,6 +30,7 @@ class ServiceConfig(BaseModel):
     name: str
     version: str
     port: int
+    workers: int = 1
 
 
 class PostgresConfig(BaseModel):
@@ -50,14 +56,132 @@ class JwtConfig(BaseModel):
     access_token_expire_minutes: int
 
 
+class AdminConfig(BaseModel):
+    emails: list[str] = []
+
+
 class CreditCardConfig(BaseModel):
     exp_date_in_years: int
     default_limit: int
 
 
+class PhotoCacheConfig(BaseModel):
+    enabled: bool = True
+    max_size: int = 10000
+    ttl: float = 600
+
+
+class CircuitBreakerConfig(BaseModel):
+    failure_rate_threshold: float = 0.5
+    slow_call_rate_threshold: float = 0.5
+    slow_call_duration: float = 1.0
+    window_size: int = 20
+    minimum_calls: int = 10
+    open_duration: float = 30
+    half_open_max_calls: int = 3
+
+
+class BulkheadConfig(BaseModel):
+    max_concurrent: int = 20
+    max_wait: float = 0.1
+
+
+class ConnectorConfig(BaseModel):
+    limit: int = 100
+    limit_per_host: int = 20
+    keepalive_timeout: float = 15
+    ttl_dns_cache: int = 300
+
+
+class PhotoPreprocessingConfig(BaseModel):
+    enabled: bool = False
+    workers: int = 2
+    max_side: int = 1600
+    quality: int = 85
+    min_size: int = _PREPROCESSING_MIN_SIZE
+
+
+class RetryConfig(BaseModel):
+    attempts: int = 3
+    backoff_base: float = 0.05
+    backoff_max: float = 1.0
+    deadline: float = 5.0
+    budget_ratio: float = 0.1
+    budget_max_tokens: float = 10
+    hedging: bool = False
+    hedging_quantile: float = 0.95
+    hedging_min_delay: float = 0.05
+    latency_window: int = 200
+
+
 class PhotoServiceConfig(BaseModel):
     url: str
     timeout: float
+    chunk_size: int = _PHOTO_CHUNK_SIZE
+    max_photo_size: int = 10 * 1024 * 1024
+    cache: PhotoCacheConfig = PhotoCacheConfig()
+    circuit_breaker: CircuitBreakerConfig = CircuitBreakerConfig()
+    bulkhead: BulkheadConfig = BulkheadConfig()
+    connector: ConnectorConfig = ConnectorConfig()
+    preprocessing: PhotoPreprocessingConfig = PhotoPreprocessingConfig()
+    retry: RetryConfig = RetryConfig()
+
+
+class PhotoJobsConfig(BaseModel):
+    queue_size: int = 100
+    workers: int = 4
+    job_ttl: float = 3600
+
+
+class StorageConfig(BaseModel):
+    backend: Literal['postgres', 'memory'] = 'postgres'
+
+
+class ExportConfig(BaseModel):
+    yield_per: int = 1000
+
+
+class OutboxConfig(BaseModel):
+    enabled: bool = False
+    batch_size: int = 100
+    poll_interval: float = 1.0
+    publisher: Literal['memory', 'file'] = 'memory'
+    file_path: str = 'outbox_events.jsonl'
+
+
+class RuntimeMonitorConfig(BaseModel):
+    enabled: bool = True
+    interval: float = 0.5
+
+
+class LatencySketchConfig(BaseModel):
+    window: float = 60
+    slots: int = 6
+    relative_accuracy: float = 0.01
+    max_bins: int = 2048
+
+
+class MetricsConfig(BaseModel):
+    max_label_sets: int = 1000
+    multiprocess_dir: str = 'prometheus_multiproc'
+    exposition_cache_ttl: float = 1.0
+    runtime: RuntimeMonitorConfig = RuntimeMonitorConfig()
+    latency: LatencySketchConfig = LatencySketchConfig()
+
+
+class TracingConfig(BaseModel):
+    enabled: bool = False
+    head_sample_rate: float = 1.0
+    slow_threshold: float = 0.5
+    tail_sample_rate: float = 0.1
+    max_spans: int = 256
+    exporter: Literal['memory', 'file', 'otlp'] = 'file'
+    file_path: str = 'traces.jsonl'
+    otlp_url: str = 'http://127.0.0.1:4318/v1/traces'
+    otlp_timeout: float = 5.0
+    batch_size: int = 512
+    flush_interval: float = 1.0
+    max_queue_size: int = 10000
 
 
 class Config(ConfigModel):
@@ -67,8 +191,15 @@ class Config(ConfigModel):
     logging: dict
     postgres: PostgresConfig
     jwt: JwtConfig
+    admin: AdminConfig = AdminConfig()
     credit_card: CreditCardConfig
     photo_service: PhotoServiceConfig
+    photo_jobs: PhotoJobsConfig = PhotoJobsConfig()
+    storage: StorageConfig = StorageConfig()
+    export: ExportConfig = ExportConfig()
+    outbox: OutboxConfig = OutboxConfig()
+    metrics: MetricsConfig = MetricsConfig()
+    tracing: TracingConfig = TracingConfig()
 
 
 TC = TypeVar('TC', bound=ConfigModel)
@@ -13,6 +13,9 @@ from sqlalchemy.ext.asyncio import (
 )
 from sqlalchemy.orm import DeclarativeBase
 
+from app.system.mdw_sqlalchemy.statements import count_statements
+from app.system.mdw_sqlalchemy.timing import time_statements
+
 
 class Base(AsyncAttrs, DeclarativeBase):
     """Базвый класс алхимии."""
@@ -22,6 +25,8 @@ class Database:
 
     def __init__(self, db_url: str) -> None:
         self._engine = create_async_engine(db_url, echo=False)
+        count_statements(self._engine)
+        time_statements(self._engine)
         self._session_factory = async_scoped_session(
             async_sessionmaker(self._engine, expire_on_commit=False),
             current_task,
@@ -1,6 +1,6 @@
 import datetime
 
-from sqlalchemy import ForeignKey
+from sqlalchemy import JSON, ForeignKey, Index, func, text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.api.schemas.common import Sex
@@ -27,8 +27,26 @@ class CreditCardModel(Base):
     __tablename__ = 'credit_card'
 
     id: Mapped[int] = mapped_column(primary_key=True)
-    user_id: Mapped[int] = mapped_column(ForeignKey('user.id'))
+    user_id: Mapped[int] = mapped_column(ForeignKey('user.id'), unique=True, index=True)
     limit: Mapped[int]
     balance: Mapped[int]
     active: Mapped[bool] = mapped_column(default=True)
     exp_date: Mapped[datetime.date]
+
+
+class OutboxEventModel(Base):
+    """Событие, записанное в одной транзакции с изменением данных и ожидающее отправки."""
+
+    __tablename__ = 'outbox_event'
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    event_type: Mapped[str]
+    aggregate_id: Mapped[int]
+    payload: Mapped[dict] = mapped_column(JSON)
+    created_at: Mapped[datetime.datetime] = mapped_column(server_default=func.now())
+    dispatched_at: Mapped[datetime.datetime | None]
+
+    __table_args__ = (
+        # Диспетчер выбирает только неотправленные события
+        Index('ix_outbox_event_pending', 'id', postgresql_where=text('dispatched_at IS NULL')),
+    )
@@ -12,6 +12,14 @@ class HttpClientError(CustomHTTPException):
     detail: Any = 'Неожиданная ошибка при обращении к стороннему сервису.'
 
 
+class HttpClientTransientError(HttpClientError):
+    """Временная ошибка стороннего сервиса, после которой запрос можно повторить."""
+
+
+class HttpClientServerError(HttpClientTransientError):
+    """Сбой на стороне стороннего сервиса: ответ 5xx или обрыв соединения."""
+
+
 class HttpClientTimeoutError(CustomHTTPException):
     """Ошибка истечения таймаута при выполнении HTTP-запроса."""
 
@@ -27,3 +35,16 @@ class HttpClientTimeoutError(CustomHTTPException):
             status_code=self.status_code,
             detail=f'Сервис {service_name} недоступен в течении {timeout} секунд.',
         )
+
+
+class HttpClientUnavailableError(CustomHTTPException):
+    """Сторонний сервис временно недоступен: запросы к нему приостановлены или их слишком много."""
+
+    status_code: int = status.HTTP_503_SERVICE_UNAVAILABLE
+    detail: Any = 'Сторонний сервис временно недоступен.'
+
+    def __init__(self, service_name: str | None = None) -> None:
+        super().__init__(
+            status_code=self.status_code,
+            detail=f'Сервис {service_name} временно недоступен, повторите запрос позже.',
+        )
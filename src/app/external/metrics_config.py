@@ -1,3 +1,4 @@
+import re
 import time
 from http import HTTPStatus
 from types import SimpleNamespace
@@ -5,11 +6,15 @@ from typing import Callable
 
 from aiohttp import (
     ClientSession,
+    TCPConnector,
     TraceConfig,
+    TraceConnectionCreateEndParams,
+    TraceConnectionReuseconnParams,
     TraceRequestEndParams,
     TraceRequestExceptionParams,
     TraceRequestStartParams,
 )
+from yarl import URL
 
 from src.app.system.mdw_prometheus_metrics import global_registry
 from src.app.system.mdw_prometheus_metrics.service.labels import RequestDuration
@@ -28,13 +33,66 @@ MetricsOperationBuilder = Callable[
 ]
 
 
-def simple_metrics_operation_builder(
-    session: ClientSession,
-    trace_config_ctx: MetricsNamespace,
-    params: TraceRequestStartParams,
-) -> str:
-    """Возвращает операцию для записи в метрики, которая состоит из метода запроса и эндпоинта."""
-    return f'{params.method} {params.url}'
+# Операция запросов, для которых не зарегистрирован шаблон
+UNMATCHED_OPERATION = 'unmatched'
+_PATH_PARAM = re.compile(r'{(\w+)}')
+
+# Шаблоны операций по методу и адресу сервиса: регулярное выражение пути и операция
+_TemplateKey = tuple[str, str]
+_Template = tuple[re.Pattern, str]
+
+
+def _path_pattern(path: str) -> re.Pattern:
+    """Регулярное выражение пути: параметры пути совпадают с любым сегментом."""
+    # После split на чётных местах текст пути, на нечётных - имена параметров
+    parts = _PATH_PARAM.split(path)
+    return re.compile(''.join(
+        '[^/]+' if index % 2 else re.escape(part)
+        for index, part in enumerate(parts)
+    ))
+
+
+class OperationTemplates:
+    """Шаблоны операций исходящих запросов для лейбла operation метрик.
+
+    Операция состоит из метода, адреса сервиса и шаблона пути, например
+    GET http://127.0.0.1:8001/users/{user_id}. Query-параметры и значения параметров пути
+    в неё не попадают, поэтому число серий метрик ограничено числом шаблонов.
+    """
+
+    def __init__(self):
+        self._templates: dict[_TemplateKey, list[_Template]] = {}
+
+    def __call__(
+        self,
+        session: ClientSession,
+        trace_config_ctx: MetricsNamespace,
+        params: TraceRequestStartParams,
+    ) -> str:
+        """MetricsOperationBuilder: операция по первому подходящему шаблону."""
+        method = params.method.upper()
+        key = (method, str(params.url.origin()))
+        templates = self._templates.get(key, ())
+        for pattern, operation in templates:
+            if pattern.fullmatch(params.url.path):
+                return operation
+        return f'{method} {UNMATCHED_OPERATION}'
+
+    def add(self, base_url: str, method: str, path: str) -> None:
+        """Регистрирует шаблон path, параметры пути задаются как в FastAPI: /users/{user_id}."""
+        method = method.upper()
+        origin = URL(base_url).origin()
+        templates = self._templates.setdefault((method, str(origin)), [])
+        operation = f'{method} {origin}{path}'
+        templates.append((_path_pattern(path), operation))
+
+
+def _write_pool_usage(session: ClientSession) -> None:
+    connector = session.connector
+    # Публичного счётчика занятых соединений у aiohttp нет: без него метрика не пишется
+    acquired = getattr(connector, '_acquired', None)
+    if isinstance(connector, TCPConnector) and acquired is not None:
+        global_registry().write_external_pool_usage(len(acquired), connector.limit)
 
 
 def _on_request_start_factory(metrics_operation_builder: MetricsOperationBuilder):
@@ -67,6 +125,7 @@ async def _on_request_end(
         time.monotonic() - trace_config_ctx.mdw_start_time_monotonic,
         request_labels,
     )
+    _write_pool_usage(session)
 
 
 async def _on_request_exception(
@@ -84,6 +143,25 @@ async def _on_request_exception(
         time.monotonic() - trace_config_ctx.mdw_start_time_monotonic,
         request_labels,
     )
+    _write_pool_usage(session)
+
+
+async def _on_connection_create_end(
+    session: ClientSession,
+    trace_config_ctx,
+    params: TraceConnectionCreateEndParams,
+) -> None:
+    global_registry().write_external_connection(reused=False)
+    _write_pool_usage(session)
+
+
+async def _on_connection_reuseconn(
+    session: ClientSession,
+    trace_config_ctx,
+    params: TraceConnectionReuseconnParams,
+) -> None:
+    global_registry().write_external_connection(reused=True)
+    _write_pool_usage(session)
 
 
 def get_metrics_config(metrics_operation_builder: MetricsOperationBuilder) -> TraceConfig:
@@ -100,4 +178,6 @@ def get_metrics_config(metrics_operation_builder: MetricsOperationBuilder) -> Tr
     trace_config.on_request_start.append(_on_request_start_factory(metrics_operation_builder))
     trace_config.on_request_end.append(_on_request_end)
     trace_config.on_request_exception.append(_on_request_exception)
+    trace_config.on_connection_create_end.append(_on_connection_create_end)
+    trace_config.on_connection_reuseconn.append(_on_connection_reuseconn)
     return trace_config
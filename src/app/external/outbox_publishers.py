@@ -0,0 +1,63 @@
+import asyncio
+import json
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Any
+
+from src.app.external.db.models import OutboxEventModel
+
+
+def event_message(event: OutboxEventModel) -> dict[str, Any]:
+    """Сообщение о событии для внешних систем."""
+    return {
+        'id': event.id,
+        'event_type': event.event_type,
+        'aggregate_id': event.aggregate_id,
+        'payload': event.payload,
+        'created_at': event.created_at.isoformat() if event.created_at else None,
+    }
+
+
+class OutboxPublisher(ABC):
+    """Отправка событий outbox во внешнюю систему."""
+
+    component: str
+    destination: str
+
+    @abstractmethod
+    async def publish(self, events: list[OutboxEventModel]) -> None:
+        """Отправляет пачку событий. Исключение означает, что пачку надо отправить повторно."""
+
+
+class InMemoryPublisher(OutboxPublisher):
+    """Копит сообщения в памяти. Для тестов."""
+
+    component = 'memory'
+    destination = 'memory'
+
+    def __init__(self):
+        self.messages: list[dict[str, Any]] = []
+
+    async def publish(self, events: list[OutboxEventModel]) -> None:
+        self.messages.extend(event_message(event) for event in events)
+
+
+class FilePublisher(OutboxPublisher):
+    """Дописывает сообщения в файл, по одному JSON на строку. Для локального запуска."""
+
+    component = 'file'
+
+    def __init__(self, path: str):
+        self._path = Path(path)
+        self.destination = str(self._path)
+
+    async def publish(self, events: list[OutboxEventModel]) -> None:
+        messages = [json.dumps(event_message(event), ensure_ascii=False) for event in events]
+        lines = ''.join(f'{message}\n' for message in messages)
+        await asyncio.to_thread(self._append, lines)
+
+    def _append(self, lines: str) -> None:
+        # Пачка дописывается одной записью без буфера в файл, открытый на дозапись:
+        # строки пачек, которые одновременно отправляют воркеры сервиса, не перемешиваются
+        with self._path.open('ab', buffering=0) as events_file:
+            events_file.write(lines.encode('utf-8'))
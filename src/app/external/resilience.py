@@ -0,0 +1,191 @@
+import asyncio
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from enum import IntEnum
+from typing import AsyncIterator
+
+from src.app.config import BulkheadConfig, CircuitBreakerConfig
+from src.app.external.http_errors import (
+    HttpClientServerError,
+    HttpClientTimeoutError,
+    HttpClientUnavailableError,
+)
+from src.app.system.mdw_prometheus_metrics.service.collector import ServiceCollector
+
+# Ошибки, говорящие о проблемах внешнего сервиса: ответы 5xx, обрыв соединения и таймаут.
+# Ответы 4xx и отмена запроса не учитываются
+_FAILURE_EXCEPTIONS = (HttpClientServerError, HttpClientTimeoutError)
+
+
+class CircuitState(IntEnum):
+    """Состояние автоматического выключателя. Значение экспортируется в метрику."""
+
+    closed = 0
+    half_open = 1
+    open = 2
+
+
+class _CallWindow:
+    """Окно последних вызовов: доли ошибок и медленных вызовов среди них."""
+
+    def __init__(self, config: CircuitBreakerConfig):
+        self._config = config
+        # Последние вызовы: (ошибка, медленный вызов)
+        self._calls: deque[tuple[bool, bool]] = deque(maxlen=config.window_size)
+
+    def add(self, failed: bool, slow: bool) -> bool:
+        """Добавляет вызов в окно. Возвращает True, если выключатель пора разомкнуть."""
+        self._calls.append((failed, slow))
+        if len(self._calls) < self._config.minimum_calls:
+            return False
+        failures = sum(call_failed for call_failed, _ in self._calls)
+        slow_calls = sum(call_slow for _, call_slow in self._calls)
+        if failures >= self._config.failure_rate_threshold * len(self._calls):
+            return True
+        return slow_calls >= self._config.slow_call_rate_threshold * len(self._calls)
+
+    def clear(self) -> None:
+        self._calls.clear()
+
+
+class CircuitBreaker:
+    """Автоматический выключатель запросов во внешний сервис.
+
+    Размыкается, если в окне последних вызовов доля ошибок или медленных вызовов превышает порог.
+    Пока выключатель разомкнут, вызовы сразу завершаются ошибкой. По истечении open_duration
+    пропускается несколько пробных вызовов: если они успешны, выключатель замыкается.
+    """
+
+    def __init__(
+        self,
+        service_name: str,
+        config: CircuitBreakerConfig,
+        metrics: ServiceCollector,
+        failure_exceptions: tuple[type[Exception], ...] = _FAILURE_EXCEPTIONS,
+    ):
+        self._service_name = service_name
+        self._config = config
+        self._metrics = metrics
+        self._failure_exceptions = failure_exceptions
+        self._window = _CallWindow(config)
+        self._state = CircuitState.closed
+        self._opened_at = time.monotonic()
+        self._half_open_calls = 0
+        self._half_open_successes = 0
+
+    @property
+    def state(self) -> CircuitState:
+        if self._state != CircuitState.open:
+            return self._state
+        if time.monotonic() - self._opened_at >= self._config.open_duration:
+            self._set_state(CircuitState.half_open)
+        return self._state
+
+    @asynccontextmanager
+    async def guard(self) -> AsyncIterator[None]:
+        """Пропускает вызов, если выключатель замкнут, и учитывает его результат."""
+        state = self.state
+        self._metrics.write_circuit_breaker_state(self._service_name, int(state))
+        if self._rejects(state):
+            self._metrics.write_resilience_rejection(self._service_name, 'circuit_open')
+            raise HttpClientUnavailableError(service_name=self._service_name)
+
+        is_probe = state == CircuitState.half_open
+        if is_probe:
+            self._half_open_calls += 1
+        start_time = time.monotonic()
+        try:
+            yield
+        except self._failure_exceptions:
+            self._record(failed=True, duration=time.monotonic() - start_time, is_probe=is_probe)
+            raise
+        else:
+            self._record(failed=False, duration=time.monotonic() - start_time, is_probe=is_probe)
+        finally:
+            if is_probe:
+                self._half_open_calls -= 1
+
+    def _rejects(self, state: CircuitState) -> bool:
+        """Вызов отклоняется, если выключатель разомкнут или все пробные вызовы уже заняты."""
+        if state == CircuitState.half_open:
+            return self._half_open_calls >= self._config.half_open_max_calls
+        return state == CircuitState.open
+
+    def _record(self, failed: bool, duration: float, is_probe: bool) -> None:
+        slow = duration >= self._config.slow_call_duration
+        if is_probe:
+            self._record_probe(failed or slow)
+        elif self._state == CircuitState.closed and self._window.add(failed, slow):
+            self._set_state(CircuitState.open)
+
+    def _record_probe(self, failed: bool) -> None:
+        if failed:
+            self._set_state(CircuitState.open)
+            return
+        self._half_open_successes += 1
+        if self._half_open_successes >= self._config.half_open_max_calls:
+            self._set_state(CircuitState.closed)
+
+    def _set_state(self, state: CircuitState) -> None:
+        if state == CircuitState.open:
+            self._opened_at = time.monotonic()
+        self._window.clear()
+        self._state = state
+        self._half_open_successes = 0
+        self._metrics.write_circuit_breaker_state(self._service_name, int(state))
+
+
+class Bulkhead:
+    """Ограничение числа одновременных вызовов внешнего сервиса.
+
+    Если свободного места нет дольше max_wait секунд, вызов завершается ошибкой, а не занимает
+    обработчик запроса на всё время таймаута сервиса.
+    """
+
+    def __init__(self, service_name: str, config: BulkheadConfig, metrics: ServiceCollector):
+        self._service_name = service_name
+        self._max_wait = config.max_wait
+        self._metrics = metrics
+        self._semaphore = asyncio.Semaphore(config.max_concurrent)
+        self._in_use = 0
+
+    @property
+    def in_use(self) -> int:
+        return self._in_use
+
+    @asynccontextmanager
+    async def acquire(self) -> AsyncIterator[None]:
+        if not await self._wait_for_place():
+            self._metrics.write_resilience_rejection(self._service_name, 'bulkhead_full')
+            raise HttpClientUnavailableError(service_name=self._service_name)
+        self._in_use += 1
+        self._metrics.write_bulkhead_in_use(self._service_name, self._in_use)
+        try:
+            yield
+        finally:
+            self._in_use -= 1
+            self._semaphore.release()
+            self._metrics.write_bulkhead_in_use(self._service_name, self._in_use)
+
+    async def _wait_for_place(self) -> bool:
+        """Занимает место, ожидая не дольше max_wait секунд.
+
+        Не использует asyncio.wait_for: в Python 3.10 он может занять место семафора
+        и всё равно завершиться таймаутом или отменой, и место больше не освободится.
+        """
+        waiter = asyncio.ensure_future(self._semaphore.acquire())
+        try:
+            await asyncio.wait((waiter,), timeout=self._max_wait)
+        except asyncio.CancelledError:
+            self._abandon(waiter)
+            raise
+        if waiter.done():
+            return True
+        self._abandon(waiter)
+        return False
+
+    def _abandon(self, waiter: asyncio.Future) -> None:
+        """Отменяет ожидание места. Место, которое ожидание успело занять, освобождается."""
+        if not waiter.cancel() and not waiter.cancelled():
+            self._semaphore.release()
@@ -0,0 +1,168 @@
+import asyncio
+import random
+import time
+from bisect import bisect_left, insort
+from collections import deque
+from contextlib import AsyncExitStack
+from typing import Awaitable, Callable, TypeVar
+
+from src.app.config import RetryConfig
+from src.app.external.http_errors import HttpClientTimeoutError, HttpClientTransientError
+from src.app.system.mdw_prometheus_metrics.service.collector import ServiceCollector
+
+TR = TypeVar('TR')
+
+# Ошибки, после которых повторный запрос может завершиться успешно
+_RETRYABLE_EXCEPTIONS = (HttpClientTransientError, HttpClientTimeoutError)
+# Сколько задержек нужно накопить, прежде чем считать по ним квантиль для хеджирования
+_MIN_LATENCY_SAMPLES = 20
+
+
+class RetryBudget:
+    """Бюджет повторных запросов.
+
+    Каждый исходный запрос добавляет ratio токена, каждый повтор или хедж тратит один.
+    Во время отказа внешнего сервиса повторов не больше ratio от числа исходных запросов.
+    """
+
+    def __init__(self, ratio: float, max_tokens: float):
+        self._ratio = ratio
+        self._max_tokens = max_tokens
+        self._tokens = max_tokens
+
+    def deposit(self) -> None:
+        self._tokens = min(self._max_tokens, self._tokens + self._ratio)
+
+    def try_withdraw(self) -> bool:
+        if self._tokens < 1:
+            return False
+        self._tokens -= 1
+        return True
+
+
+class LatencyTracker:
+    """Задержки последних успешных запросов для расчёта квантиля.
+
+    Окно хранится также отсортированным, поэтому квантиль берётся по индексу без сортировки.
+    """
+
+    def __init__(self, window: int):
+        self._latencies: deque[float] = deque(maxlen=window)
+        self._sorted_latencies: list[float] = []
+
+    def observe(self, latency: float) -> None:
+        if self._latencies and len(self._latencies) == self._latencies.maxlen:
+            evicted = bisect_left(self._sorted_latencies, self._latencies[0])
+            self._sorted_latencies.pop(evicted)
+        self._latencies.append(latency)
+        insort(self._sorted_latencies, latency)
+
+    def quantile(self, level: float) -> float | None:
+        samples = len(self._sorted_latencies)
+        if samples < _MIN_LATENCY_SAMPLES:
+            return None
+        return self._sorted_latencies[min(samples - 1, int(level * samples))]
+
+
+async def _first_success(attempts: set[asyncio.Task]) -> TR:
+    """Результат первой успешной попытки. Если все завершились ошибкой, - ошибка последней."""
+    pending = set(attempts)
+    while True:
+        done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+        succeeded = [task for task in done if task.exception() is None]
+        if succeeded:
+            return succeeded[0].result()
+        if not pending:
+            return done.pop().result()
+
+
+async def _cancel(attempts: set[asyncio.Task]) -> None:
+    """Отменяет оставшиеся попытки и дожидается их завершения."""
+    for task in attempts:
+        task.cancel()
+    await asyncio.gather(*attempts, return_exceptions=True)
+
+
+class RetryPolicy:
+    """Повторы с экспоненциальной задержкой со случайной составляющей и хеджирование запросов.
+
+    Все попытки укладываются в общий deadline. Хеджирование: если ответ не пришёл за время
+    квантиля hedging_quantile задержек, отправляется второй запрос и берётся первый ответ.
+    Повторы и хеджи ограничены общим RetryBudget.
+    """
+
+    def __init__(self, service_name: str, config: RetryConfig, metrics: ServiceCollector):
+        self._service_name = service_name
+        self._config = config
+        self._metrics = metrics
+        self._budget = RetryBudget(config.budget_ratio, config.budget_max_tokens)
+        self._latencies = LatencyTracker(config.latency_window)
+
+    async def call(self, attempt: Callable[[], Awaitable[TR]]) -> TR:
+        """Выполняет attempt, повторяя его при временных ошибках.
+
+        attempt должен быть безопасен для одновременного вызова несколько раз.
+        """
+        self._budget.deposit()
+        try:
+            return await asyncio.wait_for(self._call(attempt), timeout=self._config.deadline)
+        except asyncio.TimeoutError:
+            raise HttpClientTimeoutError(
+                service_name=self._service_name,
+                timeout=self._config.deadline,
+            )
+
+    async def _call(self, attempt: Callable[[], Awaitable[TR]]) -> TR:
+        deadline = time.monotonic() + self._config.deadline
+        for attempt_number in range(self._config.attempts - 1):
+            try:
+                return await self._hedged(attempt)
+            except _RETRYABLE_EXCEPTIONS:
+                delay = self._retry_delay(attempt_number, deadline)
+                if delay is None:
+                    raise
+            self._metrics.write_retry_attempt(self._service_name, 'retry')
+            await asyncio.sleep(delay)
+        # Последняя попытка: её ошибка возвращается без повтора
+        return await self._hedged(attempt)
+
+    async def _hedged(self, attempt: Callable[[], Awaitable[TR]]) -> TR:
+        async with AsyncExitStack() as stack:
+            attempts = {asyncio.create_task(self._timed(attempt))}
+            # Проигравшая попытка отменяется, и её завершение дожидается
+            stack.push_async_callback(_cancel, attempts)
+            hedge_delay = self._hedge_delay()
+            if hedge_delay is not None:
+                done, _ = await asyncio.wait(attempts, timeout=hedge_delay)
+                if not done and self._budget.try_withdraw():
+                    self._metrics.write_retry_attempt(self._service_name, 'hedge')
+                    attempts.add(asyncio.create_task(self._timed(attempt)))
+            return await _first_success(attempts)
+
+    async def _timed(self, attempt: Callable[[], Awaitable[TR]]) -> TR:
+        start_time = time.monotonic()
+        response = await attempt()
+        self._latencies.observe(time.monotonic() - start_time)
+        return response
+
+    def _hedge_delay(self) -> float | None:
+        if not self._config.hedging:
+            return None
+        delay = self._latencies.quantile(self._config.hedging_quantile)
+        if delay is None:
+            return None
+        return max(delay, self._config.hedging_min_delay)
+
+    def _retry_delay(self, attempt_number: int, deadline: float) -> float | None:
+        """Full jitter: случайная задержка от 0 до экспоненциально растущей границы.
+
+        Возвращает None, если повтор не укладывается в deadline или бюджет повторов исчерпан.
+        """
+        cap = min(self._config.backoff_max, self._config.backoff_base * 2 ** attempt_number)
+        delay = random.uniform(0, cap)  # noqa: S311 задержка повтора, а не секрет
+        if time.monotonic() + delay >= deadline:
+            return None
+        if not self._budget.try_withdraw():
+            self._metrics.write_resilience_rejection(self._service_name, 'retry_budget')
+            return None
+        return delay
@@ -0,0 +1,102 @@
+from abc import ABC, abstractmethod
+from contextlib import AbstractAsyncContextManager
+from typing import Any, AsyncIterator
+
+from src.app.external.db.models import CreditCardModel, OutboxEventModel, UserModel
+
+USER_EXPORT_FIELDS = (
+    'id',
+    'email',
+    'full_name',
+    'income',
+    'another_loans',
+    'birth_date',
+    'sex',
+    'status_document',
+    'status_face',
+)
+CREDIT_CARD_EXPORT_FIELDS = ('id', 'user_id', 'limit', 'balance', 'active', 'exp_date')
+
+
+class UserRepository(ABC):
+    """Хранилище пользователей."""
+
+    @abstractmethod
+    async def get_by_email(self, email: str) -> UserModel | None:
+        """Пользователь вместе с его кредитной картой."""
+
+    @abstractmethod
+    async def add(self, user: UserModel) -> UserModel:
+        """Сохраняет нового пользователя."""
+
+    @abstractmethod
+    async def save(self, user: UserModel) -> None:
+        """Сохраняет изменения существующего пользователя."""
+
+    @abstractmethod
+    async def update_statuses(
+        self,
+        user: UserModel,
+        status_document: bool,
+        status_face: bool,
+    ) -> None:
+        """Записывает статусы проверки документа и лица одним запросом."""
+
+
+def credit_card_event(event_type: str, credit_card: CreditCardModel) -> OutboxEventModel:
+    """Событие outbox с текущим состоянием карты."""
+    return OutboxEventModel(
+        event_type=event_type,
+        aggregate_id=credit_card.id,
+        payload={
+            'credit_card_id': credit_card.id,
+            'user_id': credit_card.user_id,
+            'limit': credit_card.limit,
+            'balance': credit_card.balance,
+            'active': credit_card.active,
+            'exp_date': credit_card.exp_date.isoformat(),
+        },
+    )
+
+
+class CreditCardRepository(ABC):
+    """Хранилище кредитных карт.
+
+    Вместе с изменением карты в той же транзакции записывается событие event_type в outbox.
+    """
+
+    @abstractmethod
+    async def add(self, credit_card: CreditCardModel, event_type: str) -> CreditCardModel:
+        """Сохраняет новую карту."""
+
+    @abstractmethod
+    async def save(self, credit_card: CreditCardModel, event_type: str) -> CreditCardModel:
+        """Сохраняет изменения существующей карты."""
+
+
+class OutboxRepository(ABC):
+    """Очередь неотправленных событий."""
+
+    @abstractmethod
+    def claim_batch(self, limit: int) -> AbstractAsyncContextManager[list[OutboxEventModel]]:
+        """Захватывает до limit неотправленных событий в порядке их записи.
+
+        Пока контекст открыт, события не достаются другим диспетчерам. При выходе без
+        исключения события помечаются отправленными, при исключении возвращаются в очередь.
+        """
+
+
+class ExportRepository(ABC):
+    """Чтение таблиц целиком для выгрузки в порядке возрастания id."""
+
+    @abstractmethod
+    def iter_users(self, after_id: int, yield_per: int) -> AsyncIterator[dict[str, Any]]:
+        """Пользователи с id больше after_id, без хеша пароля."""
+
+    @abstractmethod
+    def iter_credit_cards(
+        self,
+        after_id: int,
+        yield_per: int,
+    ) -> AsyncIterator[dict[str, Any]]:
+        """Кредитные карты с id больше after_id."""
@@ -0,0 +1,153 @@
+import asyncio
+import datetime
+from contextlib import asynccontextmanager
+from itertools import count, islice
+from typing import Any, AsyncIterator
+
+from src.app.external.db.models import CreditCardModel, OutboxEventModel, UserModel
+from src.app.repositories.base import (
+    CREDIT_CARD_EXPORT_FIELDS,
+    USER_EXPORT_FIELDS,
+    CreditCardRepository,
+    ExportRepository,
+    OutboxRepository,
+    UserRepository,
+    credit_card_event,
+)
+
+
+class InMemoryStorage:
+    """Данные в памяти процесса, проиндексированные словарями.
+
+    Используется вместо PostgreSQL в нагрузочных тестах HTTP-слоя и сервисов,
+    данные теряются при перезапуске.
+    """
+
+    def __init__(self):
+        self.users: dict[int, UserModel] = {}
+        self.user_id_by_email: dict[str, int] = {}
+        self.credit_cards: dict[int, CreditCardModel] = {}
+        self.credit_card_id_by_user_id: dict[int, int] = {}
+        # Только неотправленные события, в порядке записи
+        self.pending_events: dict[int, OutboxEventModel] = {}
+        self.outbox_lock = asyncio.Lock()
+        self._user_ids = count(1)
+        self._credit_card_ids = count(1)
+        self._event_ids = count(1)
+
+    def next_user_id(self) -> int:
+        return next(self._user_ids)
+
+    def next_credit_card_id(self) -> int:
+        return next(self._credit_card_ids)
+
+    def add_event(self, event: OutboxEventModel) -> None:
+        event.id = next(self._event_ids)
+        event.created_at = datetime.datetime.utcnow()
+        self.pending_events[event.id] = event
+
+
+class InMemoryUserRepository(UserRepository):
+    """Пользователи в памяти процесса."""
+
+    def __init__(self, storage: InMemoryStorage):
+        self._storage = storage
+
+    async def get_by_email(self, email: str) -> UserModel | None:
+        user_id = self._storage.user_id_by_email.get(email)
+        if user_id is None:
+            return None
+        return self._storage.users[user_id]
+
+    async def add(self, user: UserModel) -> UserModel:
+        if user.email in self._storage.user_id_by_email:
+            raise ValueError(f'User with email {user.email} already exists')
+        # Значения по умолчанию, которые для PostgreSQL проставляются при вставке
+        user.id = self._storage.next_user_id()
+        user.status_document = bool(user.status_document)
+        user.status_face = bool(user.status_face)
+        self._storage.users[user.id] = user
+        self._storage.user_id_by_email[user.email] = user.id
+        return user
+
+    async def save(self, user: UserModel) -> None:
+        self._storage.users[user.id] = user
+
+    async def update_statuses(
+        self,
+        user: UserModel,
+        status_document: bool,
+        status_face: bool,
+    ) -> None:
+        user.status_document = status_document
+        user.status_face = status_face
+        self._storage.users[user.id] = user
+
+
+class InMemoryCreditCardRepository(CreditCardRepository):
+    """Кредитные карты в памяти процесса."""
+
+    def __init__(self, storage: InMemoryStorage):
+        self._storage = storage
+
+    async def add(self, credit_card: CreditCardModel, event_type: str) -> CreditCardModel:
+        if credit_card.user_id in self._storage.credit_card_id_by_user_id:
+            raise ValueError(f'User {credit_card.user_id} already has a credit card')
+        credit_card.id = self._storage.next_credit_card_id()
+        if credit_card.active is None:
+            credit_card.active = True
+        self._storage.credit_cards[credit_card.id] = credit_card
+        self._storage.credit_card_id_by_user_id[credit_card.user_id] = credit_card.id
+        user = self._storage.users.get(credit_card.user_id)
+        if user is not None:
+            user.credit_card = credit_card
+        self._storage.add_event(credit_card_event(event_type, credit_card))
+        return credit_card
+
+    async def save(self, credit_card: CreditCardModel, event_type: str) -> CreditCardModel:
+        self._storage.credit_cards[credit_card.id] = credit_card
+        self._storage.add_event(credit_card_event(event_type, credit_card))
+        return credit_card
+
+
+class InMemoryOutboxRepository(OutboxRepository):
+    """Outbox в памяти процесса. Захват пачки сериализуется блокировкой."""
+
+    def __init__(self, storage: InMemoryStorage):
+        self._storage = storage
+
+    @asynccontextmanager
+    async def claim_batch(self, limit: int) -> AsyncIterator[list[OutboxEventModel]]:
+        async with self._storage.outbox_lock:
+            events = list(islice(self._storage.pending_events.values(), limit))
+            yield events
+            dispatched_at = datetime.datetime.utcnow()
+            for event in events:
+                event.dispatched_at = dispatched_at
+                self._storage.pending_events.pop(event.id)
+
+
+class InMemoryExportRepository(ExportRepository):
+    """Выгрузка данных из памяти процесса."""
+
+    def __init__(self, storage: InMemoryStorage):
+        self._storage = storage
+
+    def iter_users(self, after_id: int, yield_per: int) -> AsyncIterator[dict[str, Any]]:
+        return _iter_models(self._storage.users, USER_EXPORT_FIELDS, after_id)
+
+    def iter_credit_cards(
+        self,
+        after_id: int,
+        yield_per: int,
+    ) -> AsyncIterator[dict[str, Any]]:
+        return _iter_models(self._storage.credit_cards, CREDIT_CARD_EXPORT_FIELDS, after_id)
+
+
+async def _iter_models(models_by_id: dict, fields, after_id: int):
+    for model_id in sorted(models_by_id):
+        if model_id <= after_id:
+            continue
+        model = models_by_id.get(model_id)
+        if model is not None:
+            yield {field: getattr(model, field) for field in fields}
@@ -0,0 +1,145 @@
+from contextlib import AbstractAsyncContextManager, asynccontextmanager
+from typing import Any, AsyncIterator, Callable
+
+from sqlalchemy import func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+
+from src.app.external.db.models import CreditCardModel, OutboxEventModel, UserModel
+from src.app.repositories.base import (
+    CREDIT_CARD_EXPORT_FIELDS,
+    USER_EXPORT_FIELDS,
+    CreditCardRepository,
+    ExportRepository,
+    OutboxRepository,
+    UserRepository,
+    credit_card_event,
+)
+
+SessionFactory = Callable[..., AbstractAsyncContextManager[AsyncSession]]
+
+
+class SqlUserRepository(UserRepository):
+    """Пользователи в PostgreSQL."""
+
+    def __init__(self, session_factory: SessionFactory):
+        self.session_factory = session_factory
+
+    async def get_by_email(self, email: str) -> UserModel | None:
+        async with self.session_factory() as session:
+            return await session.scalar(
+                select(UserModel).
+                where(UserModel.email == email).
+                options(selectinload(UserModel.credit_card)),
+            )
+
+    async def add(self, user: UserModel) -> UserModel:
+        async with self.session_factory() as session:
+            async with session.begin():
+                session.add(user)
+            return user
+
+    async def save(self, user: UserModel) -> None:
+        async with self.session_factory() as session:
+            async with session.begin():
+                session.add(user)
+
+    async def update_statuses(
+        self,
+        user: UserModel,
+        status_document: bool,
+        status_face: bool,
+    ) -> None:
+        async with self.session_factory() as session:
+            async with session.begin():
+                await session.execute(
+                    update(UserModel).
+                    where(UserModel.id == user.id).
+                    values(status_document=status_document, status_face=status_face),
+                )
+        user.status_document = status_document
+        user.status_face = status_face
+
+
+class SqlCreditCardRepository(CreditCardRepository):
+    """Кредитные карты в PostgreSQL."""
+
+    def __init__(self, session_factory: SessionFactory):
+        self.session_factory = session_factory
+
+    async def add(self, credit_card: CreditCardModel, event_type: str) -> CreditCardModel:
+        return await self.save(credit_card, event_type)
+
+    async def save(self, credit_card: CreditCardModel, event_type: str) -> CreditCardModel:
+        async with self.session_factory() as session:
+            async with session.begin():
+                session.add(credit_card)
+                # id новой карты нужен для события
+                await session.flush()
+                session.add(credit_card_event(event_type, credit_card))
+            await session.refresh(credit_card)
+            return credit_card
+
+
+class SqlExportRepository(ExportRepository):
+    """Выгрузка таблиц PostgreSQL через серверный курсор.
+
+    Выбираются колонки, а не ORM-объекты: строки не попадают в identity map сессии,
+    и в памяти одновременно находится не больше yield_per строк.
+    """
+
+    def __init__(self, session_factory: SessionFactory):
+        self.session_factory = session_factory
+
+    def iter_users(self, after_id: int, yield_per: int) -> AsyncIterator[dict[str, Any]]:
+        return self._iter_table(UserModel, USER_EXPORT_FIELDS, after_id, yield_per)
+
+    def iter_credit_cards(
+        self,
+        after_id: int,
+        yield_per: int,
+    ) -> AsyncIterator[dict[str, Any]]:
+        return self._iter_table(CreditCardModel, CREDIT_CARD_EXPORT_FIELDS, after_id, yield_per)
+
+    async def _iter_table(self, model, fields, after_id: int, yield_per: int):
+        columns = [model.__table__.c[field] for field in fields]
+        query = (
+            select(*columns).
+            where(model.id > after_id).
+            order_by(model.id).
+            execution_options(yield_per=yield_per)
+        )
+        async with self.session_factory() as session:
+            rows = await session.stream(query)
+            async for row in rows:
+                yield dict(zip(fields, row))
+
+
+class SqlOutboxRepository(OutboxRepository):
+    """Outbox в PostgreSQL.
+
+    События захватываются через SELECT ... FOR UPDATE SKIP LOCKED, поэтому диспетчеры
+    в нескольких репликах разбирают непересекающиеся пачки и не ждут друг друга.
+    """
+
+    def __init__(self, session_factory: SessionFactory):
+        self.session_factory = session_factory
+
+    @asynccontextmanager
+    async def claim_batch(self, limit: int) -> AsyncIterator[list[OutboxEventModel]]:
+        async with self.session_factory() as session:
+            async with session.begin():
+                events = (await session.scalars(
+                    select(OutboxEventModel).
+                    where(OutboxEventModel.dispatched_at.is_(None)).
+                    order_by(OutboxEventModel.id).
+                    limit(limit).
+                    with_for_update(skip_locked=True),
+                )).all()
+                yield list(events)
+                if events:
+                    await session.execute(
+                        update(OutboxEventModel).
+                        where(OutboxEventModel.id.in_([event.id for event in events])).
+                        values(dispatched_at=func.now()),
+                    )
@@ -1,5 +1,6 @@
 import argparse
 import logging
+import os
 import sys
 from functools import partial
 from typing import Callable
@@ -10,9 +11,13 @@ from fastapi import FastAPI
 from src.app.api.routes import setup_routes
 from src.app.config import Config, read_config
 from src.app.system import environment
+from src.app.system.mdw_prometheus_metrics import multiprocess
 from src.app.system.middlewares import setup_middlewares
 from src.app.system.resources import ApplicationContainer, shutdown_event, startup_event
 
+# Путь к конфигу для воркеров uvicorn: каждый воркер создаёт приложение сам
+_CONFIG_PATH_ENV = 'SERVICE_CONFIG_PATH'
+
 
 def prepare_app(config: Config) -> Callable:
     """Настраивает экземпляр FastAPI приложения.
@@ -37,6 +42,10 @@ def prepare_app(config: Config) -> Callable:
             'name': 'credit_card',
             'description': 'Операции по работе с кредитными картами.',
         },
+        {
+            'name': 'admin',
+            'description': 'Служебные операции, доступные администраторам.',
+        },
     ]
 
     app = FastAPI(
@@ -53,6 +62,32 @@ def prepare_app(config: Config) -> Callable:
     return app
 
 
+def create_app() -> FastAPI:
+    """Создаёт приложение в воркере uvicorn по конфигу из переменной окружения."""
+    config = read_config(os.environ[_CONFIG_PATH_ENV], Config)
+    environment.initialize(config)
+    app = prepare_app(config)
+    app.on_event('shutdown')(multiprocess.mark_process_dead)
+    return app
+
+
+def _run_workers(config_path: str, config: Config):
+    """Запускает несколько воркеров uvicorn с общими метриками."""
+    multiprocess.prepare_dir(
+        os.environ.get(multiprocess.MULTIPROC_DIR_ENV) or config.metrics.multiprocess_dir,
+    )
+    os.environ[_CONFIG_PATH_ENV] = config_path
+    uvicorn.run(
+        'src.app.service:create_app',
+        factory=True,
+        workers=config.service.workers,
+        host='0.0.0.0',  # noqa: S104
+        port=config.service.port,
+        access_log=False,
+        log_config=None,
+    )
+
+
 def start():
     """Запускает сервис."""
     ap = argparse.ArgumentParser()
@@ -76,6 +111,10 @@ def start():
     environment.initialize(config)
     logging.info(config.model_dump())
 
+    if config.service.workers > 1:
+        _run_workers(options.config, config)
+        return
+
     uvicorn.run(
         prepare_app(config),
         host='0.0.0.0',  # noqa: S104
@@ -0,0 +1,96 @@
+import prometheus_client
+
+_CARDS_ISSUED_HELP = 'Credit cards issued'
+_CARDS_CLOSED_HELP = 'Credit cards closed'
+_CARD_LIMIT_HELP = 'Requested and granted credit card limits, kopecks'
+_LIMIT_REJECTIONS_HELP = 'Rejected credit card limit increases'
+_VERIFICATIONS_HELP = 'Photo verifications by result'
+_METRICS_PREFIX = 'dp_business'
+# Границы бакетов лимитов в копейках: от минимального лимита до максимально возможного
+_LIMIT_BUCKETS = (
+    20_000_00,
+    30_000_00,
+    50_000_00,
+    75_000_00,
+    100_000_00,
+    150_000_00,
+    200_000_00,
+    500_000_00,
+    float('inf'),
+)
+
+
+class BusinessMetrics:
+    """Бизнес-метрики для дашбордов, экспортируются в /healthz/metrics?type=analytics.
+
+    Обновляются сервисами в момент изменения данных, поэтому для дашбордов не нужны
+    агрегирующие запросы в базу.
+    """
+
+    def __init__(self, service_name: str, registry: prometheus_client.CollectorRegistry):
+        self._service_name = service_name
+        service_label = 'service'
+        self._cards_issued_counter = prometheus_client.Counter(
+            name=f'{_METRICS_PREFIX}_credit_cards_issued',
+            documentation=_CARDS_ISSUED_HELP,
+            labelnames=[service_label],
+            registry=registry,
+        )
+        self._cards_closed_counter = prometheus_client.Counter(
+            name=f'{_METRICS_PREFIX}_credit_cards_closed',
+            documentation=_CARDS_CLOSED_HELP,
+            labelnames=[service_label],
+            registry=registry,
+        )
+        self._card_limit_histogram = prometheus_client.Histogram(
+            name=f'{_METRICS_PREFIX}_credit_card_limit',
+            documentation=_CARD_LIMIT_HELP,
+            labelnames=[service_label, 'operation', 'kind'],
+            registry=registry,
+            buckets=_LIMIT_BUCKETS,
+        )
+        self._limit_rejections_counter = prometheus_client.Counter(
+            name=f'{_METRICS_PREFIX}_credit_card_limit_rejections',
+            documentation=_LIMIT_REJECTIONS_HELP,
+            labelnames=[service_label, 'reason'],
+            registry=registry,
+        )
+        self._verifications_counter = prometheus_client.Counter(
+            name=f'{_METRICS_PREFIX}_photo_verifications',
+            documentation=_VERIFICATIONS_HELP,
+            labelnames=[service_label, 'photo_type', 'result'],
+            registry=registry,
+        )
+
+    def write_card_issued(self, requested_limit: int, limit: int) -> None:
+        self._cards_issued_counter.labels(service=self._service_name).inc()
+        self._write_limits('issue', requested_limit, limit)
+
+    def write_card_closed(self) -> None:
+        self._cards_closed_counter.labels(service=self._service_name).inc()
+
+    def write_limit_increased(self, requested_limit: int, limit: int) -> None:
+        self._write_limits('increase', requested_limit, limit)
+
+    def write_limit_rejection(self, reason: str) -> None:
+        self._limit_rejections_counter.labels(service=self._service_name, reason=reason).inc()
+
+    def write_verification(self, photo_type: str, passed: bool) -> None:
+        """Результат проверки фотографии: доля passed - процент успешных проверок."""
+        self._verifications_counter.labels(
+            service=self._service_name,
+            photo_type=photo_type,
+            result='passed' if passed else 'failed',
+        ).inc()
+
+    def _write_limits(self, operation: str, requested_limit: int, limit: int) -> None:
+        self._card_limit_histogram.labels(
+            service=self._service_name,
+            operation=operation,
+            kind='requested',
+        ).observe(requested_limit)
+        self._card_limit_histogram.labels(
+            service=self._service_name,
+            operation=operation,
+            kind='granted',
+        ).observe(limit)
@@ -1,25 +1,32 @@
 import datetime
-from contextlib import AbstractAsyncContextManager
-from typing import Callable
 
 from dateutil.relativedelta import relativedelta
-from sqlalchemy.ext.asyncio import AsyncSession
 
+from src.app.api.errors import (
+    CreditCardCantIncreaseLimitError,
+    CreditCardNotActiveError,
+    CreditCardSmallLimitError,
+)
 from src.app.api.schemas.common import Sex
 from src.app.external.db.models import CreditCardModel, UserModel
+from src.app.repositories.base import CreditCardRepository
+from src.app.services.analytics import BusinessMetrics
+from src.app.services.outbox import CreditCardEventType
 
 
 class CreditCardService:
 
     def __init__(
         self,
-        session_factory: Callable[..., AbstractAsyncContextManager[AsyncSession]],
+        repository: CreditCardRepository,
         exp_date_in_years: int,
         default_limit: int,
+        metrics: BusinessMetrics,
     ):
-        self.session_factory = session_factory
-        self.exp_date = datetime.datetime.today() + relativedelta(years=exp_date_in_years)
+        self.repository = repository
+        self.exp_date = datetime.date.today() + relativedelta(years=exp_date_in_years)
         self.default_limit = default_limit
+        self.metrics = metrics
 
     def get_limit(
         self,
@@ -63,31 +70,52 @@ class CreditCardService:
 
         return max(min(available_limit, requested_limit), self.default_limit)
 
+    async def issue(self, requested_limit: int, user: UserModel) -> CreditCardModel:
+        """Выпускает карту с лимитом, доступным пользователю."""
+        limit = self.get_limit(requested_limit, user)
+        credit_card = await self.add(limit=limit, user_id=user.id)
+        self.metrics.write_card_issued(requested_limit, limit)
+        return credit_card
+
+    async def increase_limit(
+        self,
+        requested_limit: int,
+        user: UserModel,
+        credit_card_db: CreditCardModel,
+    ) -> CreditCardModel:
+        """Увеличивает лимит карты, если пользователю доступен лимит больше текущего."""
+        if not credit_card_db.active:
+            self.metrics.write_limit_rejection('card_not_active')
+            raise CreditCardNotActiveError()
+        if credit_card_db.limit >= requested_limit:
+            self.metrics.write_limit_rejection('limit_not_greater')
+            raise CreditCardSmallLimitError()
+
+        limit = self.get_limit(requested_limit, user)
+        if credit_card_db.limit >= limit:
+            self.metrics.write_limit_rejection('limit_not_available')
+            raise CreditCardCantIncreaseLimitError()
+
+        credit_card = await self.update_limit(limit=limit, credit_card_db=credit_card_db)
+        self.metrics.write_limit_increased(requested_limit, limit)
+        return credit_card
+
     async def add(self, limit: int, user_id: int) -> CreditCardModel:
-        async with self.session_factory() as session:
-            credit_card = CreditCardModel(
-                limit=limit,
-                balance=limit,
-                exp_date=self.exp_date,
-                user_id=user_id,
-            )
-            async with session.begin():
-                session.add(credit_card)
-            await session.refresh(credit_card)
-            return credit_card
+        credit_card = CreditCardModel(
+            limit=limit,
+            balance=limit,
+            exp_date=self.exp_date,
+            user_id=user_id,
+        )
+        return await self.repository.add(credit_card, CreditCardEventType.issued.value)
 
     async def update_limit(self, limit: int, credit_card_db: CreditCardModel) -> CreditCardModel:
         diff = limit - credit_card_db.limit
         credit_card_db.limit = limit
         credit_card_db.balance += diff
-        async with self.session_factory() as session:
-            async with session.begin():
-                session.add(credit_card_db)
-            await session.refresh(credit_card_db)
-            return credit_card_db
+        return await self.repository.save(credit_card_db, CreditCardEventType.limit_changed.value)
 
     async def close_card(self, credit_card_db: CreditCardModel):
         credit_card_db.active = False
-        async with self.session_factory() as session:
-            async with session.begin():
-                session.add(credit_card_db)
+        await self.repository.save(credit_card_db, CreditCardEventType.closed.value)
+        self.metrics.write_card_closed()
@@ -0,0 +1,86 @@
+import csv
+import datetime
+import enum
+import io
+import json
+from typing import Any, AsyncIterator, Iterable
+
+from src.app.api.schemas.export import ExportEntity, ExportFormat
+from src.app.repositories.base import (
+    CREDIT_CARD_EXPORT_FIELDS,
+    USER_EXPORT_FIELDS,
+    ExportRepository,
+)
+
+
+def _to_primitive(field_value: Any) -> Any:
+    if isinstance(field_value, enum.Enum):
+        return field_value.value
+    if isinstance(field_value, datetime.date):
+        return field_value.isoformat()
+    return field_value
+
+
+class ExportService:
+    """Потоковая выгрузка таблиц в NDJSON или CSV.
+
+    Строки читаются из хранилища по yield_per штук и отдаются клиенту такими же
+    порциями, поэтому память не зависит от объёма выгрузки. Строки упорядочены по id:
+    прерванную выгрузку можно продолжить, передав в after_id последний полученный id.
+    """
+
+    def __init__(self, repository: ExportRepository, yield_per: int):
+        self.repository = repository
+        self.yield_per = yield_per
+
+    def export(
+        self,
+        entity: ExportEntity,
+        export_format: ExportFormat,
+        after_id: int = 0,
+    ) -> AsyncIterator[str]:
+        if entity == ExportEntity.user:
+            fields = USER_EXPORT_FIELDS
+            rows = self.repository.iter_users(after_id, self.yield_per)
+        else:
+            fields = CREDIT_CARD_EXPORT_FIELDS
+            rows = self.repository.iter_credit_cards(after_id, self.yield_per)
+
+        if export_format == ExportFormat.csv:
+            return self._chunked(_csv_lines(rows, fields))
+        return self._chunked(_ndjson_lines(rows))
+
+    async def _chunked(self, lines: AsyncIterator[str]) -> AsyncIterator[str]:
+        chunk = []
+        async for line in lines:
+            chunk.append(line)
+            if len(chunk) >= self.yield_per:
+                yield ''.join(chunk)
+                chunk = []
+        if chunk:
+            yield ''.join(chunk)
+
+
+async def _ndjson_lines(rows: AsyncIterator[dict]) -> AsyncIterator[str]:
+    async for row in rows:
+        yield json.dumps(
+            {field: _to_primitive(field_value) for field, field_value in row.items()},
+            ensure_ascii=False,
+        ) + '\n'
+
+
+async def _csv_lines(rows: AsyncIterator[dict], fields) -> AsyncIterator[str]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    yield _csv_line(writer, buffer, fields)
+    async for row in rows:
+        yield _csv_line(writer, buffer, (_to_primitive(row[field]) for field in fields))
+
+
+def _csv_line(writer, buffer: io.StringIO, row_fields: Iterable[Any]) -> str:
+    """Строка CSV: writer пишет в buffer, который очищается после каждой строки."""
+    writer.writerow(row_fields)
+    line = buffer.getvalue()
+    buffer.seek(0)
+    buffer.truncate(0)
+    return line
@@ -0,0 +1,72 @@
+import asyncio
+import enum
+import logging
+import time
+
+from src.app.external.outbox_publishers import OutboxPublisher
+from src.app.repositories.base import OutboxRepository
+from src.app.system.mdw_prometheus_metrics.service.collector import ServiceCollector
+from src.app.system.mdw_prometheus_metrics.service.labels import MessageBusRequestDuration
+
+
+class CreditCardEventType(enum.Enum):
+    issued = 'credit_card.issued'
+    limit_changed = 'credit_card.limit_changed'
+    closed = 'credit_card.closed'
+
+
+class OutboxDispatcher:
+    """Разбирает outbox пачками и передаёт события в publisher.
+
+    Пачка помечается отправленной только после успешной публикации, поэтому доставка
+    происходит минимум один раз: получатели должны быть готовы к повторам по id события.
+    """
+
+    def __init__(
+        self,
+        repository: OutboxRepository,
+        publisher: OutboxPublisher,
+        metrics: ServiceCollector,
+        batch_size: int,
+        poll_interval: float,
+    ):
+        self._repository = repository
+        self._publisher = publisher
+        self._metrics = metrics
+        self._batch_size = batch_size
+        self._poll_interval = poll_interval
+
+    async def dispatch_batch(self) -> int:
+        """Отправляет одну пачку событий и возвращает её размер."""
+        async with self._repository.claim_batch(self._batch_size) as events:
+            if not events:
+                return 0
+            start_time = time.monotonic()
+            error = False
+            try:
+                await self._publisher.publish(events)
+            except Exception:
+                error = True
+                raise
+            finally:
+                self._metrics.write_message_bus_producer_timing(
+                    time.monotonic() - start_time,
+                    MessageBusRequestDuration(
+                        component=self._publisher.component,
+                        operation='publish_outbox_batch',
+                        message_bus_destination=self._publisher.destination,
+                        error=error,
+                    ),
+                )
+            return len(events)
+
+    async def run(self) -> None:
+        """Разбирает outbox, пока задачу не отменят. Полная пачка - сразу за следующей."""
+        while True:
+            try:
+                dispatched = await self.dispatch_batch()
+            except Exception:
+                logging.exception('Outbox batch dispatch failed')
+                dispatched = 0
+            if dispatched < self._batch_size:
+                await asyncio.sleep(self._poll_interval)
@@ -1,69 +1,218 @@
+import asyncio
+import hashlib
 import logging
-from asyncio import TimeoutError
+from contextlib import AsyncExitStack, asynccontextmanager, contextmanager
+from functools import partial
 from http import HTTPStatus
+from typing import AsyncIterator, Callable, Iterator
 
-from aiohttp import ClientResponseError, ClientSession, FormData
+from aiohttp import (
+    ClientConnectionError,
+    ClientResponse,
+    ClientResponseError,
+    ClientSession,
+    FormData,
+)
 from fastapi import UploadFile
 from yarl import URL
 
+from src.app.api.errors import PhotoTooLargeError
 from src.app.config import PhotoServiceConfig
-from src.app.external.http_errors import HttpClientError, HttpClientTimeoutError
+from src.app.external.http_errors import (
+    HttpClientError,
+    HttpClientServerError,
+    HttpClientTimeoutError,
+)
+from src.app.external.resilience import Bulkhead, CircuitBreaker
+from src.app.external.retries import RetryPolicy
+from src.app.services.photo_cache import PhotoVerdictCache
+from src.app.services.photo_preprocessing import PhotoPreprocessor
+
+
+async def _read_response(response: ClientResponse) -> dict:
+    """Ответ сервиса. Ответы 5xx - сбой сервиса, остальные ошибки - ошибка запроса."""
+    if response.status == HTTPStatus.OK:
+        return await response.json()
+    resp_text = await response.text()
+    error_class = HttpClientError
+    if response.status >= HTTPStatus.INTERNAL_SERVER_ERROR:
+        error_class = HttpClientServerError
+    raise error_class(
+        detail=f'Response status code {response.status}: {resp_text}',
+    )
+
+
+@contextmanager
+def _service_errors(timeout: float) -> Iterator[None]:
+    """Переводит ошибки запроса в сервис проверки в ошибки HTTP-клиента."""
+    try:
+        yield
+    except asyncio.TimeoutError:
+        logging.exception(
+            f'PhotoService unavailable by {timeout} secs timeout.',
+        )
+        raise HttpClientTimeoutError(
+            service_name='PhotoService',
+            timeout=timeout,
+        )
+    except (ClientConnectionError, ClientResponseError) as exc:
+        # Ошибка чтения фотографии оборачивается aiohttp в ошибку отправки тела запроса
+        if isinstance(exc.__cause__, PhotoTooLargeError):
+            raise exc.__cause__
+        logging.exception(
+            f'PhotoService error: {exc}',
+        )
+        raise HttpClientServerError(detail='PhotoService error')
+
+
+@asynccontextmanager
+async def _guarded(
+    circuit_breaker: CircuitBreaker | None,
+    bulkhead: Bulkhead | None,
+) -> AsyncIterator[None]:
+    """Ограничивает вызовы сервиса выключателем и числом одновременных запросов."""
+    async with AsyncExitStack() as stack:
+        if circuit_breaker is not None:
+            await stack.enter_async_context(circuit_breaker.guard())
+        if bulkhead is not None:
+            await stack.enter_async_context(bulkhead.acquire())
+        yield
+
+
+async def _iter_chunks(
+    photo: UploadFile,
+    read_lock: asyncio.Lock,
+    chunk_size: int,
+    check_size: Callable[[int | None], None],
+) -> AsyncIterator[bytes]:
+    """Читает фотографию по chunk_size байт, проверяя размер по мере чтения.
+
+    Позиция чтения своя у каждого вызова: под read_lock файл перематывается на неё
+    перед чтением, поэтому одну фотографию могут одновременно читать несколько попыток.
+    """
+    offset = 0
+    while True:
+        async with read_lock:
+            await photo.seek(offset)
+            chunk = await photo.read(chunk_size)
+        if not chunk:
+            return
+        offset += len(chunk)
+        check_size(offset)
+        yield chunk
 
 
 class PhotoService:
     """Клиент для получения лиц по списку фото."""
 
+    # Запросы клиента: шаблоны операций для метрик исходящих запросов
+    operations = (
+        ('POST', '/doc'),
+        ('POST', '/face'),
+        ('GET', '/healthz/up'),
+    )
+
     def __init__(
         self,
         session: ClientSession,
         config: PhotoServiceConfig,
+        cache: PhotoVerdictCache | None = None,
+        circuit_breaker: CircuitBreaker | None = None,
+        bulkhead: Bulkhead | None = None,
+        preprocessor: PhotoPreprocessor | None = None,
+        retry_policy: RetryPolicy | None = None,
     ):
         self._session = session
+        self._cache = cache
+        self._circuit_breaker = circuit_breaker
+        self._bulkhead = bulkhead
+        self._preprocessor = preprocessor
+        self._retry_policy = retry_policy
         self._url = URL(config.url)
         self._request_timeout = config.timeout
+        self._chunk_size = config.chunk_size
+        self._max_photo_size = config.max_photo_size
+
+    def check_size(self, size: int | None) -> None:
+        """Проверяет размер фотографии, если он известен."""
+        if size is not None and size > self._max_photo_size:
+            raise PhotoTooLargeError(max_size=self._max_photo_size)
 
     async def validate_photo(self, photo: UploadFile, photo_type: str):
-        form_data = FormData()
-        form_data.add_field(
-            'photo',
-            await photo.read(),
-            content_type=photo.content_type,
-            filename=photo.filename,
-        )
+        self.check_size(photo.size)
         endpoint = 'face'
         if photo_type == 'doc':
             endpoint = 'doc'
+        if self._cache is None:
+            return await self._request_validation(photo, endpoint)
+        # Ключ кэша - sha256 содержимого фотографии, фотография читается по частям
+        digest = hashlib.sha256()
+        async for chunk in _iter_chunks(photo, asyncio.Lock(), self._chunk_size, self.check_size):
+            digest.update(chunk)
+        cache_key = (endpoint, digest.hexdigest())
+        return await self._cache.get_or_compute(
+            cache_key,
+            partial(self._request_validation, photo, endpoint),
+        )
+
+    async def validate_photos(self, document: UploadFile, face: UploadFile) -> tuple[bool, bool]:
+        """Проверяет фотографии документа и лица одновременно.
+
+        Если одна из проверок завершилась ошибкой, вторая отменяется.
+        """
+        self.check_size(document.size)
+        self.check_size(face.size)
+        tasks = [
+            asyncio.create_task(self.validate_photo(photo=document, photo_type='doc')),
+            asyncio.create_task(self.validate_photo(photo=face, photo_type='face')),
+        ]
         try:
-            response = await self._session.post(
-                self._url / endpoint,
-                data=form_data,
-                timeout=self._request_timeout,
-            )
-        except TimeoutError:
-            logging.exception(
-                f'PhotoService unavailable by {self._request_timeout} secs timeout.',
-            )
-            raise HttpClientTimeoutError(
-                service_name='PhotoService',
-                timeout=self._request_timeout,
-            )
-        except ClientResponseError as exc:
-            logging.exception(
-                f'PhotoService error: {exc}',
-            )
-            raise HttpClientError(detail='PhotoService error')
-        if response.status != HTTPStatus.OK:
-            resp_text = await response.text()
-            raise HttpClientError(
-                detail=f'Response status code {response.status}: {resp_text}',
-            )
-        raw_data = await response.json()
-        logging.info({'PhotoService response': raw_data})
-        return raw_data['status'] == 'OK'
+            status_document, status_face = await asyncio.gather(*tasks)
+        except (Exception, asyncio.CancelledError):
+            for task in tasks:
+                task.cancel()
+            # Дожидаемся отмены, чтобы ошибка второй проверки не осталась необработанной
+            await asyncio.gather(*tasks, return_exceptions=True)
+            raise
+        return status_document, status_face
 
     async def is_connected(self):
-        response = await self._session.get(
+        async with self._session.get(
             self._url / 'healthz' / 'up',
             timeout=self._request_timeout,
+        ) as response:
+            return response.status == HTTPStatus.OK
+
+    async def _request_validation(self, photo: UploadFile, endpoint: str) -> bool:
+        if self._preprocessor is not None:
+            photo = await self._preprocessor.prepare(photo)
+        # Попытки могут выполняться одновременно, каждая читает фотографию со своей позиции
+        attempt = partial(self._attempt_validation, photo, endpoint, asyncio.Lock())
+        if self._retry_policy is None:
+            return await attempt()
+        return await self._retry_policy.call(attempt)
+
+    async def _attempt_validation(
+        self,
+        photo: UploadFile,
+        endpoint: str,
+        read_lock: asyncio.Lock,
+    ) -> bool:
+        form_data = FormData()
+        form_data.add_field(
+            'photo',
+            _iter_chunks(photo, read_lock, self._chunk_size, self.check_size),
+            content_type=photo.content_type,
+            filename=photo.filename,
         )
-        return response.status == HTTPStatus.OK
+        async with _guarded(self._circuit_breaker, self._bulkhead):
+            with _service_errors(self._request_timeout):
+                # Ответ освобождается при выходе из контекста, и соединение возвращается в пул
+                async with self._session.post(
+                    self._url / endpoint,
+                    data=form_data,
+                    timeout=self._request_timeout,
+                ) as response:
+                    raw_data = await _read_response(response)
+        logging.info({'PhotoService response': raw_data})
+        return raw_data['status'] == 'OK'
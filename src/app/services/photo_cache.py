@@ -0,0 +1,88 @@
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Awaitable, Callable, Hashable
+
+from src.app.system.mdw_prometheus_metrics.service.collector import ServiceCollector
+
+
+class PhotoVerdictCache:
+    """Ограниченный по размеру и времени жизни кэш результатов проверки фотографий.
+
+    Ключ - тип фотографии и хеш её содержимого. Одновременные запросы с одинаковым ключом
+    объединяются: в сервис уходит один запрос, остальные ждут его результат. Если запрос,
+    начавший проверку, отменён, ожидающие проверяют фотографию сами. Ошибки не кэшируются.
+    """
+
+    name = 'photo_verdict'
+
+    def __init__(self, max_size: int, ttl: float, metrics: ServiceCollector):
+        self._max_size = max_size
+        self._ttl = ttl
+        self._metrics = metrics
+        # ключ -> (результат, момент устаревания, длительность запроса в сервис)
+        self._entries: OrderedDict[Hashable, tuple[bool, float, float]] = OrderedDict()
+        self._in_flight: dict[Hashable, asyncio.Task] = {}
+
+    async def get_or_compute(
+        self,
+        key: Hashable,
+        compute: Callable[[], Awaitable[bool]],
+    ) -> bool:
+        verdict = self._cached(key)
+        if verdict is not None:
+            return verdict
+        task = self._in_flight.get(key)
+        if task is not None:
+            return await self._join(key, task, compute)
+        self._metrics.write_cache_request(self.name, 'miss')
+        task = asyncio.create_task(self._compute(key, compute))
+        self._in_flight[key] = task
+        task.add_done_callback(lambda _: self._in_flight.pop(key, None))
+        # Запрос в сервис читает файл этого запроса, который закрывается при его отмене,
+        # поэтому общий запрос отменяется вместе с ним
+        return await task
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    async def _compute(self, key: Hashable, compute: Callable[[], Awaitable[bool]]) -> bool:
+        start_time = time.monotonic()
+        verdict = await compute()
+        upstream_s = time.monotonic() - start_time
+        self._entries[key] = (verdict, time.monotonic() + self._ttl, upstream_s)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self._max_size:
+            self._entries.popitem(last=False)
+        return verdict
+
+    def _cached(self, key: Hashable) -> bool | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        verdict, expires_at, upstream_s = entry
+        if expires_at <= time.monotonic():
+            self._entries.pop(key)
+            return None
+        self._entries.move_to_end(key)
+        self._metrics.write_cache_request(self.name, 'hit')
+        self._metrics.write_cache_saved_time(self.name, upstream_s)
+        return verdict
+
+    async def _join(
+        self,
+        key: Hashable,
+        task: asyncio.Task,
+        compute: Callable[[], Awaitable[bool]],
+    ) -> bool:
+        """Ожидает общий запрос в сервис, а если его отменили - проверяет сам через compute."""
+        self._metrics.write_cache_request(self.name, 'coalesced')
+        try:
+            # Отмена ожидающего запроса не должна отменять общий запрос в сервис
+            return await asyncio.shield(task)
+        except asyncio.CancelledError:
+            if not task.cancelled():
+                raise
+        if self._in_flight.get(key) is task:
+            self._in_flight.pop(key)
+        return await self.get_or_compute(key, compute)
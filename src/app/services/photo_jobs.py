@@ -0,0 +1,207 @@
+import asyncio
+import logging
+import time
+import uuid
+from collections import deque
+from dataclasses import dataclass
+from tempfile import SpooledTemporaryFile
+from typing import Callable
+
+from fastapi import HTTPException, UploadFile
+
+from src.app.api.errors import PhotoJobNotFoundError, PhotoJobQueueFullError
+from src.app.api.schemas.photo_job import PhotoJobStatus
+from src.app.external.db.models import UserModel
+from src.app.services.photo import PhotoService
+from src.app.services.users import UserService
+from src.app.system.mdw_prometheus_metrics.service.collector import ServiceCollector
+
+# Фотографии меньше этого размера копируются в память, остальные - во временный файл
+_SPOOL_MAX_MEMORY_SIZE = 1024 * 1024
+
+
+@dataclass
+class PhotoJob:
+    id: str
+    user: UserModel
+    photo_type: str
+    photo: UploadFile
+    created_at: float
+    status: PhotoJobStatus = PhotoJobStatus.pending
+    detail: str | None = None
+    finished_at: float | None = None
+
+
+class _JobStore:
+    """Задачи по id. Завершённые задачи удаляются через job_ttl секунд после завершения."""
+
+    def __init__(self, job_ttl: float):
+        self._job_ttl = job_ttl
+        self._jobs: dict[str, PhotoJob] = {}
+        # Завершённые задачи в порядке завершения: в начале - те, что истекут первыми
+        self._finished: deque[PhotoJob] = deque()
+
+    def add(self, job: PhotoJob) -> None:
+        self._drop_expired()
+        self._jobs[job.id] = job
+
+    def get(self, job_id: str) -> PhotoJob | None:
+        return self._jobs.get(job_id)
+
+    def finish(self, job: PhotoJob) -> None:
+        job.finished_at = time.monotonic()
+        self._finished.append(job)
+
+    def _drop_expired(self) -> None:
+        expire_before = time.monotonic() - self._job_ttl
+        while self._finished and self._finished[0].finished_at <= expire_before:
+            self._jobs.pop(self._finished.popleft().id, None)
+
+
+async def _copy_photo(
+    photo: UploadFile,
+    spooled: UploadFile,
+    chunk_size: int,
+    check_size: Callable[[int | None], None],
+) -> None:
+    await photo.seek(0)
+    chunk = await photo.read(chunk_size)
+    while chunk:
+        await spooled.write(chunk)
+        check_size(spooled.size)
+        chunk = await photo.read(chunk_size)
+
+
+async def _spool(
+    photo: UploadFile,
+    chunk_size: int,
+    check_size: Callable[[int | None], None],
+) -> UploadFile:
+    """Копирует фотографию: файл запроса закрывается после ответа."""
+    spooled = UploadFile(
+        file=SpooledTemporaryFile(max_size=_SPOOL_MAX_MEMORY_SIZE),
+        size=0,
+        filename=photo.filename,
+        headers=photo.headers,
+    )
+    try:
+        await _copy_photo(photo, spooled, chunk_size, check_size)
+    except (Exception, asyncio.CancelledError):
+        await spooled.close()
+        raise
+    return spooled
+
+
+class PhotoJobService:
+    """Фоновая проверка фотографий.
+
+    Фотография копируется из запроса, задача ставится в ограниченную очередь и разбирается
+    пулом обработчиков. Задачи хранятся в памяти процесса и удаляются через job_ttl секунд
+    после завершения.
+    """
+
+    queue_name = 'photo_validation'
+
+    def __init__(
+        self,
+        photo_service: PhotoService,
+        user_service: UserService,
+        metrics: ServiceCollector,
+        queue_size: int,
+        workers: int,
+        job_ttl: float,
+        chunk_size: int,
+    ):
+        self._photo_service = photo_service
+        self._user_service = user_service
+        self._metrics = metrics
+        self._queue: asyncio.Queue[PhotoJob] = asyncio.Queue(maxsize=queue_size)
+        self._workers = workers
+        self._chunk_size = chunk_size
+        self._jobs = _JobStore(job_ttl)
+        self._busy_workers = 0
+
+    async def submit(self, photo: UploadFile, photo_type: str, user: UserModel) -> PhotoJob:
+        """Ставит фотографию в очередь на проверку."""
+        self._photo_service.check_size(photo.size)
+        if self._queue.full():
+            raise PhotoJobQueueFullError()
+        job = PhotoJob(
+            id=uuid.uuid4().hex,
+            user=user,
+            photo_type=photo_type,
+            photo=await _spool(photo, self._chunk_size, self._photo_service.check_size),
+            created_at=time.monotonic(),
+        )
+        try:
+            self._queue.put_nowait(job)
+        except asyncio.QueueFull:
+            await job.photo.close()
+            raise PhotoJobQueueFullError()
+        self._jobs.add(job)
+        self._metrics.write_job_queue_depth(self.queue_name, self._queue.qsize())
+        return job
+
+    def get(self, job_id: str, user: UserModel) -> PhotoJob:
+        job = self._jobs.get(job_id)
+        if job is None or job.user.id != user.id:
+            raise PhotoJobNotFoundError()
+        return job
+
+    async def run(self) -> None:
+        """Разбирает очередь пулом обработчиков, пока задачу не отменят."""
+        self._metrics.write_job_workers(self.queue_name, busy=0, total=self._workers)
+        # При отмене run gather сам отменяет обработчики
+        workers = [asyncio.create_task(self._work()) for _ in range(self._workers)]
+        try:
+            await asyncio.gather(*workers)
+        except Exception:
+            for worker in workers:
+                worker.cancel()
+            raise
+
+    async def _work(self) -> None:
+        while True:  # noqa: WPS457 работает до отмены задачи
+            job = await self._queue.get()
+            self._metrics.write_job_queue_depth(self.queue_name, self._queue.qsize())
+            self._metrics.write_job_wait_time(self.queue_name, time.monotonic() - job.created_at)
+            await self._process(job)
+
+    async def _process(self, job: PhotoJob) -> None:
+        job.status = PhotoJobStatus.processing
+        self._busy_workers += 1
+        self._metrics.write_job_workers(
+            self.queue_name,
+            busy=self._busy_workers,
+            total=self._workers,
+        )
+        try:
+            status = await self._validate(job)
+        except HTTPException as exc:
+            job.status = PhotoJobStatus.failed
+            job.detail = str(exc.detail)
+        except Exception:
+            logging.exception(f'Photo job {job.id} failed')
+            job.status = PhotoJobStatus.failed
+            job.detail = 'Неожиданная ошибка при проверке фотографии.'
+        else:
+            job.status = PhotoJobStatus.validated if status else PhotoJobStatus.not_validated
+        finally:
+            self._jobs.finish(job)
+            self._busy_workers -= 1
+            self._metrics.write_job_workers(
+                self.queue_name,
+                busy=self._busy_workers,
+                total=self._workers,
+            )
+            self._queue.task_done()
+            await job.photo.close()
+
+    async def _validate(self, job: PhotoJob) -> bool:
+        """Проверяет фотографию и сохраняет статус проверки у пользователя."""
+        update_status = self._user_service.update_status_face
+        if job.photo_type == 'doc':
+            update_status = self._user_service.update_status_doc
+        status = await self._photo_service.validate_photo(job.photo, job.photo_type)
+        await update_status(user_db=job.user, status=status)
+        return status
@@ -0,0 +1,93 @@
+import asyncio
+import io
+import logging
+import time
+from concurrent.futures import Executor
+from functools import partial
+from importlib import import_module
+from importlib.util import find_spec
+
+from fastapi import UploadFile
+from starlette.datastructures import Headers
+
+from src.app.api.errors import PhotoTooLargeError
+from src.app.system.mdw_prometheus_metrics.service.collector import ServiceCollector
+
+
+def downscale_image(photo_bytes: bytes, max_side: int, quality: int) -> bytes | None:
+    """Уменьшает изображение до max_side по большей стороне и пережимает в JPEG.
+
+    Выполняется в отдельном процессе. Возвращает None, если результат не меньше исходного.
+    Pillow ставится через extras images, поэтому импортируется только здесь.
+    """
+    pil_image = import_module('PIL.Image')
+    pil_image_ops = import_module('PIL.ImageOps')
+    with pil_image.open(io.BytesIO(photo_bytes)) as image:
+        image = pil_image_ops.exif_transpose(image)
+        image.thumbnail((max_side, max_side))
+        output = io.BytesIO()
+        image.convert('RGB').save(output, format='JPEG', quality=quality, optimize=True)
+    if output.tell() >= len(photo_bytes):
+        return None
+    return output.getvalue()
+
+
+class PhotoPreprocessor:
+    """Уменьшает большие фотографии перед отправкой в сервис проверки.
+
+    Декодирование и сжатие выполняются в пуле процессов, чтобы не блокировать event loop.
+    Если изображение не удалось обработать, отправляется исходная фотография.
+    """
+
+    def __init__(
+        self,
+        executor: Executor,
+        metrics: ServiceCollector,
+        max_side: int,
+        quality: int,
+        min_size: int,
+        max_photo_size: int,
+    ):
+        if find_spec('PIL') is None:
+            raise RuntimeError('Для обработки фотографий нужен Pillow: poetry install -E images')
+        self._executor = executor
+        self._metrics = metrics
+        self._max_side = max_side
+        self._quality = quality
+        self._min_size = min_size
+        self._max_photo_size = max_photo_size
+
+    async def prepare(self, photo: UploadFile) -> UploadFile:
+        """Уменьшает фотографию. В память читается не больше max_photo_size байт."""
+        if photo.size is None or photo.size < self._min_size:
+            return photo
+        photo_bytes = await self._read(photo)
+        start_time = time.monotonic()
+        try:
+            downscaled = await asyncio.get_running_loop().run_in_executor(
+                self._executor,
+                partial(downscale_image, photo_bytes, self._max_side, self._quality),
+            )
+        except Exception:
+            logging.exception('Photo preprocessing failed')
+            downscaled = None
+        saved_bytes = len(photo_bytes) - len(downscaled) if downscaled is not None else 0
+        self._metrics.write_photo_preprocessing(time.monotonic() - start_time, saved_bytes)
+        if downscaled is None:
+            return photo
+        return UploadFile(
+            file=io.BytesIO(downscaled),
+            size=len(downscaled),
+            filename=photo.filename,
+            headers=Headers({'content-type': 'image/jpeg'}),
+        )
+
+    async def _read(self, photo: UploadFile) -> bytes:
+        """Читает фотографию целиком, проверяя размер до чтения и по прочитанному."""
+        if photo.size > self._max_photo_size:
+            raise PhotoTooLargeError(max_size=self._max_photo_size)
+        await photo.seek(0)
+        photo_bytes = await photo.read(self._max_photo_size + 1)
+        if len(photo_bytes) > self._max_photo_size:
+            raise PhotoTooLargeError(max_size=self._max_photo_size)
+        return photo_bytes
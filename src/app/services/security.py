@@ -1,4 +1,5 @@
 from datetime import datetime, timedelta
+from typing import Iterable
 
 from jose import jwt
 from passlib.context import CryptContext
@@ -11,9 +12,15 @@ class SecurityService:
     _algorithm = 'HS256'
     _pwd_context = CryptContext(schemes=['bcrypt'], deprecated='auto')
 
-    def __init__(self, secret_key: SecretStr, token_ttl: int) -> None:
+    def __init__(
+        self,
+        secret_key: SecretStr,
+        token_ttl: int,
+        admin_emails: Iterable[str] = (),
+    ) -> None:
         self.secret_key = secret_key.get_secret_value()
         self.token_ttl = token_ttl
+        self.admin_emails = frozenset(admin_emails)
 
     def verify_password(self, plain_password: str, hashed_password: str) -> bool:
         return self._pwd_context.verify(plain_password, hashed_password)
@@ -33,3 +40,6 @@ class SecurityService:
     def get_email_from_token(self, token: str):
         payload = jwt.decode(token, self.secret_key, algorithms=[self._algorithm])
         return payload['sub']
+
+    def is_admin(self, email: str) -> bool:
+        return email in self.admin_emails
@@ -1,13 +1,9 @@
-from contextlib import AbstractAsyncContextManager
-from typing import Callable
-
 from fastapi.encoders import jsonable_encoder
-from sqlalchemy import select
-from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
 
 from src.app.api.schemas import user as user_schemas
 from src.app.external.db.models import UserModel
+from src.app.repositories.base import UserRepository
+from src.app.services.analytics import BusinessMetrics
 from src.app.services.security import SecurityService
 
 
@@ -15,30 +11,24 @@ class UserService:
 
     def __init__(
         self,
-        session_factory: Callable[..., AbstractAsyncContextManager[AsyncSession]],
+        repository: UserRepository,
         security_service: SecurityService,
+        metrics: BusinessMetrics,
     ):
-        self.session_factory = session_factory
+        self.repository = repository
         self.security_service = security_service
+        self.metrics = metrics
 
     async def get_by_email(self, email: str) -> UserModel | None:
-        async with self.session_factory() as session:
-            return await session.scalar(
-                select(UserModel).
-                where(UserModel.email == email).
-                options(selectinload(UserModel.credit_card)),
-            )
+        return await self.repository.get_by_email(email)
 
     async def add(self, user_in: user_schemas.UserCreate) -> UserModel:
         password = user_in.password.get_secret_value()
-        async with self.session_factory() as session:
-            user = UserModel(
-                email=user_in.email,
-                hashed_password=self.security_service.get_password_hash(password),
-            )
-            async with session.begin():
-                session.add(user)
-            return user
+        user = UserModel(
+            email=user_in.email,
+            hashed_password=self.security_service.get_password_hash(password),
+        )
+        return await self.repository.add(user)
 
     async def authenticate(self, email: str, password: str) -> UserModel | None:
         user = await self.get_by_email(email=email)
@@ -54,18 +44,23 @@ class UserService:
         for field in obj_data:
             if field in update_data:
                 setattr(user_db, field, update_data[field])
-        async with self.session_factory() as session:
-            async with session.begin():
-                session.add(user_db)
+        await self.repository.save(user_db)
 
     async def update_status_doc(self, user_db: UserModel, status: bool):
         user_db.status_document = status
-        async with self.session_factory() as session:
-            async with session.begin():
-                session.add(user_db)
+        await self.repository.save(user_db)
+        self.metrics.write_verification('doc', status)
 
     async def update_status_face(self, user_db: UserModel, status: bool):
         user_db.status_face = status
-        async with self.session_factory() as session:
-            async with session.begin():
-                session.add(user_db)
+        await self.repository.save(user_db)
+        self.metrics.write_verification('face', status)
+
+    async def update_statuses(self, user_db: UserModel, status_document: bool, status_face: bool):
+        await self.repository.update_statuses(
+            user_db,
+            status_document=status_document,
+            status_face=status_face,
+        )
+        self.metrics.write_verification('doc', status_document)
+        self.metrics.write_verification('face', status_face)
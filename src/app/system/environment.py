@@ -2,7 +2,21 @@ from logging import config
 
 from app.config import Config
 from app.system.mdw_logging import context as mdw_log_context
-from app.system.mdw_prometheus_metrics import ServiceCollector, set_global_registry
+from app.system.mdw_prometheus_metrics import (
+    ServiceCollector,
+    global_registry,
+    set_global_registry,
+)
+from app.system.mdw_prometheus_metrics.service.collector import OVERFLOW_LABEL
+from app.system.mdw_prometheus_metrics.service.sketch import LatencySketches
+from app.system.mdw_tracing import Tracer, set_global_tracer
+from app.system.mdw_tracing.export import (
+    BatchSpanProcessor,
+    FileSpanExporter,
+    InMemorySpanExporter,
+    OtlpSpanExporter,
+    SpanExporter,
+)
 
 
 def _configure_logging(service_name, service_version, log_config):
@@ -18,12 +32,63 @@ def _configure_logging(service_name, service_version, log_config):
     config.dictConfig(log_config)
 
 
-def _init_metrics(service_name):
+def _init_metrics(service_name, max_label_sets, latency_config):
     """Инициализирует глобальный сборщик стандартных метрик.
 
     :param service_name: название сервиса
+    :param max_label_sets: лимит наборов лейблов у одной метрики
+    :param latency_config: конфигурация скетчей квантилей задержек
     """
-    set_global_registry(ServiceCollector(service_name))
+    latency_sketches = LatencySketches(
+        window=latency_config.window,
+        slots=latency_config.slots,
+        relative_accuracy=latency_config.relative_accuracy,
+        max_bins=latency_config.max_bins,
+        max_operations=max_label_sets,
+        overflow_operation=OVERFLOW_LABEL,
+    )
+    set_global_registry(ServiceCollector(
+        service_name,
+        max_label_sets=max_label_sets,
+        latency_sketches=latency_sketches,
+    ))
+
+
+def _span_exporter(service_name, tracing_config) -> SpanExporter:
+    if tracing_config.exporter == 'memory':
+        return InMemorySpanExporter()
+    if tracing_config.exporter == 'otlp':
+        return OtlpSpanExporter(
+            url=tracing_config.otlp_url,
+            service_name=service_name,
+            timeout=tracing_config.otlp_timeout,
+        )
+    return FileSpanExporter(tracing_config.file_path)
+
+
+def _init_tracing(service_name, tracing_config):
+    """Инициализирует глобальный трейсер. Выключенный трейсинг спанов не создаёт.
+
+    :param service_name: название сервиса
+    :param tracing_config: конфигурация трейсинга
+    """
+    if not tracing_config.enabled:
+        set_global_tracer(Tracer())
+        return
+    processor = BatchSpanProcessor(
+        exporter=_span_exporter(service_name, tracing_config),
+        metrics=global_registry(),
+        batch_size=tracing_config.batch_size,
+        flush_interval=tracing_config.flush_interval,
+        max_queue_size=tracing_config.max_queue_size,
+    )
+    set_global_tracer(Tracer(
+        processor=processor,
+        head_sample_rate=tracing_config.head_sample_rate,
+        slow_threshold=tracing_config.slow_threshold,
+        tail_sample_rate=tracing_config.tail_sample_rate,
+        max_spans=tracing_config.max_spans,
+    ))
 
 
 def initialize(common_config: Config):
@@ -34,4 +99,9 @@ def initialize(common_config: Config):
     service_name = common_config.service.name
     service_version = common_config.service.version
     _configure_logging(service_name, service_version, common_config.logging)
-    _init_metrics(service_name)
+    _init_metrics(
+        service_name,
+        common_config.metrics.max_label_sets,
+        common_config.metrics.latency,
+    )
+    _init_tracing(service_name, common_config.tracing)
@@ -1,22 +1,111 @@
 import json
 import logging
 import time
-from typing import Callable
+from typing import Any, AsyncIterator, Callable
 
 from fastapi import HTTPException, Request, Response, status
 from fastapi.encoders import jsonable_encoder
 from fastapi.exceptions import RequestValidationError
+from fastapi.responses import StreamingResponse
 from fastapi.routing import APIRoute
 
+from app.system.mdw_prometheus_metrics import global_registry
+from app.system.mdw_prometheus_metrics.service.labels import DbStatementsCount
+from app.system.mdw_sqlalchemy.statements import (
+    StatementsBudgetExceeded,
+    StatementsCounter,
+    is_strict_budget,
+    start_counting,
+)
+from app.system.mdw_tracing.spans import child_span
+
 logger = logging.getLogger('app.api')
 
 
+def statements_budget(limit: int):
+    """Задаёт максимальное количество SQL-запросов, которое может выполнить хендлер."""
+
+    def decorator(func: Callable):
+        func.statements_budget = limit
+        return func
+
+    return decorator
+
+
+def _check_budget(statements: StatementsCounter, budget: int | None) -> None:
+    """Сверяет количество SQL-запросов с бюджетом хендлера."""
+    if budget is not None and statements.count > budget:
+        operation = statements.operation
+        message = f'{operation} executed {statements.count} sql statements, budget {budget}'
+        if is_strict_budget():
+            raise StatementsBudgetExceeded(message)
+        logger.warning(message)
+
+
+def _error_body(exc: Exception) -> Any:
+    return jsonable_encoder({
+        'detail': [
+            {
+                'loc': [],
+                'msg': str(exc),
+                'type': str(type(exc)),
+            },
+        ],
+    })
+
+
+def _log_response(
+    statements: StatementsCounter,
+    start_time: float,
+    status_code: int,
+    resp_body: Any,
+) -> None:
+    logger.info({
+        'selector': 'response_data',
+        'status_code': status_code,
+        'response': resp_body,
+        'time': time.monotonic() - start_time,
+        'db_statements': statements.count,
+    })
+    global_registry().write_db_statements_count(
+        statements.count,
+        DbStatementsCount(operation=statements.operation),
+    )
+
+
+async def _streamed_body(
+    body_iterator: AsyncIterator,
+    statements: StatementsCounter,
+    start_time: float,
+    status_code: int,
+    budget: int | None,
+) -> AsyncIterator:
+    """Тело потокового ответа: запросы выполняются при его отдаче, уже после выхода из хендлера.
+
+    Поэтому количество запросов логируется, пишется в метрику и сверяется с бюджетом,
+    когда тело отдано целиком. Статус к этому моменту уже отправлен клиенту.
+    """
+    resp_body = None
+    try:
+        async for chunk in body_iterator:
+            yield chunk
+        _check_budget(statements, budget)
+    except Exception as exc:
+        resp_body = _error_body(exc)
+        raise
+    finally:
+        _log_response(statements, start_time, status_code, resp_body)
+
+
 class LoggedRoute(APIRoute):
     def get_route_handler(self) -> Callable:
         original_route_handler = super().get_route_handler()
+        budget = getattr(self.endpoint, 'statements_budget', None)
 
         async def custom_route_handler(request: Request) -> Response:
             start_time = time.monotonic()
+            operation = '{method} {path}'.format(method=request.method, path=self.path_format)
+            statements = start_counting(operation)
             start_log = {'selector': 'request_data'}
             try:
                 req_body = await request.json()
@@ -35,11 +124,20 @@ class LoggedRoute(APIRoute):
 
             status_code = status.HTTP_200_OK
             resp_body = None
+            streamed = False
             try:
-                response: Response = await original_route_handler(request)
+                with global_registry().track_in_flight(operation), child_span('handler'):
+                    response: Response = await original_route_handler(request)
                 status_code = response.status_code
-                if response.body:
-                    resp_body = json.loads(response.body.decode())
+                if isinstance(response, StreamingResponse):
+                    response.body_iterator = _streamed_body(
+                        response.body_iterator, statements, start_time, status_code, budget,
+                    )
+                    streamed = True
+                else:
+                    if getattr(response, 'body', None):
+                        resp_body = json.loads(response.body.decode())
+                    _check_budget(statements, budget)
             except HTTPException as exc:
                 status_code = exc.status_code
                 resp_body = {'detail': exc.detail}
@@ -50,23 +148,12 @@ class LoggedRoute(APIRoute):
                 raise
             except Exception as exc:
                 status_code = status.HTTP_500_INTERNAL_SERVER_ERROR
-                resp_body = jsonable_encoder({
-                    'detail': [
-                        {
-                            'loc': [],
-                            'msg': str(exc),
-                            'type': str(type(exc)),
-                        },
-                    ],
-                })
+                resp_body = _error_body(exc)
                 raise
             finally:
-                logger.info({
-                    'selector': 'response_data',
-                    'status_code': status_code,
-                    'response': resp_body,
-                    'time': time.monotonic() - start_time,
-                })
+                # Потоковый ответ логируется после отдачи тела, см. _streamed_body
+                if not streamed:
+                    _log_response(statements, start_time, status_code, resp_body)
 
             return response
 
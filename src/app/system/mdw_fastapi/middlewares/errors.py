@@ -1,5 +1,8 @@
 import logging
+import re
+from http import HTTPStatus
 
+from fastapi import HTTPException as FastAPIHTTPException
 from fastapi import Request
 from fastapi.encoders import jsonable_encoder
 from fastapi.exceptions import RequestValidationError
@@ -7,9 +10,30 @@ from fastapi.responses import JSONResponse, Response
 from starlette.exceptions import HTTPException
 from starlette.status import HTTP_422_UNPROCESSABLE_ENTITY, HTTP_500_INTERNAL_SERVER_ERROR
 
+from app.system.mdw_fastapi.middlewares.operation import request_operation
 from app.system.mdw_prometheus_metrics import global_registry
 from app.system.mdw_prometheus_metrics.service.labels import ErrorsCount
 
+# Ошибки без собственного класса классифицируются по статусу ответа
+_GENERIC_HTTP_EXCEPTIONS = (HTTPException, FastAPIHTTPException)
+_CAMEL_CASE_BOUNDARY = re.compile(r'(?<=[a-z0-9])(?=[A-Z])|(?<=[A-Z])(?=[A-Z][a-z])')
+
+
+def classify_error(exc: Exception) -> str:
+    """Код ошибки для лейбла error_text метрики ошибок.
+
+    Текст ошибки может содержать данные запроса, поэтому в метрику попадает только код
+    из ограниченного набора: имя класса ошибки сервиса или название HTTP-статуса.
+    """
+    if isinstance(exc, RequestValidationError):
+        return 'validation_error'
+    if type(exc) in _GENERIC_HTTP_EXCEPTIONS:
+        try:
+            return HTTPStatus(exc.status_code).name.lower()
+        except ValueError:
+            return f'http_{exc.status_code}'
+    return _CAMEL_CASE_BOUNDARY.sub('_', type(exc).__name__).lower()
+
 
 def _log_error(error: ErrorsCount, **extra_log):
     logging.exception({
@@ -22,11 +46,11 @@ def _log_error(error: ErrorsCount, **extra_log):
 async def handle_http_exception(request: Request, exc: HTTPException) -> JSONResponse:
     """Обработчик HTTP ошибок сервиса."""
     error = ErrorsCount(
-        operation='{method} {path}'.format(method=request.method, path=request.url.path),
+        operation=request_operation(request),
         http_status_code=exc.status_code,
-        error_text=str(exc.detail),
+        error_text=classify_error(exc),
     )
-    _log_error(error)
+    _log_error(error, detail=str(exc.detail))
     return JSONResponse(
         status_code=exc.status_code,
         headers=getattr(exc, 'headers', None),
@@ -37,16 +61,20 @@ async def handle_http_exception(request: Request, exc: HTTPException) -> JSONRes
 async def handle_validation_error(request: Request, exc: RequestValidationError) -> JSONResponse:
     """Обработчик ошибок валидации входных запросов."""
     error = ErrorsCount(
-        operation='{method} {path}'.format(method=request.method, path=request.url.path),
+        operation=request_operation(request),
         http_status_code=HTTP_422_UNPROCESSABLE_ENTITY,
-        error_text='Request validation error. Locations: {locations}'.format(
+        error_text=classify_error(exc),
+    )
+    _log_error(
+        error,
+        detail='Request validation error. Locations: {locations}'.format(
             locations=[
                 '.'.join(str(_) for _ in error['loc'])
                 for error in exc.errors()
             ],
         ),
+        body=exc.body,
     )
-    _log_error(error, body=exc.body)
     return JSONResponse(
         status_code=HTTP_422_UNPROCESSABLE_ENTITY,
         content={'detail': jsonable_encoder(exc.errors())},
@@ -59,18 +87,18 @@ async def errors_middleware(request: Request, call_next):
         response: Response = await call_next(request)
     except Exception as exc:
         error = ErrorsCount(
-            operation='{method} {path}'.format(method=request.method, path=request.url.path),
+            operation=request_operation(request),
             http_status_code=HTTP_500_INTERNAL_SERVER_ERROR,
-            error_text=str(exc),
+            error_text=classify_error(exc),
         )
-        _log_error(error)
+        _log_error(error, detail=str(exc))
         response = JSONResponse(
             status_code=error.http_status_code,
             content=jsonable_encoder({
                 'detail': [
                     {
                         'loc': [],
-                        'msg': error.error_text,
+                        'msg': str(exc),
                         'type': str(type(exc)),
                     },
                 ],
@@ -0,0 +1,16 @@
+from fastapi import Request
+
+# Операция запросов, не попавших ни в один маршрут: сканеры и опечатки не порождают новые серии
+UNMATCHED_OPERATION = 'unmatched'
+
+
+def request_operation(request: Request) -> str:
+    """Лейбл operation запроса: метод и шаблон пути маршрута.
+
+    Например, GET /user/photo_jobs/{job_id} для любого job_id. Маршрут проставляется в scope
+    роутером, поэтому до его вызова операция не определена.
+    """
+    path = getattr(request.scope.get('route'), 'path_format', None)
+    if path is None:
+        return UNMATCHED_OPERATION
+    return '{method} {path}'.format(method=request.method, path=path)
@@ -0,0 +1,25 @@
+from fastapi import Request, Response
+from starlette.status import HTTP_500_INTERNAL_SERVER_ERROR
+
+from app.system.mdw_fastapi.middlewares.operation import request_operation
+from app.system.mdw_prometheus_metrics import exemplars
+from app.system.mdw_prometheus_metrics.service.labels import RequestDuration
+from app.system.mdw_tracing import global_tracer
+
+
+async def tracing_middleware(request: Request, call_next):
+    """Трейс запроса: корневой спан покрывает мидлвари метрик, ошибок и хендлер."""
+    with global_tracer().trace(f'{request.method} {request.url.path}') as root:
+        response: Response = await call_next(request)
+        if root is not None:
+            operation = request_operation(request)
+            root.name = operation
+            # Ошибкой считаются только сбои сервиса: 4xx не проходят мимо tail-сэмплирования
+            root.error = response.status_code >= HTTP_500_INTERNAL_SERVER_ERROR
+            root.tags.update(RequestDuration(
+                operation=operation,
+                http_status_code=response.status_code,
+                error=root.error,
+            ).to_span_tags())
+            root.tags['request_id'] = exemplars.request_id.get()
+    return response
@@ -0,0 +1,24 @@
+"""Exemplars гистограмм задержек: связь медленного запроса с его айди в логах.
+
+Айди запроса задаётся мидлварью контекста и попадает в exemplar бакета, в который легло
+наблюдение. Exemplars экспортируются только в формате OpenMetrics и не поддерживаются
+prometheus_client в многопроцессном режиме: там наблюдения пишутся без них.
+"""
+from contextvars import ContextVar
+
+REQUEST_ID_LABEL = 'request_id'
+
+request_id: ContextVar[str | None] = ContextVar('exemplar_request_id', default=None)
+
+
+def set_request_id(uid: str) -> None:
+    """Задаёт айди запроса для exemplars наблюдений в текущем контексте."""
+    request_id.set(uid)
+
+
+def current_exemplar() -> dict[str, str] | None:
+    """Exemplar для наблюдения в текущем контексте или None вне запроса."""
+    uid = request_id.get()
+    if uid is None:
+        return None
+    return {REQUEST_ID_LABEL: uid}
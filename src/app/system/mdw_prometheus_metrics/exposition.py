@@ -0,0 +1,110 @@
+"""Кэширование и сжатие ответа с метриками.
+
+Рендер всех метрик занимает заметное время, а при нескольких скрейперах (или нескольких
+репликах Prometheus) одни и те же метрики рендерятся несколько раз подряд. Готовый ответ
+кэшируется на короткое время отдельно для каждого регистри и формата.
+"""
+import gzip
+import time
+from dataclasses import dataclass
+from typing import Callable
+
+from prometheus_client.exposition import choose_encoder, gzip_accepted
+
+from .multiprocess import Encoder
+from .service.collector import ServiceCollector
+
+OPENMETRICS_FORMAT = 'openmetrics'
+PROMETHEUS_FORMAT = 'prometheus'
+_GZIP_LEVEL = 6
+
+
+@dataclass(slots=True)
+class RenderedMetrics:
+    """Ответ с метриками: тело, тип содержимого и кодировка сжатия."""
+
+    body: bytes
+    content_type: str
+    content_encoding: str | None = None
+
+
+@dataclass(slots=True)
+class _CacheEntry:
+    expires_at: float
+    body: bytes
+    content_type: str
+    gzipped: bytes | None = None
+
+
+class MetricsExposition:
+    """Рендер метрик с учётом заголовков Accept и Accept-Encoding скрейпера.
+
+    Формат OpenMetrics отдаётся, если скрейпер запросил его в Accept, сжатие gzip -
+    если он указал gzip в Accept-Encoding. Сжатый ответ считается один раз на запись кэша.
+    """
+
+    def __init__(self, ttl: float, metrics: ServiceCollector):
+        self._ttl = ttl
+        self._metrics = metrics
+        # (регистри, формат) -> отрендеренные метрики
+        self._entries: dict[tuple[str, str], _CacheEntry] = {}
+
+    def render(
+        self,
+        name: str,
+        export: Callable[[Encoder], bytes],
+        accept: str | None,
+        accept_encoding: str | None,
+        cached: bool = True,
+    ) -> RenderedMetrics:
+        """Метрики регистри name, export - функция экспорта регистри заданным encoder.
+
+        С cached=False метрики рендерятся заново, а кэш регистри сбрасывается: так вызывается
+        экспорт со сбросом значений, после которого закэшированный ответ устарел.
+        """
+        encoder, content_type = choose_encoder(accept)
+        metrics_format = OPENMETRICS_FORMAT if 'openmetrics' in content_type else PROMETHEUS_FORMAT
+        if not cached:
+            for key in [key for key in self._entries if key[0] == name]:
+                del self._entries[key]
+        entry = self._entry(name, metrics_format, export, encoder, content_type, cached)
+        if not gzip_accepted(accept_encoding or ''):
+            self._metrics.write_metrics_payload(name, metrics_format, 'identity', len(entry.body))
+            return RenderedMetrics(body=entry.body, content_type=entry.content_type)
+        if entry.gzipped is None:
+            entry.gzipped = gzip.compress(entry.body, compresslevel=_GZIP_LEVEL)
+        self._metrics.write_metrics_payload(name, metrics_format, 'gzip', len(entry.gzipped))
+        return RenderedMetrics(
+            body=entry.gzipped,
+            content_type=entry.content_type,
+            content_encoding='gzip',
+        )
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def _entry(
+        self,
+        name: str,
+        metrics_format: str,
+        export: Callable[[Encoder], bytes],
+        encoder: Encoder,
+        content_type: str,
+        cached: bool,
+    ) -> _CacheEntry:
+        key = (name, metrics_format)
+        entry = self._entries.get(key)
+        if cached and entry is not None and entry.expires_at > time.monotonic():
+            return entry
+        start_time = time.monotonic()
+        body = export(encoder)
+        render_s = time.monotonic() - start_time
+        self._metrics.write_metrics_render(name, metrics_format, render_s)
+        entry = _CacheEntry(
+            expires_at=time.monotonic() + self._ttl,
+            body=body,
+            content_type=content_type,
+        )
+        if cached:
+            self._entries[key] = entry
+        return entry
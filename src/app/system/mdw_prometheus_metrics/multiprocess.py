@@ -0,0 +1,183 @@
+"""Сбор метрик с нескольких воркеров uvicorn.
+
+Режим включается переменной окружения PROMETHEUS_MULTIPROC_DIR, которую нужно задать до импорта
+prometheus_client: каждый воркер пишет значения метрик в свои mmap-файлы в этой директории,
+а при экспорте значения всех воркеров суммируются.
+"""
+import json
+import os
+import shutil
+from pathlib import Path
+from typing import Callable, Iterator
+
+import prometheus_client
+from prometheus_client import CollectorRegistry
+from prometheus_client import multiprocess as prometheus_multiprocess
+from prometheus_client.metrics_core import Metric
+
+MULTIPROC_DIR_ENV = 'PROMETHEUS_MULTIPROC_DIR'
+# Типы метрик, значения которых только растут: сброс для них - вычитание значений на момент сброса
+_RESETTABLE_TYPES = frozenset(('counter', 'histogram'))
+_BASELINE_FILE = 'baseline_{name}.json'
+
+SampleKey = tuple[str, tuple[tuple[str, str], ...]]
+Encoder = Callable[[CollectorRegistry], bytes]
+
+# Прочитанные базовые значения: имя регистри -> (mtime файла, значения)
+_baselines: dict[str, tuple[float, dict[SampleKey, float]]] = {}
+
+
+def multiprocess_dir() -> str | None:
+    """Директория файлов метрик воркеров или None, если сервис работает в одном процессе."""
+    return os.environ.get(MULTIPROC_DIR_ENV)
+
+
+def prepare_dir(path: str) -> None:
+    """Очищает директорию от файлов предыдущего запуска и включает многопроцессный режим.
+
+    Вызывается в родительском процессе до запуска воркеров: они наследуют переменную окружения.
+    """
+    shutil.rmtree(path, ignore_errors=True)
+    Path(path).mkdir(parents=True)
+    os.environ[MULTIPROC_DIR_ENV] = path
+
+
+def mark_process_dead() -> None:
+    """Удаляет файлы gauge-метрик с режимом live* завершающегося воркера."""
+    path = multiprocess_dir()
+    if path is not None:
+        prometheus_multiprocess.mark_process_dead(os.getpid(), path)
+
+
+def generate_latest(
+    registry: CollectorRegistry,
+    name: str,
+    encoder: Encoder = prometheus_client.generate_latest,
+) -> bytes:
+    """Экспорт метрик registry в формате encoder.
+
+    В многопроцессном режиме экспортируются те же семейства метрик, что и в registry,
+    но со значениями, просуммированными по всем воркерам.
+    """
+    path = multiprocess_dir()
+    if path is None:
+        return encoder(registry)
+    return encoder(_MultiProcessView(registry, path, name))
+
+
+def reset(registry: CollectorRegistry, name: str) -> None:
+    """Запоминает текущие значения счётчиков и гистограмм всех воркеров как нулевые.
+
+    Файлы метрик принадлежат работающим воркерам и не удаляются, поэтому после сброса
+    из экспортируемых значений вычитаются значения на момент сброса.
+    """
+    path = multiprocess_dir()
+    if path is None:
+        return
+    _write_baseline(path, name, _MultiProcessView(registry, path, name, subtract_baseline=False))
+
+
+def generate_and_reset(
+    registry: CollectorRegistry,
+    name: str,
+    encoder: Encoder = prometheus_client.generate_latest,
+) -> bytes:
+    """Экспорт метрик registry и сброс по одному чтению файлов воркеров.
+
+    Значения, записанные после чтения, не теряются: они попадут в следующий экспорт.
+    В однопроцессном режиме registry только экспортируется, сброс - подмена registry новым.
+    """
+    path = multiprocess_dir()
+    if path is None:
+        return encoder(registry)
+    baseline = _read_baseline(path, name)
+    families = list(_MultiProcessView(registry, path, name, subtract_baseline=False).collect())
+    _write_baseline(path, name, _Families(families))
+    for family in families:
+        _subtract(family, baseline)
+    return encoder(_Families(families))
+
+
+def _write_baseline(path: str, name: str, collector: '_Families | _MultiProcessView') -> None:
+    baseline = [
+        [sample.name, sorted(sample.labels.items()), sample.value]
+        for family in collector.collect()
+        if family.type in _RESETTABLE_TYPES
+        for sample in family.samples
+    ]
+    baseline_path = Path(path) / _BASELINE_FILE.format(name=name)
+    tmp_path = baseline_path.with_suffix('.tmp')
+    tmp_path.write_text(json.dumps(baseline))
+    os.replace(tmp_path, baseline_path)
+
+
+def _subtract(family: Metric, baseline: dict[SampleKey, float]) -> None:
+    """Вычитает из значений счётчиков и гистограмм значения на момент сброса."""
+    if not baseline or family.type not in _RESETTABLE_TYPES:
+        return
+    family.samples = [
+        sample._replace(
+            value=sample.value - baseline.get(
+                (sample.name, tuple(sorted(sample.labels.items()))),
+                0,
+            ),
+        )
+        for sample in family.samples
+    ]
+
+
+def _read_baseline(path: str, name: str) -> dict[SampleKey, float]:
+    baseline_path = Path(path) / _BASELINE_FILE.format(name=name)
+    try:
+        mtime = baseline_path.stat().st_mtime
+    except FileNotFoundError:
+        return {}
+    cached = _baselines.get(name)
+    if cached is not None and cached[0] == mtime:
+        return cached[1]
+    baseline = {
+        (sample_name, tuple(tuple(label) for label in labels)): value
+        for sample_name, labels, value in json.loads(baseline_path.read_text())
+    }
+    _baselines[name] = (mtime, baseline)
+    return baseline
+
+
+class _MultiProcessView:
+    """Семейства метрик registry со значениями из файлов всех воркеров.
+
+    Семейства, которых нет в файлах (например, из собственных коллекторов), берутся
+    из registry текущего процесса.
+    """
+
+    def __init__(
+        self,
+        registry: CollectorRegistry,
+        path: str,
+        name: str,
+        subtract_baseline: bool = True,
+    ):
+        self._registry = registry
+        self._path = path
+        self._name = name
+        self._subtract_baseline = subtract_baseline
+
+    def collect(self) -> Iterator[Metric]:
+        local_families = {family.name: family for family in self._registry.collect()}
+        baseline = _read_baseline(self._path, self._name) if self._subtract_baseline else {}
+        for family in prometheus_multiprocess.MultiProcessCollector(None, self._path).collect():
+            if local_families.pop(family.name, None) is None:
+                continue
+            _subtract(family, baseline)
+            yield family
+        yield from local_families.values()
+
+
+class _Families:
+    """Уже прочитанные семейства метрик в виде коллектора для encoder."""
+
+    def __init__(self, families: list[Metric]):
+        self._families = families
+
+    def collect(self) -> Iterator[Metric]:
+        return iter(self._families)
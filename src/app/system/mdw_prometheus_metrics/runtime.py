@@ -0,0 +1,77 @@
+"""Метрики насыщения процесса: задержка event loop, сборка мусора, память и файловые дескрипторы.
+
+Помогают понять причину роста задержки запросов: заблокирован event loop, запросы стоят
+в очереди или процесс тратит время на сборку мусора.
+"""
+import asyncio
+import gc
+import os
+import time
+from collections import deque
+from pathlib import Path
+
+from .service.collector import ServiceCollector
+
+# Сколько пауз сборщика мусора хранить между замерами, остальные отбрасываются
+_MAX_GC_PAUSES = 1000
+_PROC_SELF = Path('/proc/self')
+
+
+def read_rss() -> int | None:
+    """Резидентная память процесса в байтах или None, если /proc недоступен."""
+    try:
+        resident_pages = int((_PROC_SELF / 'statm').read_text().split()[1])
+    except OSError:
+        return None
+    return resident_pages * os.sysconf('SC_PAGE_SIZE')
+
+
+def read_open_fds() -> int | None:
+    """Количество открытых файловых дескрипторов или None, если /proc недоступен."""
+    try:
+        return len(os.listdir(_PROC_SELF / 'fd'))
+    except OSError:
+        return None
+
+
+class RuntimeMonitor:
+    """Периодический замер состояния процесса.
+
+    Задержка event loop - насколько позже заказанного просыпается задача, которая спит interval
+    секунд. Паузы сборщика мусора замеряются через gc.callbacks: колбэк только складывает их
+    в очередь, а в метрики они пишутся из задачи замера, чтобы не брать блокировки метрик
+    посреди сборки мусора.
+    """
+
+    def __init__(self, metrics: ServiceCollector, interval: float):
+        self._metrics = metrics
+        self._interval = interval
+        # (поколение, длительность паузы)
+        self._gc_pauses: deque[tuple[int, float]] = deque(maxlen=_MAX_GC_PAUSES)
+        self._gc_started_at: float | None = None
+
+    async def run(self) -> None:
+        gc.callbacks.append(self._on_gc)
+        try:
+            while True:  # noqa: WPS457 работает до отмены задачи
+                await self.probe()
+        finally:
+            gc.callbacks.remove(self._on_gc)
+
+    async def probe(self) -> None:
+        """Один замер: спит interval секунд и записывает метрики."""
+        start_time = time.monotonic()
+        await asyncio.sleep(self._interval)
+        lag = max(0.0, time.monotonic() - start_time - self._interval)
+        self._metrics.write_event_loop_lag(lag)
+        while self._gc_pauses:
+            generation, pause_s = self._gc_pauses.popleft()
+            self._metrics.write_gc_pause(generation, pause_s)
+        self._metrics.write_process_resources(read_rss(), read_open_fds())
+
+    def _on_gc(self, phase: str, info: dict) -> None:
+        if phase == 'start':
+            self._gc_started_at = time.perf_counter()
+        elif self._gc_started_at is not None:
+            self._gc_pauses.append((info['generation'], time.perf_counter() - self._gc_started_at))
+            self._gc_started_at = None
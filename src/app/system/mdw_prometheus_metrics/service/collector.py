@@ -1,10 +1,24 @@
 import logging
+from contextlib import contextmanager
 from enum import Enum, auto
 from http import HTTPStatus
+from typing import Callable, Iterable, Iterator
 
 import prometheus_client
+from prometheus_client.core import GaugeMetricFamily
+from prometheus_client.metrics import MetricWrapperBase
 
-from .labels import DbRequestDuration, ErrorsCount, MessageBusRequestDuration, RequestDuration
+from .. import multiprocess
+from ..exemplars import current_exemplar
+from .labels import (
+    DbRequestDuration,
+    DbStatementsCount,
+    ErrorsCount,
+    MessageBusRequestDuration,
+    RequestDuration,
+    TracedOperation,
+)
+from .sketch import LatencySketches
 
 _UP_HELP = 'DP application UP status'
 _READY_HELP = 'DP application READY status'
@@ -13,10 +27,39 @@ _REQUEST_LATENCY_HELP = 'DP application request latency'
 _EXTERNAL_REQUEST_LATENCY_HELP = 'DP application external request latency'
 _CLIENT_REQUEST_LATENCY_HELP = 'DP application request latency of external services'
 _DB_REQUEST_LATENCY_HELP = 'DP application sql query latency'
+_DB_STATEMENTS_HELP = 'DP application sql queries count per request'
 _MESSAGE_BUS_REQUEST_LATENCY_HELP = 'DP application request latency of message bus'
 _ERROR_COUNTER_HELP = 'DP application errors count'
+_CACHE_REQUESTS_HELP = 'DP application cache lookups count'
+_CACHE_SAVED_TIME_HELP = 'DP application upstream time saved by cache hits'
+_CLIENT_CONNECTIONS_HELP = 'DP application connections acquired by http client'
+_CLIENT_POOL_IN_USE_HELP = 'DP application http client connections in use'
+_CLIENT_POOL_LIMIT_HELP = 'DP application http client connection pool size'
+_JOB_QUEUE_DEPTH_HELP = 'DP application background jobs waiting in queue'
+_JOB_WAIT_TIME_HELP = 'DP application background job age when picked up by worker'
+_JOB_WORKERS_BUSY_HELP = 'DP application busy background workers'
+_JOB_WORKERS_HELP = 'DP application background workers count'
+_PHOTO_PREPROCESSING_HELP = 'DP application photo preprocessing duration'
+_PHOTO_PREPROCESSING_SAVED_HELP = 'DP application bytes saved by photo preprocessing'
+_RETRY_ATTEMPTS_HELP = 'DP application retried and hedged calls to external services'
+_CIRCUIT_BREAKER_STATE_HELP = 'DP application circuit breaker state: 0 closed, 1 half-open, 2 open'
+_BULKHEAD_IN_USE_HELP = 'DP application concurrent calls to external service'
+_RESILIENCE_REJECTIONS_HELP = 'DP application calls rejected by resilience policies'
+_METRIC_SERIES_HELP = 'DP application label sets count per metric'
+_LABEL_OVERFLOWS_HELP = 'DP application observations written to overflow series'
+_METRICS_RENDER_HELP = 'DP application metrics exposition render duration'
+_METRICS_PAYLOAD_HELP = 'DP application metrics exposition response size'
+_IN_FLIGHT_HELP = 'DP application requests being handled'
+_EVENT_LOOP_LAG_HELP = 'DP application event loop lag'
+_GC_PAUSE_HELP = 'DP application garbage collector pause duration'
+_PROCESS_RSS_HELP = 'DP application resident memory size'
+_PROCESS_OPEN_FDS_HELP = 'DP application open file descriptors'
+_TRACE_SPANS_HELP = 'DP application trace spans exported, dropped or failed to export'
 _METRICS_PREFIX = 'dp_service'
 _COMPONENT = 'backend'
+# Значение лейблов серии, в которую пишутся новые наборы лейблов сверх лимита
+OVERFLOW_LABEL = 'overflow'
+_MAX_LABEL_SETS = 1000
 
 
 class Severity(Enum):
@@ -26,41 +69,97 @@ class Severity(Enum):
     MAJOR = auto()
 
 
+class _CardinalityCollector:
+    """Количество наборов лейблов у каждой метрики, чтобы алертить на рост числа серий."""
+
+    def __init__(self, service_name: str, metrics: Callable[[], Iterable[MetricWrapperBase]]):
+        self._service_name = service_name
+        self._metrics = metrics
+
+    def collect(self):
+        family = GaugeMetricFamily(
+            name=f'{_METRICS_PREFIX}_metric_series',
+            documentation=_METRIC_SERIES_HELP,
+            labels=['service', 'metric'],
+        )
+        for metric in self._metrics():
+            with metric._lock:
+                series = len(metric._metrics)
+            family.add_metric([self._service_name, metric._name], series)
+        yield family
+
+
 class ServiceCollector:  # noqa: WPS214 необходимость т.к. сервис экспортируем много метрик
     """Фасад для сбора prometheus метрик по стандарту ДП.
 
     Стандарт по сбору метрик https://virgo.ftc.ru/pages/viewpage.action?pageId=915091568
     """
 
-    def __init__(self, service_name: str):
-        """Принимает на вход название сервиса."""
+    def __init__(
+        self,
+        service_name: str,
+        max_label_sets: int = _MAX_LABEL_SETS,
+        latency_sketches: LatencySketches | None = None,
+    ):
+        """Принимает на вход название сервиса и лимит наборов лейблов у одной метрики.
+
+        latency_sketches - скетчи квантилей задержек запросов по операциям.
+        """
         self._service_name = service_name
+        self._max_label_sets = max_label_sets
+        if latency_sketches is None:
+            latency_sketches = LatencySketches(
+                max_operations=max_label_sets,
+                overflow_operation=OVERFLOW_LABEL,
+            )
+        self._latency_sketches = latency_sketches
         self.new_health_metrics()
         self.new_activity_metrics()
 
     def write_timing(self, timing_s: float, request_labels: RequestDuration) -> None:
-        """Метрика длительности запроса сервиса _http_request_duration_seconds."""
-        self._request_latency_histogram.labels(
-            service=self._service_name,
-            **request_labels.to_dict(),
+        """Метрика длительности запроса сервиса _http_request_duration_seconds.
+
+        В exemplar наблюдения пишется айди запроса, см. exemplars.
+        """
+        self._child(
+            'request_latency_histogram',
+            request_labels,
             span_kind='server',
-        ).observe(timing_s)
+        ).observe(timing_s, exemplar=current_exemplar())
+        self._latency_sketches.observe('server', request_labels.operation, timing_s)
 
     def write_external_timing(self, timing_s: float, request_labels: RequestDuration) -> None:
         """Метрика длительности запроса сервиса _http_client_request_duration_seconds."""
-        self._external_request_latency_histogram.labels(
-            service=self._service_name,
-            **request_labels.to_dict(),
+        self._child(
+            'external_request_latency_histogram',
+            request_labels,
             span_kind='client',
-        ).observe(timing_s)
+        ).observe(timing_s, exemplar=current_exemplar())
+        self._latency_sketches.observe('client', request_labels.operation, timing_s)
+
+    def write_external_connection(self, reused: bool) -> None:
+        """Метрика новых и переиспользованных соединений http-клиента _http_client_connections."""
+        self._activity.external_connections_counter.labels(
+            service=self._service_name,
+            reused=str(reused).lower(),
+        ).inc()
+
+    def write_external_pool_usage(self, in_use: int, limit: int) -> None:
+        """Метрики занятости пула соединений http-клиента _http_client_pool_in_use."""
+        self._activity.external_pool_in_use_gauge.labels(service=self._service_name).set(in_use)
+        self._activity.external_pool_limit_gauge.labels(service=self._service_name).set(limit)
 
     def write_db_timing(self, timing_s: float, db_labels: DbRequestDuration) -> None:
         """Метрика длительности запроса в бд _db_request_duration_seconds."""
-        self._db_request_latency_histogram.labels(
-            service=self._service_name,
-            **db_labels.to_dict(),
+        self._child(
+            'db_request_latency_histogram',
+            db_labels,
             span_kind='client',
-        ).observe(timing_s)
+        ).observe(timing_s, exemplar=current_exemplar())
+
+    def write_db_statements_count(self, count: int, statements_labels: DbStatementsCount) -> None:
+        """Метрика количества запросов в бд за один запрос к сервису _http_request_db_statements."""
+        self._child('db_statements_histogram', statements_labels).observe(count)
 
     def write_message_bus_consumer_timing(
         self,
@@ -68,9 +167,9 @@ class ServiceCollector:  # noqa: WPS214 необходимость т.к. сер
         message_bus_labels: MessageBusRequestDuration,
     ) -> None:
         """Метрика длительности вызова брокера очереди сообщений _message_bus_request_duration_seconds."""
-        self._message_bus_request_latency_histogram.labels(
-            service=self._service_name,
-            **message_bus_labels.to_dict(),
+        self._child(
+            'message_bus_request_latency_histogram',
+            message_bus_labels,
             span_kind='consumer',
         ).observe(timing_s)
 
@@ -80,23 +179,207 @@ class ServiceCollector:  # noqa: WPS214 необходимость т.к. сер
         message_bus_labels: MessageBusRequestDuration,
     ) -> None:
         """Метрика длительности вызова брокера очереди сообщений _message_bus_request_duration_seconds."""
-        self._message_bus_request_latency_histogram.labels(
-            service=self._service_name,
-            **message_bus_labels.to_dict(),
+        self._child(
+            'message_bus_request_latency_histogram',
+            message_bus_labels,
             span_kind='producer',
         ).observe(timing_s)
 
     def write_error(self, error_labels: ErrorsCount) -> None:
         """Метрика подсчета кол-ва ошибок _http_request_errors_count."""
-        self._errors_counter.labels(
+        self._child('errors_counter', error_labels).inc()
+
+    def write_cache_request(self, cache: str, result: str) -> None:
+        """Метрика количества обращений к кэшу _cache_requests_total."""
+        self._activity.cache_requests_counter.labels(
+            service=self._service_name,
+            cache=cache,
+            result=result,
+        ).inc()
+
+    def write_cache_saved_time(self, cache: str, saved_s: float) -> None:
+        """Метрика сэкономленного кэшем времени запросов к внешним сервисам _cache_saved_seconds."""
+        self._activity.cache_saved_seconds_counter.labels(
+            service=self._service_name,
+            cache=cache,
+        ).inc(saved_s)
+
+    def write_job_queue_depth(self, queue: str, depth: int) -> None:
+        """Метрика количества задач в очереди _background_queue_depth."""
+        self._activity.job_queue_depth_gauge.labels(
+            service=self._service_name,
+            queue=queue,
+        ).set(depth)
+
+    def write_job_wait_time(self, queue: str, wait_s: float) -> None:
+        """Метрика времени ожидания задачи в очереди _background_job_wait_seconds."""
+        self._activity.job_wait_time_histogram.labels(
+            service=self._service_name,
+            queue=queue,
+        ).observe(wait_s)
+
+    def write_job_workers(self, queue: str, busy: int, total: int) -> None:
+        """Метрики загрузки обработчиков очереди _background_workers_busy."""
+        self._activity.job_workers_busy_gauge.labels(
+            service=self._service_name,
+            queue=queue,
+        ).set(busy)
+        self._activity.job_workers_gauge.labels(service=self._service_name, queue=queue).set(total)
+
+    def write_photo_preprocessing(self, timing_s: float, saved_bytes: int) -> None:
+        """Метрики обработки фотографий _photo_preprocessing_duration_seconds."""
+        self._activity.photo_preprocessing_histogram.labels(
+            service=self._service_name,
+        ).observe(timing_s)
+        self._activity.photo_preprocessing_saved_counter.labels(
+            service=self._service_name,
+        ).inc(saved_bytes)
+
+    def write_circuit_breaker_state(self, name: str, state: int) -> None:
+        """Метрика состояния автоматического выключателя _circuit_breaker_state."""
+        self._activity.circuit_breaker_state_gauge.labels(
+            service=self._service_name,
+            name=name,
+        ).set(state)
+
+    def write_bulkhead_in_use(self, name: str, in_use: int) -> None:
+        """Метрика количества одновременных вызовов внешнего сервиса _bulkhead_in_use."""
+        self._activity.bulkhead_in_use_gauge.labels(
+            service=self._service_name,
+            name=name,
+        ).set(in_use)
+
+    def write_retry_attempt(self, name: str, kind: str) -> None:
+        """Метрика повторных и хеджирующих запросов во внешний сервис _retry_attempts."""
+        self._activity.retry_attempts_counter.labels(
+            service=self._service_name,
+            name=name,
+            kind=kind,
+        ).inc()
+
+    def write_resilience_rejection(self, name: str, reason: str) -> None:
+        """Метрика отклонённых вызовов внешнего сервиса _resilience_rejections."""
+        self._activity.resilience_rejections_counter.labels(
+            service=self._service_name,
+            name=name,
+            reason=reason,
+        ).inc()
+
+    def write_metrics_render(self, registry: str, metrics_format: str, timing_s: float) -> None:
+        """Метрика длительности рендера метрик _metrics_render_duration_seconds."""
+        self._activity.metrics_render_histogram.labels(
+            service=self._service_name,
+            registry=registry,
+            format=metrics_format,
+        ).observe(timing_s)
+
+    def write_metrics_payload(
+        self,
+        registry: str,
+        metrics_format: str,
+        encoding: str,
+        size: int,
+    ) -> None:
+        """Метрика размера ответа с метриками _metrics_payload_bytes."""
+        self._activity.metrics_payload_gauge.labels(
+            service=self._service_name,
+            registry=registry,
+            format=metrics_format,
+            encoding=encoding,
+        ).set(size)
+
+    @contextmanager
+    def track_in_flight(self, operation: str) -> Iterator[None]:
+        """Метрика количества обрабатываемых запросов _http_requests_in_flight."""
+        gauge = self._activity.in_flight_gauge.labels(
+            service=self._service_name,
+            operation=operation,
+        )
+        gauge.inc()
+        try:
+            yield
+        finally:
+            gauge.dec()
+
+    def write_event_loop_lag(self, lag_s: float) -> None:
+        """Метрика задержки event loop _event_loop_lag_seconds."""
+        self._activity.event_loop_lag_histogram.labels(service=self._service_name).observe(lag_s)
+
+    def write_gc_pause(self, generation: int, pause_s: float) -> None:
+        """Метрика пауз сборщика мусора _gc_pause_seconds, _count - число сборок."""
+        self._activity.gc_pause_histogram.labels(
+            service=self._service_name,
+            generation=str(generation),
+        ).observe(pause_s)
+
+    def write_process_resources(self, rss: int | None, open_fds: int | None) -> None:
+        """Метрики памяти _process_resident_memory_bytes и дескрипторов _process_open_fds."""
+        if rss is not None:
+            self._health.process_rss_gauge.set(rss)
+        if open_fds is not None:
+            self._health.process_open_fds_gauge.set(open_fds)
+
+    def write_trace_spans(self, result: str, count: int) -> None:
+        """Метрика отправленных и отброшенных спанов трейсинга _trace_spans."""
+        self._activity.trace_spans_counter.labels(
+            service=self._service_name,
+            result=result,
+        ).inc(count)
+
+    def _child(
+        self,
+        metric_name: str,
+        labels: TracedOperation,
+        span_kind: str | None = None,
+    ) -> MetricWrapperBase:
+        """Серия activity метрики metric_name для лейблов labels.
+
+        Серии кэшируются по объекту лейблов: повторная запись не собирает словарь лейблов
+        и не ищет серию в метрике. Серия overflow не кэшируется, чтобы кэш не рос сверх лимита.
+        Набор метрик читается один раз, чтобы серия и кэш были из одного набора.
+        """
+        activity = self._activity
+        key = (metric_name, span_kind, labels)
+        child = activity.children.get(key)
+        if child is not None:
+            return child
+        label_values = {'service': self._service_name, **labels.to_dict()}
+        if span_kind is not None:
+            label_values['span_kind'] = span_kind
+        child, overflow = self._labels(activity, getattr(activity, metric_name), **label_values)
+        if not overflow:
+            activity.children[key] = child
+        return child
+
+    def _labels(
+        self,
+        activity: '_ActivityMetrics',
+        metric: MetricWrapperBase,
+        **labels,
+    ) -> tuple[MetricWrapperBase, bool]:
+        """Серия метрики с лейблами labels и признак того, что это серия overflow.
+
+        Когда у метрики max_label_sets наборов лейблов, новые наборы не создают серий:
+        все лейблы, кроме service, заменяются на overflow.
+        """
+        key = tuple(str(labels[name]) for name in metric._labelnames)
+        with metric._lock:
+            overflow = key not in metric._metrics and len(metric._metrics) >= self._max_label_sets
+        if not overflow:
+            return metric.labels(**labels), False
+        activity.label_overflows_counter.labels(
             service=self._service_name,
-            **error_labels.to_dict(),
+            metric=metric._name,
         ).inc()
+        return metric.labels(**{
+            name: value if name == 'service' else OVERFLOW_LABEL
+            for name, value in labels.items()
+        }), True
 
     def write_up_status(self, http_status: int) -> None:
         """Метрика живучести _up."""
         status = 1 if HTTPStatus.OK <= http_status < HTTPStatus.BAD_REQUEST else 0
-        self._up_gauge.set(status)
+        self._health.up_gauge.set(status)
 
     def write_ready_status(self, http_status: int, probe=None) -> None:
         """Метрика доступности _ready."""
@@ -104,7 +387,7 @@ class ServiceCollector:  # noqa: WPS214 необходимость т.к. сер
         if probe is not None:
             logging.warning(
                 'Parameter probe is outdated. Use write_ready_component_status method instead.')
-        self._ready_gauge.set(status)
+        self._health.ready_gauge.set(status)
 
     def write_ready_component_status(
         self,
@@ -115,79 +398,318 @@ class ServiceCollector:  # noqa: WPS214 необходимость т.к. сер
     ) -> None:
         """Метрика доступности компонентов сервиса _ready_component."""
         status = 1 if HTTPStatus.OK <= http_status < HTTPStatus.BAD_REQUEST else 0
-        self._ready_component_gauge.labels(
+        self._health.ready_component_gauge.labels(
             name=self._service_name,
             component=component,
             component_type=component_type,
             severity=severity.name.lower(),
         ).set(status)
 
-    def export_health_metrics(self) -> str:
+    def export_health_metrics(
+        self,
+        encoder: multiprocess.Encoder = prometheus_client.generate_latest,
+    ) -> str:
         """Экспорт метрик здоровья для типа метрик health."""
-        return prometheus_client.generate_latest(self._health_reg)
+        return multiprocess.generate_latest(self._health.registry, 'health', encoder)
 
-    def export_activity_metrics(self) -> str:
+    def export_activity_metrics(
+        self,
+        encoder: multiprocess.Encoder = prometheus_client.generate_latest,
+    ) -> str:
         """Экспорт метрик здоровья для типа метрик activity."""
-        return prometheus_client.generate_latest(self._activity_reg)
+        return multiprocess.generate_latest(self._activity.registry, 'activity', encoder)
+
+    @property
+    def latency_sketches(self) -> LatencySketches:
+        """Скетчи квантилей задержек запросов к сервису (server) и во внешние сервисы (client)."""
+        return self._latency_sketches
+
+    def reset_activity_metrics(self) -> None:
+        """Сбрасывает activity метрики, в том числе накопленные другими воркерами."""
+        multiprocess.reset(self._activity.registry, 'activity')
+        self.new_activity_metrics()
+
+    def reset_health_metrics(self) -> None:
+        """Сбрасывает health метрики, в том числе накопленные другими воркерами."""
+        multiprocess.reset(self._health.registry, 'health')
+        self.new_health_metrics()
+
+    def snapshot_activity_metrics(
+        self,
+        encoder: multiprocess.Encoder = prometheus_client.generate_latest,
+    ) -> bytes:
+        """Экспорт activity метрик со сбросом: в следующий экспорт попадут только новые значения.
+
+        Набор метрик подменяется до экспорта, поэтому запись после подмены не теряется,
+        а попадает в следующий экспорт.
+        """
+        activity = self._activity
+        self.new_activity_metrics()
+        return multiprocess.generate_and_reset(activity.registry, 'activity', encoder)
+
+    def snapshot_health_metrics(
+        self,
+        encoder: multiprocess.Encoder = prometheus_client.generate_latest,
+    ) -> bytes:
+        """Экспорт health метрик со сбросом, см. snapshot_activity_metrics."""
+        health = self._health
+        self.new_health_metrics()
+        return multiprocess.generate_and_reset(health.registry, 'health', encoder)
 
     def new_activity_metrics(self) -> None:
-        """Инициализирует activity метрики. Может быть использовано для их пересоздания."""
-        self._activity_reg = prometheus_client.CollectorRegistry()
+        """Пересоздаёт activity метрики: новый набор собирается целиком и подменяет старый."""
+        self._activity = _ActivityMetrics(self._service_name)
+        self._latency_sketches.clear()
+
+    def new_health_metrics(self) -> None:
+        """Пересоздаёт health метрики: новый набор собирается целиком и подменяет старый."""
+        self._health = _HealthMetrics(self._service_name)
+
+
+class _ActivityMetrics:  # noqa: WPS230 метрик много, все они нужны
+    """Набор activity метрик со своим регистри.
+
+    Пересоздаётся целиком и подменяется в ServiceCollector одним присваиванием: запись идёт
+    либо в старый, либо в новый полностью собранный набор.
+    """
+
+    def __init__(self, service_name: str):
+        self.registry = prometheus_client.CollectorRegistry()
+        # Серии метрик по (метрика, span_kind, объект лейблов), см. ServiceCollector._child
+        self.children: dict[tuple, MetricWrapperBase] = {}
         service_label = 'service'
         span_kind_label = 'span_kind'
-        self._request_latency_histogram = prometheus_client.Histogram(
+        self.request_latency_histogram = prometheus_client.Histogram(
             name=f'{_METRICS_PREFIX}_http_request_duration_seconds',
             documentation=_REQUEST_LATENCY_HELP,
             labelnames=[service_label, span_kind_label] + RequestDuration.labels(),
-            registry=self._activity_reg,
+            registry=self.registry,
             buckets=(
                 .005, .01, .025, .05, .075, .1, .2, .3, .4, .5, .75,
                 1.0, 2.5, 5.0, 7.5, 10.0, float('inf'),
             ),
         )
-        self._external_request_latency_histogram = prometheus_client.Histogram(
+        self.external_request_latency_histogram = prometheus_client.Histogram(
             name=f'{_METRICS_PREFIX}_http_client_request_duration_seconds',
             documentation=_EXTERNAL_REQUEST_LATENCY_HELP,
             labelnames=[service_label, span_kind_label] + RequestDuration.labels(),
-            registry=self._activity_reg,
+            registry=self.registry,
         )
-        self._db_request_latency_histogram = prometheus_client.Histogram(
+        self.external_connections_counter = prometheus_client.Counter(
+            name=f'{_METRICS_PREFIX}_http_client_connections',
+            documentation=_CLIENT_CONNECTIONS_HELP,
+            labelnames=[service_label, 'reused'],
+            registry=self.registry,
+        )
+        self.external_pool_in_use_gauge = prometheus_client.Gauge(
+            name=f'{_METRICS_PREFIX}_http_client_pool_in_use',
+            documentation=_CLIENT_POOL_IN_USE_HELP,
+            labelnames=[service_label],
+            registry=self.registry,
+            multiprocess_mode='livesum',
+        )
+        self.external_pool_limit_gauge = prometheus_client.Gauge(
+            name=f'{_METRICS_PREFIX}_http_client_pool_limit',
+            documentation=_CLIENT_POOL_LIMIT_HELP,
+            labelnames=[service_label],
+            registry=self.registry,
+            multiprocess_mode='livesum',
+        )
+        self.db_request_latency_histogram = prometheus_client.Histogram(
             name=f'{_METRICS_PREFIX}_db_request_duration_seconds',
             documentation=_DB_REQUEST_LATENCY_HELP,
             labelnames=[service_label, span_kind_label] + DbRequestDuration.labels(),
-            registry=self._activity_reg,
+            registry=self.registry,
+        )
+        self.db_statements_histogram = prometheus_client.Histogram(
+            name=f'{_METRICS_PREFIX}_http_request_db_statements',
+            documentation=_DB_STATEMENTS_HELP,
+            labelnames=[service_label] + DbStatementsCount.labels(),
+            registry=self.registry,
+            buckets=(0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 89, float('inf')),
         )
-        self._message_bus_request_latency_histogram = prometheus_client.Histogram(
+        self.message_bus_request_latency_histogram = prometheus_client.Histogram(
             name=f'{_METRICS_PREFIX}_message_bus_request_duration_seconds',
             documentation=_MESSAGE_BUS_REQUEST_LATENCY_HELP,
             labelnames=[service_label, span_kind_label] + MessageBusRequestDuration.labels(),
-            registry=self._activity_reg,
+            registry=self.registry,
         )
-        self._errors_counter = prometheus_client.Counter(
+        self.errors_counter = prometheus_client.Counter(
             name=f'{_METRICS_PREFIX}_http_request_errors_count',
             documentation=_ERROR_COUNTER_HELP,
             labelnames=[service_label] + ErrorsCount.labels(),
-            registry=self._activity_reg,
+            registry=self.registry,
+        )
+        self.cache_requests_counter = prometheus_client.Counter(
+            name=f'{_METRICS_PREFIX}_cache_requests',
+            documentation=_CACHE_REQUESTS_HELP,
+            labelnames=[service_label, 'cache', 'result'],
+            registry=self.registry,
+        )
+        self.cache_saved_seconds_counter = prometheus_client.Counter(
+            name=f'{_METRICS_PREFIX}_cache_saved_seconds',
+            documentation=_CACHE_SAVED_TIME_HELP,
+            labelnames=[service_label, 'cache'],
+            registry=self.registry,
+        )
+        self.job_queue_depth_gauge = prometheus_client.Gauge(
+            name=f'{_METRICS_PREFIX}_background_queue_depth',
+            documentation=_JOB_QUEUE_DEPTH_HELP,
+            labelnames=[service_label, 'queue'],
+            registry=self.registry,
+            multiprocess_mode='livesum',
+        )
+        self.job_wait_time_histogram = prometheus_client.Histogram(
+            name=f'{_METRICS_PREFIX}_background_job_wait_seconds',
+            documentation=_JOB_WAIT_TIME_HELP,
+            labelnames=[service_label, 'queue'],
+            registry=self.registry,
+        )
+        self.job_workers_busy_gauge = prometheus_client.Gauge(
+            name=f'{_METRICS_PREFIX}_background_workers_busy',
+            documentation=_JOB_WORKERS_BUSY_HELP,
+            labelnames=[service_label, 'queue'],
+            registry=self.registry,
+            multiprocess_mode='livesum',
+        )
+        self.job_workers_gauge = prometheus_client.Gauge(
+            name=f'{_METRICS_PREFIX}_background_workers',
+            documentation=_JOB_WORKERS_HELP,
+            labelnames=[service_label, 'queue'],
+            registry=self.registry,
+            multiprocess_mode='livesum',
+        )
+        self.photo_preprocessing_histogram = prometheus_client.Histogram(
+            name=f'{_METRICS_PREFIX}_photo_preprocessing_duration_seconds',
+            documentation=_PHOTO_PREPROCESSING_HELP,
+            labelnames=[service_label],
+            registry=self.registry,
+        )
+        self.photo_preprocessing_saved_counter = prometheus_client.Counter(
+            name=f'{_METRICS_PREFIX}_photo_preprocessing_saved_bytes',
+            documentation=_PHOTO_PREPROCESSING_SAVED_HELP,
+            labelnames=[service_label],
+            registry=self.registry,
+        )
+        self.circuit_breaker_state_gauge = prometheus_client.Gauge(
+            name=f'{_METRICS_PREFIX}_circuit_breaker_state',
+            documentation=_CIRCUIT_BREAKER_STATE_HELP,
+            labelnames=[service_label, 'name'],
+            registry=self.registry,
+            multiprocess_mode='livemax',
+        )
+        self.bulkhead_in_use_gauge = prometheus_client.Gauge(
+            name=f'{_METRICS_PREFIX}_bulkhead_in_use',
+            documentation=_BULKHEAD_IN_USE_HELP,
+            labelnames=[service_label, 'name'],
+            registry=self.registry,
+            multiprocess_mode='livesum',
+        )
+        self.retry_attempts_counter = prometheus_client.Counter(
+            name=f'{_METRICS_PREFIX}_retry_attempts',
+            documentation=_RETRY_ATTEMPTS_HELP,
+            labelnames=[service_label, 'name', 'kind'],
+            registry=self.registry,
         )
+        self.resilience_rejections_counter = prometheus_client.Counter(
+            name=f'{_METRICS_PREFIX}_resilience_rejections',
+            documentation=_RESILIENCE_REJECTIONS_HELP,
+            labelnames=[service_label, 'name', 'reason'],
+            registry=self.registry,
+        )
+        self.label_overflows_counter = prometheus_client.Counter(
+            name=f'{_METRICS_PREFIX}_metric_label_overflows',
+            documentation=_LABEL_OVERFLOWS_HELP,
+            labelnames=[service_label, 'metric'],
+            registry=self.registry,
+        )
+        self.metrics_render_histogram = prometheus_client.Histogram(
+            name=f'{_METRICS_PREFIX}_metrics_render_duration_seconds',
+            documentation=_METRICS_RENDER_HELP,
+            labelnames=[service_label, 'registry', 'format'],
+            registry=self.registry,
+            buckets=(.001, .0025, .005, .01, .025, .05, .1, .25, .5, 1.0, float('inf')),
+        )
+        self.metrics_payload_gauge = prometheus_client.Gauge(
+            name=f'{_METRICS_PREFIX}_metrics_payload_bytes',
+            documentation=_METRICS_PAYLOAD_HELP,
+            labelnames=[service_label, 'registry', 'format', 'encoding'],
+            registry=self.registry,
+            multiprocess_mode='livemax',
+        )
+        self.in_flight_gauge = prometheus_client.Gauge(
+            name=f'{_METRICS_PREFIX}_http_requests_in_flight',
+            documentation=_IN_FLIGHT_HELP,
+            labelnames=[service_label, 'operation'],
+            registry=self.registry,
+            multiprocess_mode='livesum',
+        )
+        self.event_loop_lag_histogram = prometheus_client.Histogram(
+            name=f'{_METRICS_PREFIX}_event_loop_lag_seconds',
+            documentation=_EVENT_LOOP_LAG_HELP,
+            labelnames=[service_label],
+            registry=self.registry,
+            buckets=(.001, .0025, .005, .01, .025, .05, .1, .25, .5, 1.0, 2.5, float('inf')),
+        )
+        self.gc_pause_histogram = prometheus_client.Histogram(
+            name=f'{_METRICS_PREFIX}_gc_pause_seconds',
+            documentation=_GC_PAUSE_HELP,
+            labelnames=[service_label, 'generation'],
+            registry=self.registry,
+            buckets=(.0001, .0005, .001, .0025, .005, .01, .025, .05, .1, .25, float('inf')),
+        )
+        self.trace_spans_counter = prometheus_client.Counter(
+            name=f'{_METRICS_PREFIX}_trace_spans',
+            documentation=_TRACE_SPANS_HELP,
+            labelnames=[service_label, 'result'],
+            registry=self.registry,
+        )
+        self.registry.register(_CardinalityCollector(service_name, self.labelled_metrics))
 
-    def new_health_metrics(self) -> None:
-        """Инициализирует health метрики. Может быть использовано для их пересоздания."""
-        self._health_reg = prometheus_client.CollectorRegistry()
-        self._up_gauge = prometheus_client.Gauge(
+    def labelled_metrics(self) -> Iterable[MetricWrapperBase]:
+        """Метрики с лейблами. У метрик с заданными значениями лейблов серия всегда одна."""
+        for metric in vars(self).values():
+            if isinstance(metric, MetricWrapperBase) and metric._is_parent():
+                yield metric
+
+
+class _HealthMetrics:
+    """Набор health метрик со своим регистри, подменяется так же, как _ActivityMetrics."""
+
+    def __init__(self, service_name: str):
+        self.registry = prometheus_client.CollectorRegistry()
+        self.up_gauge = prometheus_client.Gauge(
             name=f'{_METRICS_PREFIX}_up',
             documentation=_UP_HELP,
             labelnames=['name', 'type'],
-            registry=self._health_reg,
-        ).labels(name=self._service_name, type=_COMPONENT)
-        self._ready_gauge = prometheus_client.Gauge(
+            registry=self.registry,
+            multiprocess_mode='livemax',
+        ).labels(name=service_name, type=_COMPONENT)
+        self.ready_gauge = prometheus_client.Gauge(
             name=f'{_METRICS_PREFIX}_ready',
             documentation=_READY_HELP,
             labelnames=['name', 'type'],
-            registry=self._health_reg,
-        ).labels(name=self._service_name, type=_COMPONENT)
-        self._ready_component_gauge = prometheus_client.Gauge(
+            registry=self.registry,
+            multiprocess_mode='livemin',
+        ).labels(name=service_name, type=_COMPONENT)
+        self.ready_component_gauge = prometheus_client.Gauge(
             name=f'{_METRICS_PREFIX}_ready_component',
             documentation=_READY_COMPONENT_HELP,
             labelnames=['name', 'component_type', 'component', 'severity'],
-            registry=self._health_reg,
+            registry=self.registry,
+            multiprocess_mode='livemin',
         )
+        self.process_rss_gauge = prometheus_client.Gauge(
+            name=f'{_METRICS_PREFIX}_process_resident_memory_bytes',
+            documentation=_PROCESS_RSS_HELP,
+            labelnames=['name', 'type'],
+            registry=self.registry,
+            multiprocess_mode='livesum',
+        ).labels(name=service_name, type=_COMPONENT)
+        self.process_open_fds_gauge = prometheus_client.Gauge(
+            name=f'{_METRICS_PREFIX}_process_open_fds',
+            documentation=_PROCESS_OPEN_FDS_HELP,
+            labelnames=['name', 'type'],
+            registry=self.registry,
+            multiprocess_mode='livesum',
+        ).labels(name=service_name, type=_COMPONENT)
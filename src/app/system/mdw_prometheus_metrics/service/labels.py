@@ -1,27 +1,34 @@
-from dataclasses import asdict, dataclass, fields
-from typing import Dict, List, Union
+from dataclasses import dataclass, fields
+from functools import cache
+from typing import Dict, List, Tuple, Union
 
 Primitive = Union[str, int, bool]
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class TracedOperation:
     """Класс, содержащий структуру лейблов для определенного типа операции.
 
+    Объекты неизменяемые и хешируемые: по ним кэшируются серии метрик.
     Спецификация типов операций https://virgo.ftc.ru/pages/viewpage.action?pageId=915091568
     """
 
     def to_dict(self) -> Dict[str, Primitive]:
         """Лейблы для Prometheus метрик."""
-        return asdict(self)
+        return {name: getattr(self, name) for name in self._label_names()}
 
     @classmethod
     def labels(cls) -> List[str]:
         """Хранимые обьектом лейблы."""
-        return [field.name for field in fields(cls)]
+        return list(cls._label_names())
+
+    @classmethod
+    @cache
+    def _label_names(cls) -> Tuple[str, ...]:
+        return tuple(field.name for field in fields(cls))
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class RequestDuration(TracedOperation):
     """Лейблы операций http_request_duration_seconds и http_client_request_duration_seconds.
 
@@ -41,7 +48,7 @@ class RequestDuration(TracedOperation):
         }
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class MessageBusRequestDuration(TracedOperation):
     """Лейблы операции message_bus_request_duration_seconds.
 
@@ -55,7 +62,7 @@ class MessageBusRequestDuration(TracedOperation):
     error: bool = False
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class ErrorsCount(TracedOperation):
     """Лейблы операции http_request_errors_count."""
 
@@ -64,7 +71,14 @@ class ErrorsCount(TracedOperation):
     error_text: str
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
+class DbStatementsCount(TracedOperation):
+    """Лейблы операции http_request_db_statements."""
+
+    operation: str
+
+
+@dataclass(frozen=True, slots=True)
 class DbRequestDuration(TracedOperation):
     """Лейблы операции db_request_duration_seconds."""
 
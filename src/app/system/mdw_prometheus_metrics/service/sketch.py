@@ -0,0 +1,160 @@
+"""Квантили задержек по скользящему окну без потери точности на фиксированных бакетах.
+
+Используется логарифмический скетч (DDSketch): значение попадает в бин с номером
+ceil(log_gamma(value)), поэтому квантиль считается с заданной относительной погрешностью
+для любого диапазона значений, а скетчи разных интервалов складываются без потерь.
+"""
+import math
+import time
+from typing import Iterable
+
+# Значения меньше считаются нулевыми: логарифм от них не имеет смысла для задержек
+_MIN_VALUE = 1e-9
+
+
+class DDSketch:
+    """Скетч значений с относительной погрешностью квантилей relative_accuracy.
+
+    Количество бинов ограничено max_bins: при переполнении сливаются бины самых малых значений,
+    так что точность сохраняется для верхних квантилей.
+    """
+
+    __slots__ = ('_gamma', '_log_gamma', '_max_bins', '_bins', '_zero_count', 'count')
+
+    def __init__(self, relative_accuracy: float, max_bins: int):
+        self._gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self._gamma)
+        self._max_bins = max_bins
+        self._bins: dict[int, int] = {}
+        self._zero_count = 0
+        self.count = 0
+
+    def add(self, value: float) -> None:
+        self.count += 1
+        if value < _MIN_VALUE:
+            self._zero_count += 1
+            return
+        key = math.ceil(math.log(value) / self._log_gamma)
+        self._bins[key] = self._bins.get(key, 0) + 1
+        if len(self._bins) > self._max_bins:
+            self._collapse()
+
+    def merge(self, other: 'DDSketch') -> None:
+        self.count += other.count
+        self._zero_count += other._zero_count
+        for key, count in other._bins.items():
+            self._bins[key] = self._bins.get(key, 0) + count
+        while len(self._bins) > self._max_bins:
+            self._collapse()
+
+    def clear(self) -> None:
+        self._bins.clear()
+        self._zero_count = 0
+        self.count = 0
+
+    def quantile(self, q: float) -> float | None:
+        """Значение квантиля q от 0 до 1 или None, если значений нет."""
+        if not self.count:
+            return None
+        rank = q * (self.count - 1)
+        seen = self._zero_count
+        if seen > rank:
+            return 0.0
+        for key in sorted(self._bins):
+            seen += self._bins[key]
+            if seen > rank:
+                return 2 * self._gamma ** key / (self._gamma + 1)
+        return 2 * self._gamma ** max(self._bins) / (self._gamma + 1)
+
+    def _collapse(self) -> None:
+        lowest = min(self._bins)
+        count = self._bins.pop(lowest)
+        second = min(self._bins)
+        self._bins[second] += count
+
+
+class RollingSketch:
+    """Скетч значений за последние window секунд.
+
+    Окно разбито на slots интервалов со своим скетчем: устаревший интервал очищается
+    при записи в него, а квантили считаются по слиянию актуальных интервалов.
+    """
+
+    __slots__ = ('_slot_duration', '_slots', '_slot_ids', '_relative_accuracy', '_max_bins')
+
+    def __init__(self, window: float, slots: int, relative_accuracy: float, max_bins: int):
+        self._slot_duration = window / slots
+        self._relative_accuracy = relative_accuracy
+        self._max_bins = max_bins
+        self._slots = [DDSketch(relative_accuracy, max_bins) for _ in range(slots)]
+        self._slot_ids = [-1] * slots
+
+    def add(self, value: float, now: float) -> None:
+        slot_id = int(now // self._slot_duration)
+        position = slot_id % len(self._slots)
+        if self._slot_ids[position] != slot_id:
+            self._slots[position].clear()
+            self._slot_ids[position] = slot_id
+        self._slots[position].add(value)
+
+    def merged(self, now: float) -> DDSketch:
+        """Скетч всех значений окна."""
+        oldest_slot_id = int(now // self._slot_duration) - len(self._slots)
+        merged = DDSketch(self._relative_accuracy, self._max_bins)
+        for slot_id, sketch in zip(self._slot_ids, self._slots):
+            if slot_id > oldest_slot_id:
+                merged.merge(sketch)
+        return merged
+
+
+class LatencySketches:
+    """Скользящие скетчи задержек по виду запроса (server или client) и операции.
+
+    Память на операцию постоянна, а число операций ограничено max_operations: задержки новых
+    операций сверх лимита пишутся в операцию overflow_operation.
+    """
+
+    def __init__(
+        self,
+        window: float = 60,
+        slots: int = 6,
+        relative_accuracy: float = 0.01,
+        max_bins: int = 2048,
+        max_operations: int = 1000,
+        overflow_operation: str = 'overflow',
+    ):
+        self.window = window
+        self._slots = slots
+        self._relative_accuracy = relative_accuracy
+        self._max_bins = max_bins
+        self._max_operations = max_operations
+        self._overflow_operation = overflow_operation
+        self._sketches: dict[tuple[str, str], RollingSketch] = {}
+
+    def observe(self, kind: str, operation: str, value: float) -> None:
+        sketch = self._sketches.get((kind, operation))
+        if sketch is None:
+            if len(self._sketches) >= self._max_operations:
+                operation = self._overflow_operation
+            sketch = self._sketches.setdefault(
+                (kind, operation),
+                RollingSketch(self.window, self._slots, self._relative_accuracy, self._max_bins),
+            )
+        sketch.add(value, time.monotonic())
+
+    def quantiles(
+        self,
+        qs: Iterable[float],
+    ) -> list[tuple[str, str, int, dict[float, float | None]]]:
+        """Квантили qs за окно: (вид, операция, количество значений, квантиль -> значение)."""
+        now = time.monotonic()
+        qs = tuple(qs)
+        report = []
+        for (kind, operation), sketch in sorted(self._sketches.items()):
+            merged = sketch.merged(now)
+            if merged.count:
+                report.append((kind, operation, merged.count, {q: merged.quantile(q) for q in qs}))
+        return report
+
+    def clear(self) -> None:
+        self._sketches.clear()
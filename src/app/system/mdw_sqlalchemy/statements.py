@@ -0,0 +1,55 @@
+from contextvars import ContextVar
+from dataclasses import dataclass
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+
+@dataclass
+class StatementsCounter:
+    """Количество SQL-запросов, выполненных в рамках одного HTTP-запроса, и его операция."""
+
+    count: int = 0
+    operation: str | None = None
+
+
+# Счётчик изменяемый: значение ContextVar копируется в дочерние задачи и гринлеты
+# SQLAlchemy, а сам объект у них общий.
+statements_counter: ContextVar[StatementsCounter | None] = ContextVar(
+    'statements_counter',
+    default=None,
+)
+
+_strict_budget = False
+
+
+class StatementsBudgetExceeded(Exception):
+    """Хендлер выполнил больше SQL-запросов, чем заявлено в бюджете."""
+
+
+def start_counting(operation: str | None = None) -> StatementsCounter:
+    """Начинает подсчёт запросов операции operation в текущем контексте."""
+    counter = StatementsCounter(operation=operation)
+    statements_counter.set(counter)
+    return counter
+
+
+def set_strict_budget(strict: bool) -> None:
+    """Превышение бюджета: True - исключение (тесты), False - предупреждение в логе."""
+    global _strict_budget
+    _strict_budget = strict
+
+
+def is_strict_budget() -> bool:
+    return _strict_budget
+
+
+def _on_before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    counter = statements_counter.get()
+    if counter is not None:
+        counter.count += 1
+
+
+def count_statements(engine: AsyncEngine) -> None:
+    """Подключает подсчёт запросов к движку."""
+    event.listen(engine.sync_engine, 'before_cursor_execute', _on_before_cursor_execute)
@@ -0,0 +1,67 @@
+import time
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.system.mdw_prometheus_metrics import global_registry
+from app.system.mdw_prometheus_metrics.service.labels import DbRequestDuration
+from app.system.mdw_tracing.spans import CLIENT, finish_span, start_span
+
+from .statements import statements_counter
+
+# Операция запросов, выполненных вне HTTP-запроса: фоновые задачи, миграции, проверки
+BACKGROUND_OPERATION = 'background'
+_UNKNOWN_STATEMENT = 'UNKNOWN'
+# В спан пишется текст запроса без параметров, длинные запросы обрезаются
+_MAX_STATEMENT_LENGTH = 1000
+
+
+def statement_kind(statement: str) -> str:
+    """Тип SQL-запроса по первому слову: SELECT, INSERT и т.д., сам текст в лейбл не пишется."""
+    words = statement.split(None, 1)
+    return words[0].upper() if words else _UNKNOWN_STATEMENT
+
+
+def time_statements(engine: AsyncEngine) -> None:
+    """Подключает к движку метрику длительности SQL-запросов _db_request_duration_seconds.
+
+    SQL-запросы, выполненные в трейсе HTTP-запроса, также записываются спанами.
+    """
+    db_type = engine.dialect.name
+    db_user = engine.url.username or ''
+    db_instance = engine.url.database or ''
+
+    def on_before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        context.mdw_start_time = time.monotonic()
+        context.mdw_span = start_span(f'{db_type} {statement_kind(statement)}', CLIENT)
+
+    def on_after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        finish(context, statement, error=False)
+
+    def on_handle_error(exception_context):
+        context = exception_context.execution_context
+        if context is not None and hasattr(context, 'mdw_start_time'):
+            finish(context, exception_context.statement or '', error=True)
+
+    def finish(context, statement: str, error: bool) -> None:
+        counter = statements_counter.get()
+        operation = BACKGROUND_OPERATION
+        if counter is not None and counter.operation is not None:
+            operation = counter.operation
+        db_labels = DbRequestDuration(
+            operation=operation,
+            db_type=db_type,
+            db_user=db_user,
+            db_statement=statement_kind(statement),
+            error=error,
+        )
+        global_registry().write_db_timing(time.monotonic() - context.mdw_start_time, db_labels)
+        if context.mdw_span is not None:
+            tags = db_labels.to_span_tags()
+            tags['db.instance'] = db_instance
+            tags['db.statement'] = statement[:_MAX_STATEMENT_LENGTH]
+            finish_span(context.mdw_span, tags, error=error)
+
+    event.listen(engine.sync_engine, 'before_cursor_execute', on_before_cursor_execute)
+    event.listen(engine.sync_engine, 'after_cursor_execute', on_after_cursor_execute)
+    event.listen(engine.sync_engine, 'handle_error', on_handle_error)
@@ -0,0 +1,17 @@
+from .tracer import Tracer
+
+_tracer: Tracer = Tracer()
+
+
+def global_tracer() -> Tracer:
+    """Возвращает глобальный трейсер сервиса. До инициализации трейсинг выключен."""
+    return _tracer
+
+
+def set_global_tracer(new_tracer: Tracer):
+    """Устанавливает глобальный трейсер."""
+    if not isinstance(new_tracer, Tracer):
+        raise TypeError('The global tracer must be Tracer type or inherits it.')
+
+    global _tracer
+    _tracer = new_tracer
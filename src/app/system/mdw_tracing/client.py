@@ -0,0 +1,85 @@
+from http import HTTPStatus
+from types import SimpleNamespace
+from typing import Callable
+
+from aiohttp import (
+    ClientSession,
+    TraceConfig,
+    TraceRequestEndParams,
+    TraceRequestExceptionParams,
+    TraceRequestStartParams,
+)
+
+from app.system.mdw_prometheus_metrics.service.labels import RequestDuration
+
+from .spans import CLIENT, Span, finish_span, start_span
+
+
+class TracingNamespace(SimpleNamespace):
+    """Неймспейс для передачи спана между этапами http запроса."""
+
+    mdw_span: Span | None
+
+
+OperationBuilder = Callable[[ClientSession, SimpleNamespace, TraceRequestStartParams], str]
+
+
+def _on_request_start_factory(operation_builder: OperationBuilder):
+    async def factory(
+        session: ClientSession,
+        trace_config_ctx,
+        params: TraceRequestStartParams,
+    ) -> None:
+        trace_config_ctx.mdw_span = start_span(
+            operation_builder(session, trace_config_ctx, params),
+            CLIENT,
+            {'http.method': params.method, 'http.url': str(params.url.with_query(None))},
+        )
+
+    return factory
+
+
+async def _on_request_end(
+    session: ClientSession,
+    trace_config_ctx,
+    params: TraceRequestEndParams,
+) -> None:
+    span = trace_config_ctx.mdw_span
+    if span is not None:
+        finish_span(span, RequestDuration(
+            operation=span.name,
+            http_status_code=params.response.status,
+            error=False,
+        ).to_span_tags())
+
+
+async def _on_request_exception(
+    session: ClientSession,
+    trace_config_ctx,
+    params: TraceRequestExceptionParams,
+) -> None:
+    span = trace_config_ctx.mdw_span
+    if span is not None:
+        request_labels = RequestDuration(
+            operation=span.name,
+            http_status_code=HTTPStatus.INTERNAL_SERVER_ERROR.value,
+            error=True,
+        )
+        finish_span(span, request_labels.to_span_tags(), error=request_labels.error)
+
+
+def get_tracing_config(operation_builder: OperationBuilder) -> TraceConfig:
+    """Создаёт TraceConfig, который записывает запросы ClientSession спанами трейса запроса.
+
+    Args:
+        operation_builder: функция для построения имени спана по http запросу,
+            обычно та же, что строит операцию для метрик.
+
+    Returns:
+        Настроенный TraceConfig
+    """
+    trace_config = TraceConfig(trace_config_ctx_factory=TracingNamespace)
+    trace_config.on_request_start.append(_on_request_start_factory(operation_builder))
+    trace_config.on_request_end.append(_on_request_end)
+    trace_config.on_request_exception.append(_on_request_exception)
+    return trace_config
@@ -0,0 +1,200 @@
+"""Фоновая отправка спанов пачками.
+
+Запрос только кладёт спаны своего трейса в очередь, а сериализация и запись в файл или
+коллектор происходят в фоновой задаче. Если экспорт не успевает, новые спаны отбрасываются:
+очередь ограничена, и трейсинг не должен расти в памяти.
+"""
+import asyncio
+import json
+import logging
+from abc import ABC, abstractmethod
+from collections import deque
+from pathlib import Path
+from typing import Any
+
+import aiohttp
+
+from app.system.mdw_prometheus_metrics.service.collector import ServiceCollector
+
+from .spans import CLIENT, INTERNAL, SERVER, Span
+
+logger = logging.getLogger(__name__)
+
+# Коды SpanKind и StatusCode из спецификации OTLP
+_OTLP_SPAN_KINDS = {INTERNAL: 1, SERVER: 2, CLIENT: 3}
+_OTLP_STATUS_OK = 1
+_OTLP_STATUS_ERROR = 2
+_NANOSECONDS = 1_000_000_000
+
+
+class SpanExporter(ABC):
+    """Отправка пачки завершённых спанов."""
+
+    @abstractmethod
+    async def export(self, spans: list[Span]) -> None:
+        """Отправляет пачку спанов. Исключение означает, что пачка потеряна."""
+
+    async def close(self) -> None:
+        """Освобождает ресурсы экспортера."""
+
+
+class InMemorySpanExporter(SpanExporter):
+    """Копит спаны в памяти. Для тестов."""
+
+    def __init__(self):
+        self.spans: list[dict[str, Any]] = []
+
+    async def export(self, spans: list[Span]) -> None:
+        self.spans.extend(span.to_dict() for span in spans)
+
+
+class FileSpanExporter(SpanExporter):
+    """Дописывает спаны в файл, по одному JSON на строку. Для локального запуска."""
+
+    def __init__(self, path: str):
+        self._path = Path(path)
+
+    async def export(self, spans: list[Span]) -> None:
+        lines = ''.join(
+            json.dumps(span.to_dict(), ensure_ascii=False, default=str) + '\n'
+            for span in spans
+        )
+        await asyncio.to_thread(self._append, lines)
+
+    def _append(self, lines: str) -> None:
+        with self._path.open('a', encoding='utf-8') as spans_file:
+            spans_file.write(lines)
+
+
+class OtlpSpanExporter(SpanExporter):
+    """Отправляет спаны в коллектор по OTLP/HTTP в JSON-кодировке (POST /v1/traces).
+
+    Подходит для OpenTelemetry Collector и Jaeger с включённым приёмом OTLP. Запросы идут
+    через свою сессию без трейс-конфига, чтобы экспорт не порождал спанов и метрик клиента.
+    """
+
+    def __init__(self, url: str, service_name: str, timeout: float):
+        self._url = url
+        self._service_name = service_name
+        self._timeout = aiohttp.ClientTimeout(total=timeout)
+        self._session: aiohttp.ClientSession | None = None
+
+    async def export(self, spans: list[Span]) -> None:
+        if self._session is None:
+            self._session = aiohttp.ClientSession(timeout=self._timeout)
+        async with self._session.post(self._url, json=self.payload(spans)) as response:
+            response.raise_for_status()
+
+    async def close(self) -> None:
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    def payload(self, spans: list[Span]) -> dict[str, Any]:
+        """Тело запроса ExportTraceServiceRequest."""
+        return {
+            'resourceSpans': [{
+                'resource': {
+                    'attributes': [_otlp_attribute('service.name', self._service_name)],
+                },
+                'scopeSpans': [{
+                    'scope': {'name': 'app.system.mdw_tracing'},
+                    'spans': [_otlp_span(span) for span in spans],
+                }],
+            }],
+        }
+
+
+def _otlp_span(span: Span) -> dict[str, Any]:
+    start_ns = int(span.start_time * _NANOSECONDS)
+    otlp_span = {
+        'traceId': span.trace_id,
+        'spanId': span.span_id,
+        'name': span.name,
+        'kind': _OTLP_SPAN_KINDS.get(span.kind, _OTLP_SPAN_KINDS[INTERNAL]),
+        'startTimeUnixNano': str(start_ns),
+        'endTimeUnixNano': str(start_ns + int((span.duration or 0) * _NANOSECONDS)),
+        'attributes': [_otlp_attribute(key, value) for key, value in span.tags.items()],
+        'status': {'code': _OTLP_STATUS_ERROR if span.error else _OTLP_STATUS_OK},
+    }
+    if span.parent_id is not None:
+        otlp_span['parentSpanId'] = span.parent_id
+    return otlp_span
+
+
+def _otlp_attribute(key: str, value: Any) -> dict[str, Any]:
+    if isinstance(value, bool):
+        otlp_value = {'boolValue': value}
+    elif isinstance(value, int):
+        otlp_value = {'intValue': str(value)}
+    elif isinstance(value, float):
+        otlp_value = {'doubleValue': value}
+    else:
+        otlp_value = {'stringValue': str(value)}
+    return {'key': key, 'value': otlp_value}
+
+
+class BatchSpanProcessor:
+    """Очередь спанов, которую фоновая задача run отправляет в exporter пачками.
+
+    Пачка уходит, когда набралось batch_size спанов или прошло flush_interval секунд.
+    В очереди не больше max_queue_size спанов, трейсы сверх лимита отбрасываются целиком.
+    """
+
+    def __init__(
+        self,
+        exporter: SpanExporter,
+        metrics: ServiceCollector,
+        batch_size: int,
+        flush_interval: float,
+        max_queue_size: int,
+    ):
+        self._exporter = exporter
+        self._metrics = metrics
+        self._batch_size = batch_size
+        self._flush_interval = flush_interval
+        self._max_queue_size = max_queue_size
+        self._queue: deque[Span] = deque()
+        self._batch_ready = asyncio.Event()
+
+    def submit(self, spans: list[Span]) -> None:
+        """Кладёт копию спанов трейса в очередь, не дожидаясь отправки.
+
+        Трейс, не помещающийся в очередь, отбрасывается целиком: без корневого спана
+        остальные спаны не собрать в трейс.
+        """
+        if len(self._queue) + len(spans) > self._max_queue_size:
+            self._metrics.write_trace_spans('dropped', len(spans))
+            return
+        self._queue.extend(list(spans))
+        if len(self._queue) >= self._batch_size:
+            self._batch_ready.set()
+
+    async def run(self) -> None:
+        while True:  # noqa: WPS457 работает до отмены задачи
+            try:
+                await asyncio.wait_for(self._batch_ready.wait(), self._flush_interval)
+            except asyncio.TimeoutError:
+                pass  # noqa: WPS420 пачка уходит и по таймауту
+            self._batch_ready.clear()
+            await self.flush()
+
+    async def flush(self) -> None:
+        """Отправляет все спаны очереди."""
+        while self._queue:
+            batch = [
+                self._queue.popleft()
+                for _ in range(min(self._batch_size, len(self._queue)))
+            ]
+            try:
+                await self._exporter.export(batch)
+            except Exception:
+                logger.exception('Failed to export %s spans', len(batch))
+                self._metrics.write_trace_spans('failed', len(batch))
+            else:
+                self._metrics.write_trace_spans('exported', len(batch))
+
+    async def shutdown(self) -> None:
+        """Отправляет оставшиеся спаны и закрывает exporter."""
+        await self.flush()
+        await self._exporter.close()
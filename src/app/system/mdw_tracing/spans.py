@@ -0,0 +1,134 @@
+"""Спаны запроса: что и сколько времени заняло при обработке одного HTTP-запроса.
+
+Текущий спан хранится в ContextVar, поэтому спаны SQL-запросов и запросов во внешние сервисы
+из дочерних задач и гринлетов SQLAlchemy попадают в трейс запроса. Вне трейса (фоновые задачи,
+запрос не попал в выборку) спаны не создаются.
+"""
+import random
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Iterator
+
+SERVER = 'server'
+CLIENT = 'client'
+INTERNAL = 'internal'
+
+
+@dataclass(slots=True)
+class Span:
+    """Операция трейса: время начала в секундах unix time, длительность в секундах и теги."""
+
+    trace: '_Trace' = field(repr=False)
+    span_id: str
+    parent_id: str | None
+    name: str
+    kind: str
+    start_time: float = field(default_factory=time.time)
+    start_monotonic: float = field(default_factory=time.monotonic)
+    duration: float | None = None
+    error: bool = False
+    tags: dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def trace_id(self) -> str:
+        return self.trace.trace_id
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            'trace_id': self.trace_id,
+            'span_id': self.span_id,
+            'parent_id': self.parent_id,
+            'name': self.name,
+            'kind': self.kind,
+            'start_time': self.start_time,
+            'duration': self.duration,
+            'error': self.error,
+            'tags': self.tags,
+        }
+
+
+@dataclass(slots=True)
+class _Trace:
+    """Завершённые спаны трейса, не больше max_spans: остальные только считаются."""
+
+    trace_id: str
+    max_spans: int
+    spans: list[Span] = field(default_factory=list)
+    dropped: int = 0
+    error: bool = False
+
+
+current_span: ContextVar[Span | None] = ContextVar('current_span', default=None)
+
+
+def new_trace_id() -> str:
+    return f'{random.getrandbits(128):032x}'
+
+
+def new_span_id() -> str:
+    return f'{random.getrandbits(64):016x}'
+
+
+def start_root(name: str, kind: str, max_spans: int) -> Span:
+    """Корневой спан нового трейса, текущим не становится."""
+    trace = _Trace(trace_id=new_trace_id(), max_spans=max_spans)
+    return Span(trace=trace, span_id=new_span_id(), parent_id=None, name=name, kind=kind)
+
+
+def start_span(name: str, kind: str, tags: dict[str, Any] | None = None) -> Span | None:
+    """Дочерний спан текущего спана или None, если текущего трейса нет.
+
+    Текущим новый спан не становится: так начинаются спаны из хуков, где нет своего контекста,
+    например из событий движка SQLAlchemy и трейс-конфига aiohttp.
+    """
+    parent = current_span.get()
+    if parent is None:
+        return None
+    return Span(
+        trace=parent.trace,
+        span_id=new_span_id(),
+        parent_id=parent.span_id,
+        name=name,
+        kind=kind,
+        tags=tags or {},
+    )
+
+
+def finish_span(span: Span, tags: dict[str, Any] | None = None, error: bool = False) -> None:
+    """Завершает спан и добавляет его в трейс."""
+    span.duration = time.monotonic() - span.start_monotonic
+    if tags:
+        span.tags.update(tags)
+    span.error = span.error or error
+    trace = span.trace
+    trace.error = trace.error or span.error
+    # Корневой спан попадает в трейс всегда: без него трейс не собрать
+    if len(trace.spans) < trace.max_spans or span.parent_id is None:
+        trace.spans.append(span)
+    else:
+        trace.dropped += 1
+
+
+@contextmanager
+def child_span(
+    name: str,
+    kind: str = INTERNAL,
+    tags: dict[str, Any] | None = None,
+) -> Iterator[Span | None]:
+    """Спан блока кода, на время блока он текущий: вложенные спаны становятся его дочерними."""
+    child = start_span(name, kind, tags)
+    if child is None:
+        yield None
+        return
+    token = current_span.set(child)
+    error = False
+    try:
+        yield child
+    except Exception:
+        error = True
+        raise
+    finally:
+        current_span.reset(token)
+        finish_span(child, error=error)
@@ -0,0 +1,64 @@
+import random
+from contextlib import contextmanager
+from typing import Iterator
+
+from .export import BatchSpanProcessor
+from .spans import SERVER, Span, current_span, finish_span, start_root
+
+
+class Tracer:
+    """Трейсы HTTP-запросов с выборкой в начале и в конце запроса.
+
+    В начале запроса (head) трейс записывается с вероятностью head_sample_rate, остальные
+    запросы спанов не создают. Записанный трейс в конце запроса (tail) отправляется всегда,
+    если в нём была ошибка или он длился не меньше slow_threshold секунд, а остальные -
+    с вероятностью tail_sample_rate. Без processor трейсинг выключен.
+    """
+
+    def __init__(
+        self,
+        processor: BatchSpanProcessor | None = None,
+        head_sample_rate: float = 1.0,
+        slow_threshold: float = 0.5,
+        tail_sample_rate: float = 0.1,
+        max_spans: int = 256,
+    ):
+        self.processor = processor
+        self._head_sample_rate = head_sample_rate
+        self._slow_threshold = slow_threshold
+        self._tail_sample_rate = tail_sample_rate
+        self._max_spans = max_spans
+
+    @contextmanager
+    def trace(self, name: str, kind: str = SERVER) -> Iterator[Span | None]:
+        """Трейс блока кода с корневым спаном name или None, если трейс не в выборке.
+
+        Имя и теги корневого спана можно дополнить внутри блока, когда они станут известны.
+        """
+        if self.processor is None or random.random() >= self._head_sample_rate:
+            yield None
+            return
+        root = start_root(name, kind, self._max_spans)
+        token = current_span.set(root)
+        error = False
+        try:
+            yield root
+        except Exception:
+            error = True
+            raise
+        finally:
+            current_span.reset(token)
+            finish_span(root, error=error)
+            self._finish_trace(root)
+
+    def _finish_trace(self, root: Span) -> None:
+        trace = root.trace
+        if trace.dropped:
+            root.tags['dropped_spans'] = trace.dropped
+        keep = (
+            trace.error
+            or root.duration >= self._slow_threshold
+            or random.random() < self._tail_sample_rate
+        )
+        if keep:
+            self.processor.submit(trace.spans)
@@ -6,16 +6,22 @@ from fastapi.middleware.cors import CORSMiddleware
 from starlette.exceptions import HTTPException
 from starlette.middleware.base import BaseHTTPMiddleware
 
-from app.system.mdw_fastapi.middlewares import errors, metrics
+from app.system.mdw_fastapi.middlewares import errors, metrics, tracing
 from app.system.mdw_logging import context as mdw_log_context
+from app.system.mdw_prometheus_metrics import exemplars
 
 
 async def _context_middleware(request: Request, call_next):
-    """Обогащает логи контекстными переменными - айди запроса, endpoint."""
+    """Обогащает логи контекстными переменными - айди запроса, endpoint.
+
+    Айди запроса также попадает в exemplars гистограмм задержек.
+    """
+    request_uid = str(uuid4())
     mdw_log_context.additional_context.set({
         'service_endpoint': '{method} {path}'.format(method=request.method, path=request.url.path),
-        'service_request_uid': str(uuid4()),
+        'service_request_uid': request_uid,
     })
+    exemplars.set_request_id(request_uid)
     return await call_next(request)
 
 
@@ -31,6 +37,7 @@ def setup_middlewares(app: FastAPI):
 
     app.add_middleware(BaseHTTPMiddleware, dispatch=errors.errors_middleware)
     app.add_middleware(BaseHTTPMiddleware, dispatch=metrics.metrics_middleware)
+    app.add_middleware(BaseHTTPMiddleware, dispatch=tracing.tracing_middleware)
     app.add_middleware(BaseHTTPMiddleware, dispatch=_context_middleware)
 
     app.add_exception_handler(HTTPException, errors.handle_http_exception)
@@ -1,60 +1,193 @@
+import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import suppress
 from functools import partial
 
 import aiohttp
 from dependency_injector.containers import DeclarativeContainer, WiringConfiguration
-from dependency_injector.providers import Configuration, Factory, Resource, Singleton
+from dependency_injector.providers import (
+    Callable,
+    Configuration,
+    Factory,
+    Resource,
+    Selector,
+    Singleton,
+)
 from fastapi import FastAPI
 
+from app.config import ConnectorConfig, PhotoCacheConfig, PhotoPreprocessingConfig
+from app.external import resilience
 from app.external.db.database import Database
-from app.external.metrics_config import get_metrics_config, simple_metrics_operation_builder
+from app.external.metrics_config import OperationTemplates, get_metrics_config
+from app.external.outbox_publishers import FilePublisher, InMemoryPublisher
+from app.external.retries import RetryPolicy
+from app.repositories import memory, sql
+from app.services.analytics import BusinessMetrics
 from app.services.credit_cards import CreditCardService
+from app.services.export import ExportService
+from app.services.outbox import OutboxDispatcher
 from app.services.photo import PhotoService
+from app.services.photo_cache import PhotoVerdictCache
+from app.services.photo_jobs import PhotoJobService
+from app.services.photo_preprocessing import PhotoPreprocessor
 from app.services.security import SecurityService
 from app.services.users import UserService
-from app.system.mdw_prometheus_metrics import global_registry
-from app.system.mdw_prometheus_metrics.service.collector import Severity
+from app.system.mdw_prometheus_metrics import global_analytics_registry, global_registry
+from app.system.mdw_prometheus_metrics.exposition import MetricsExposition
+from app.system.mdw_prometheus_metrics.runtime import RuntimeMonitor
+from app.system.mdw_prometheus_metrics.service.collector import ServiceCollector, Severity
 from app.system.mdw_prometheus_metrics.service.external import (
     Component,
     ExternalComponentsChecker,
     collect_component_metrics,
     log_check_exception,
 )
+from app.system.mdw_tracing import Tracer, global_tracer
+from app.system.mdw_tracing.client import get_tracing_config
 
 
 def _setup_components_checker(
     db: Database,
     photo_service: PhotoService,
+    storage_backend: str,
 ):
-    return ExternalComponentsChecker(
-        callbacks=[
-            partial(collect_component_metrics, global_registry()),
-            log_check_exception,
-        ],
-        components=[
+    components = [
+        Component(
+            name='photo_service',
+            type='service',
+            severity=Severity.MINOR,
+            checker=photo_service.is_connected,
+        ),
+    ]
+    if storage_backend == 'postgres':
+        components.append(
             Component(
                 name='postgres',
                 type='database',
                 severity=Severity.MAJOR,
                 checker=db.is_connected,
             ),
-            Component(
-                name='photo_service',
-                type='service',
-                severity=Severity.MINOR,
-                checker=photo_service.is_connected,
-            ),
+        )
+    return ExternalComponentsChecker(
+        callbacks=[
+            partial(collect_component_metrics, global_registry()),
+            log_check_exception,
         ],
+        components=components,
     )
 
 
-async def _setup_client_session():
+def _setup_operation_templates(photo_service_url: str) -> OperationTemplates:
+    """Шаблоны операций запросов во внешние сервисы для метрик HTTP-клиента."""
+    templates = OperationTemplates()
+    for method, path in PhotoService.operations:
+        templates.add(photo_service_url, method, path)
+    return templates
+
+
+async def _setup_client_session(
+    connector: ConnectorConfig,
+    operation_templates: OperationTemplates,
+):
     """Подготавливает клиента для HTTP-запросов с кэшированием во внешние сервисы."""
-    trace_config = get_metrics_config(simple_metrics_operation_builder)
-    session = aiohttp.ClientSession(trace_configs=[trace_config])
+    trace_config = get_metrics_config(operation_templates)
+    tracing_config = get_tracing_config(operation_templates)
+    session = aiohttp.ClientSession(
+        connector=aiohttp.TCPConnector(
+            limit=connector.limit,
+            limit_per_host=connector.limit_per_host,
+            keepalive_timeout=connector.keepalive_timeout,
+            ttl_dns_cache=connector.ttl_dns_cache,
+        ),
+        trace_configs=[trace_config, tracing_config],
+    )
     yield session
     await session.close()
 
 
+async def _run_outbox_dispatcher(dispatcher: OutboxDispatcher, enabled: bool):
+    """Разбирает outbox в фоне на время жизни приложения."""
+    if not enabled:
+        yield None
+        return
+    task = asyncio.create_task(dispatcher.run())
+    yield task
+    task.cancel()
+    with suppress(asyncio.CancelledError):
+        await task
+
+
+async def _run_photo_job_workers(photo_job_service: PhotoJobService):
+    """Запускает пул обработчиков фоновой проверки фотографий."""
+    task = asyncio.create_task(photo_job_service.run())
+    yield task
+    task.cancel()
+    with suppress(asyncio.CancelledError):
+        await task
+
+
+async def _run_runtime_monitor(monitor: RuntimeMonitor, enabled: bool):
+    """Замеряет задержку event loop и ресурсы процесса на время жизни приложения."""
+    if not enabled:
+        yield None
+        return
+    task = asyncio.create_task(monitor.run())
+    yield task
+    task.cancel()
+    with suppress(asyncio.CancelledError):
+        await task
+
+
+async def _run_span_processor(tracer: Tracer):
+    """Отправляет спаны трейсов в фоне на время жизни приложения."""
+    processor = tracer.processor
+    if processor is None:
+        yield None
+        return
+    task = asyncio.create_task(processor.run())
+    yield task
+    task.cancel()
+    with suppress(asyncio.CancelledError):
+        await task
+    await processor.shutdown()
+
+
+async def _setup_photo_preprocessor(
+    config: PhotoPreprocessingConfig,
+    metrics: ServiceCollector,
+    max_photo_size: int,
+):
+    """Создаёт пул процессов для обработки фотографий, если обработка включена."""
+    if not config.enabled:
+        yield None
+        return
+    # spawn: дочерние процессы не наследуют event loop и потоки приложения
+    executor = ProcessPoolExecutor(
+        max_workers=config.workers,
+        mp_context=multiprocessing.get_context('spawn'),
+    )
+    yield PhotoPreprocessor(
+        executor=executor,
+        metrics=metrics,
+        max_side=config.max_side,
+        quality=config.quality,
+        min_size=config.min_size,
+        max_photo_size=max_photo_size,
+    )
+    executor.shutdown(cancel_futures=True)
+
+
+def _setup_photo_verdict_cache(
+    config: PhotoCacheConfig,
+    metrics: ServiceCollector,
+) -> PhotoVerdictCache | None:
+    """Создаёт кэш результатов проверки фотографий, если он включён."""
+    if not config.enabled:
+        return None
+    return PhotoVerdictCache(max_size=config.max_size, ttl=config.ttl, metrics=metrics)
+
+
 class ApplicationContainer(DeclarativeContainer):
     """Хранилище используемых ресурсов приложения."""
 
@@ -62,35 +195,164 @@ class ApplicationContainer(DeclarativeContainer):
     config = Configuration(strict=True)
 
     db = Singleton(Database, db_url=config.provided.postgres.dsn)
+    memory_storage = Singleton(memory.InMemoryStorage)
+    user_repository = Selector(
+        config.provided.storage.backend,
+        postgres=Singleton(sql.SqlUserRepository, session_factory=db.provided.session),
+        memory=Singleton(memory.InMemoryUserRepository, storage=memory_storage),
+    )
+    credit_card_repository = Selector(
+        config.provided.storage.backend,
+        postgres=Singleton(sql.SqlCreditCardRepository, session_factory=db.provided.session),
+        memory=Singleton(memory.InMemoryCreditCardRepository, storage=memory_storage),
+    )
+    export_repository = Selector(
+        config.provided.storage.backend,
+        postgres=Singleton(sql.SqlExportRepository, session_factory=db.provided.session),
+        memory=Singleton(memory.InMemoryExportRepository, storage=memory_storage),
+    )
+
     security = Singleton(
         SecurityService,
         secret_key=config.provided.jwt.secret,
         token_ttl=config.provided.jwt.access_token_expire_minutes,
+        admin_emails=config.provided.admin.emails,
+    )
+    business_metrics = Singleton(
+        BusinessMetrics,
+        service_name=config.provided.service.provided.name,
+        registry=Callable(global_analytics_registry),
     )
+
     user_service = Singleton(
         UserService,
-        session_factory=db.provided.session,
+        repository=user_repository,
         security_service=security,
+        metrics=business_metrics,
     )
 
     credit_card_service = Singleton(
         CreditCardService,
-        session_factory=db.provided.session,
+        repository=credit_card_repository,
         exp_date_in_years=config.provided.credit_card.exp_date_in_years,
         default_limit=config.provided.credit_card.default_limit,
+        metrics=business_metrics,
     )
 
-    http_session = Resource(_setup_client_session)
+    outbox_repository = Selector(
+        config.provided.storage.backend,
+        postgres=Singleton(sql.SqlOutboxRepository, session_factory=db.provided.session),
+        memory=Singleton(memory.InMemoryOutboxRepository, storage=memory_storage),
+    )
+    outbox_publisher = Selector(
+        config.provided.outbox.publisher,
+        memory=Singleton(InMemoryPublisher),
+        file=Singleton(FilePublisher, path=config.provided.outbox.file_path),
+    )
+    outbox_dispatcher = Singleton(
+        OutboxDispatcher,
+        repository=outbox_repository,
+        publisher=outbox_publisher,
+        metrics=Callable(global_registry),
+        batch_size=config.provided.outbox.batch_size,
+        poll_interval=config.provided.outbox.poll_interval,
+    )
+    outbox_dispatcher_task = Resource(
+        _run_outbox_dispatcher,
+        dispatcher=outbox_dispatcher,
+        enabled=config.provided.outbox.enabled,
+    )
+
+    export_service = Singleton(
+        ExportService,
+        repository=export_repository,
+        yield_per=config.provided.export.yield_per,
+    )
+
+    client_operation_templates = Singleton(
+        _setup_operation_templates,
+        photo_service_url=config.provided.photo_service.url,
+    )
+    http_session = Resource(
+        _setup_client_session,
+        connector=config.provided.photo_service.connector,
+        operation_templates=client_operation_templates,
+    )
+    photo_verdict_cache = Singleton(
+        _setup_photo_verdict_cache,
+        config=config.provided.photo_service.cache,
+        metrics=Callable(global_registry),
+    )
+    photo_circuit_breaker = Singleton(
+        resilience.CircuitBreaker,
+        service_name='PhotoService',
+        config=config.provided.photo_service.circuit_breaker,
+        metrics=Callable(global_registry),
+    )
+    photo_bulkhead = Singleton(
+        resilience.Bulkhead,
+        service_name='PhotoService',
+        config=config.provided.photo_service.bulkhead,
+        metrics=Callable(global_registry),
+    )
+    photo_retry_policy = Singleton(
+        RetryPolicy,
+        service_name='PhotoService',
+        config=config.provided.photo_service.retry,
+        metrics=Callable(global_registry),
+    )
+    photo_preprocessor = Resource(
+        _setup_photo_preprocessor,
+        config=config.provided.photo_service.preprocessing,
+        metrics=Callable(global_registry),
+        max_photo_size=config.provided.photo_service.max_photo_size,
+    )
     photo_service = Singleton(
         PhotoService,
         session=http_session,
         config=config.provided.photo_service,
+        cache=photo_verdict_cache,
+        circuit_breaker=photo_circuit_breaker,
+        bulkhead=photo_bulkhead,
+        preprocessor=photo_preprocessor,
+        retry_policy=photo_retry_policy,
+    )
+
+    photo_job_service = Singleton(
+        PhotoJobService,
+        photo_service=photo_service,
+        user_service=user_service,
+        metrics=Callable(global_registry),
+        queue_size=config.provided.photo_jobs.queue_size,
+        workers=config.provided.photo_jobs.workers,
+        job_ttl=config.provided.photo_jobs.job_ttl,
+        chunk_size=config.provided.photo_service.chunk_size,
+    )
+    photo_job_workers = Resource(_run_photo_job_workers, photo_job_service=photo_job_service)
+
+    metrics_exposition = Singleton(
+        MetricsExposition,
+        ttl=config.provided.metrics.exposition_cache_ttl,
+        metrics=Callable(global_registry),
     )
+    runtime_monitor = Singleton(
+        RuntimeMonitor,
+        metrics=Callable(global_registry),
+        interval=config.provided.metrics.runtime.interval,
+    )
+    runtime_monitor_task = Resource(
+        _run_runtime_monitor,
+        monitor=runtime_monitor,
+        enabled=config.provided.metrics.runtime.enabled,
+    )
+
+    span_processor_task = Resource(_run_span_processor, tracer=Callable(global_tracer))
 
     components_checker = Factory(
         _setup_components_checker,
         db=db,
         photo_service=photo_service,
+        storage_backend=config.provided.storage.backend,
     )
 
 
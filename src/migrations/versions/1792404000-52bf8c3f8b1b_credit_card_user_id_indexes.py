@@ -0,0 +1,36 @@
+"""Credit card user_id index
+
+Revision ID: 52bf8c3f8b1b
+Revises: 213173bb93a7
+Create Date: 2026-10-19 10:00:00.000000
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '52bf8c3f8b1b'
+down_revision = '213173bb93a7'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # CREATE INDEX CONCURRENTLY нельзя выполнять внутри транзакции,
+    # зато таблица не блокируется на запись на время построения индекса.
+    with op.get_context().autocommit_block():
+        op.create_index(
+            op.f('ix_credit_card_user_id'),
+            'credit_card',
+            ['user_id'],
+            unique=True,
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            op.f('ix_credit_card_user_id'),
+            table_name='credit_card',
+            postgresql_concurrently=True,
+        )
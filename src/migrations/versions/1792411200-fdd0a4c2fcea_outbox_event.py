@@ -0,0 +1,38 @@
+"""Outbox event
+
+Revision ID: fdd0a4c2fcea
+Revises: 52bf8c3f8b1b
+Create Date: 2026-10-19 12:00:00.000000
+
+"""
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = 'fdd0a4c2fcea'
+down_revision = '52bf8c3f8b1b'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('outbox_event',
+                    sa.Column('id', sa.Integer(), nullable=False),
+                    sa.Column('event_type', sa.String(), nullable=False),
+                    sa.Column('aggregate_id', sa.Integer(), nullable=False),
+                    sa.Column('payload', sa.JSON(), nullable=False),
+                    sa.Column('created_at', sa.DateTime(), server_default=sa.text('now()'), nullable=False),
+                    sa.Column('dispatched_at', sa.DateTime(), nullable=True),
+                    sa.PrimaryKeyConstraint('id')
+                    )
+    op.create_index(
+        'ix_outbox_event_pending',
+        'outbox_event',
+        ['id'],
+        postgresql_where=sa.text('dispatched_at IS NULL'),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_outbox_event_pending', table_name='outbox_event')
+    op.drop_table('outbox_event')
@@ -15,6 +15,9 @@ from src.app.system import environment
 from src.app.system.mdw_prometheus_metrics import global_registry
 from tests.utils import clear_metrics
 
+# Роуты читают флаг бюджета из модуля, импортированного как app, а не src.app
+from app.system.mdw_sqlalchemy.statements import set_strict_budget
+
 fake = Faker(locale='ru-RU')
 
 
@@ -33,6 +36,14 @@ def event_loop():
     loop.close()
 
 
+@pytest.fixture(scope='session', autouse=True)
+def strict_statements_budget():
+    """Превышение бюджета SQL-запросов хендлером роняет интеграционные тесты."""
+    set_strict_budget(True)
+    yield
+    set_strict_budget(False)
+
+
 @pytest.fixture(scope='session')
 def app(config):
     """Возвращает объект приложения FastAPI"""
@@ -190,7 +201,7 @@ async def auth_header(cli, test_user_password, test_user_email, add_test_user):
 
 @pytest.fixture()
 def activity_registry():
-    activity_reg = global_registry()._activity_reg
+    activity_reg = global_registry()._activity.registry
     clear_metrics(activity_reg)
     return activity_reg
 
@@ -0,0 +1,68 @@
+import csv
+import io
+import json
+
+import pytest
+from sqlalchemy import select
+
+from src.app.external.db.models import UserModel
+
+
+@pytest.fixture
+def admin_access(security, test_user_email):
+    """Даёт тестовому пользователю права администратора."""
+    admin_emails = security.admin_emails
+    security.admin_emails = admin_emails | {test_user_email}
+    yield
+    security.admin_emails = admin_emails
+
+
+async def test_export_users_ndjson(cli, auth_header, admin_access, add_test_user, session):
+    """Проверка выгрузки пользователей в NDJSON."""
+    resp = await cli.get('/admin/export/user', headers=auth_header)
+
+    assert resp.status_code == 200
+    assert resp.headers['content-type'].startswith('application/x-ndjson')
+    rows = [json.loads(line) for line in resp.text.splitlines()]
+
+    users_count = len((await session.scalars(select(UserModel.id))).all())
+    assert len(rows) == users_count
+    assert [row['id'] for row in rows] == sorted(row['id'] for row in rows)
+    assert all('hashed_password' not in row for row in rows)
+    assert add_test_user.email in {row['email'] for row in rows}
+
+
+async def test_export_resume_after_id(cli, auth_header, admin_access):
+    """Проверка продолжения выгрузки с последнего полученного id."""
+    resp = await cli.get('/admin/export/credit_card', headers=auth_header)
+    rows = [json.loads(line) for line in resp.text.splitlines()]
+    last_seen_id = rows[len(rows) // 2]['id']
+
+    resp = await cli.get(
+        '/admin/export/credit_card',
+        params={'after_id': last_seen_id},
+        headers=auth_header,
+    )
+
+    assert resp.status_code == 200
+    resumed_rows = [json.loads(line) for line in resp.text.splitlines()]
+    assert resumed_rows == [row for row in rows if row['id'] > last_seen_id]
+
+
+async def test_export_credit_cards_csv(cli, auth_header, admin_access, add_test_credit_card):
+    """Проверка выгрузки кредитных карт в CSV."""
+    resp = await cli.get('/admin/export/credit_card', params={'format': 'csv'}, headers=auth_header)
+
+    assert resp.status_code == 200
+    assert resp.headers['content-type'].startswith('text/csv')
+    rows = list(csv.DictReader(io.StringIO(resp.text)))
+    row = next(row for row in rows if int(row['id']) == add_test_credit_card.id)
+    assert int(row['limit']) == add_test_credit_card.limit
+    assert row['exp_date'] == add_test_credit_card.exp_date.isoformat()
+
+
+async def test_export_without_admin_access(cli, auth_header):
+    """Проверка, что выгрузка недоступна обычным пользователям."""
+    resp = await cli.get('/admin/export/user', headers=auth_header)
+
+    assert resp.status_code == 403
@@ -1,4 +1,6 @@
-from src.app.external.db.models import CreditCardModel
+from sqlalchemy import delete, select
+
+from src.app.external.db.models import CreditCardModel, OutboxEventModel
 
 
 async def test_close(cli, auth_header, add_test_credit_card, session):
@@ -12,3 +14,22 @@ async def test_close(cli, auth_header, add_test_credit_card, session):
     credit_card = await session.get(CreditCardModel, add_test_credit_card.id)
 
     assert credit_card.active is False
+
+
+async def test_close_outbox_event(cli, auth_header, add_test_credit_card, session):
+    """Проверка, что закрытие карты записывает событие в outbox"""
+    resp = await cli.post(url='/credit_card/close', headers=auth_header)
+
+    assert resp.status_code == 200
+
+    events = (await session.scalars(
+        select(OutboxEventModel).where(OutboxEventModel.aggregate_id == add_test_credit_card.id),
+    )).all()
+    assert [event.event_type for event in events] == ['credit_card.closed']
+    assert events[0].payload['active'] is False
+    assert events[0].dispatched_at is None
+
+    await session.execute(
+        delete(OutboxEventModel).where(OutboxEventModel.aggregate_id == add_test_credit_card.id),
+    )
+    await session.commit()
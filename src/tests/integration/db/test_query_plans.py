@@ -0,0 +1,67 @@
+import json
+
+import pytest
+from sqlalchemy import select, text
+from sqlalchemy.dialects import postgresql
+
+from src.app.external.db.models import CreditCardModel, UserModel
+
+
+def _compile(statement) -> str:
+    return str(statement.compile(
+        dialect=postgresql.dialect(),
+        compile_kwargs={'literal_binds': True},
+    ))
+
+
+def _node_types(plan: dict) -> set:
+    """Собирает типы всех узлов плана запроса."""
+    node_types = {plan['Node Type']}
+    for child in plan.get('Plans', []):
+        node_types |= _node_types(child)
+    return node_types
+
+
+@pytest.fixture
+async def seeded_user(session) -> UserModel:
+    """Любой пользователь с картой из данных, которые заводит фикстура prepare_db."""
+    return await session.scalar(
+        select(UserModel).join(CreditCardModel, CreditCardModel.user_id == UserModel.id).limit(1),
+    )
+
+
+@pytest.mark.parametrize('build_query', [
+    pytest.param(
+        lambda user: select(UserModel).where(UserModel.email == user.email),
+        id='user by email',
+    ),
+    pytest.param(
+        lambda user: select(CreditCardModel).where(CreditCardModel.user_id.in_([user.id])),
+        id='selectinload credit_card',
+    ),
+    pytest.param(
+        lambda user: select(CreditCardModel).where(
+            CreditCardModel.user_id == user.id,
+            CreditCardModel.active,
+        ),
+        id='active credit_card of user',
+    ),
+])
+async def test_hot_queries_use_indexes(session, seeded_user, build_query):
+    """Проверка, что горячие запросы не приводят к последовательному сканированию таблиц.
+
+    На маленькой тестовой таблице планировщик предпочтёт Seq Scan даже при наличии индекса,
+    поэтому он запрещается на время транзакции: Seq Scan останется в плане, только если
+    подходящего индекса нет.
+    """
+    await session.execute(text('SET LOCAL enable_seqscan = off'))
+    raw_plan = await session.scalar(
+        text(f'EXPLAIN (FORMAT JSON) {_compile(build_query(seeded_user))}'),
+    )
+    await session.rollback()
+
+    if isinstance(raw_plan, str):
+        raw_plan = json.loads(raw_plan)
+    node_types = _node_types(raw_plan[0]['Plan'])
+
+    assert 'Seq Scan' not in node_types
@@ -11,8 +11,51 @@ async def test_metrics_health(cli):
 async def test_metrics_analytics(cli):
     resp = await cli.get('/healthz/metrics?type=analytics')
     assert resp.status_code == 200
+    assert 'dp_business_credit_cards_issued' in resp.text
 
 
 async def test_metrics_incorrect(cli):
     resp = await cli.get('/healthz/metrics?type=unknown')
     assert resp.status_code == 422
+
+
+async def test_metrics_operation_is_route_template(cli):
+    """Проверка, что лейбл operation не зависит от значений в пути запроса."""
+    await cli.delete('/healthz/metrics?type=activity')
+    await cli.get('/user/photo_jobs/first')
+    await cli.get('/user/photo_jobs/second')
+    await cli.get('/unknown/path')
+
+    resp = await cli.get('/healthz/metrics?type=activity')
+
+    assert 'operation="GET /user/photo_jobs/{job_id}"' in resp.text
+    assert 'operation="unmatched"' in resp.text
+    assert '/user/photo_jobs/first' not in resp.text
+    assert '/unknown/path' not in resp.text
+    assert 'dp_service_metric_series{' in resp.text
+
+
+async def test_metrics_openmetrics_gzip(cli):
+    """Проверка согласования формата OpenMetrics и сжатия ответа."""
+    resp = await cli.get(
+        '/healthz/metrics?type=activity',
+        headers={'Accept': 'application/openmetrics-text', 'Accept-Encoding': 'gzip'},
+    )
+
+    assert resp.status_code == 200
+    assert resp.headers['content-type'].startswith('application/openmetrics-text')
+    assert resp.headers['content-encoding'] == 'gzip'
+    assert resp.text.endswith('# EOF\n')
+
+
+async def test_latency_quantiles(cli):
+    """Проверка, что /healthz/latency отдаёт квантили задержки по шаблону маршрута."""
+    await cli.get('/user/photo_jobs/first')
+
+    resp = await cli.get('/healthz/latency')
+
+    assert resp.status_code == 200
+    operations = {item['operation']: item for item in resp.json()['operations']}
+    latency = operations['GET /user/photo_jobs/{job_id}']
+    assert latency['kind'] == 'server'
+    assert 0 < latency['p50'] <= latency['p90'] <= latency['p99'] <= latency['p999']
@@ -11,8 +11,12 @@ def document_photo():
 
 
 @pytest.fixture()
-async def photo_service_post_request_mock(monkeypatch):
+async def photo_service_post_request_mock(app, monkeypatch):
     """Мок POST запроса в cервис для валидации фотографий."""
+    # Одна и та же фотография проверяется с разными ответами сервиса, поэтому кэш сбрасывается
+    photo_verdict_cache = app.state.container.photo_verdict_cache()
+    if photo_verdict_cache is not None:
+        photo_verdict_cache.clear()
 
     class PhotoServiceResponseMock:
         """Класс, имитирующий ответ cервиса для валидации фотографий."""
@@ -24,8 +28,14 @@ async def photo_service_post_request_mock(monkeypatch):
         async def json(self):
             return {'status': self.resp}
 
+        async def __aenter__(self):
+            return self
+
+        async def __aexit__(self, *args):
+            return None
+
     with monkeypatch.context() as m:
-        async def post_request_mock(*args, **kwargs):
+        def post_request_mock(*args, **kwargs):
             post_mock_response = PhotoServiceResponseMock(m.status, m.response_body)
 
             return post_mock_response
@@ -77,3 +87,27 @@ async def test_di(app, cli, auth_header, document_photo):
         assert resp.status_code == 200
         assert resp.json()['detail'] == 'validated'
         assert service_photo_mock.validate_photo.call_args.kwargs['photo_type'] == 'doc'
+
+
+async def test_async_photo_job(cli, auth_header, document_photo):
+    """Проверка фоновой проверки документа: задача принимается и доступна по идентификатору."""
+    files = {'file': ('image.jpeg', document_photo)}
+
+    resp = await cli.post(
+        '/user/document',
+        params={'async': 'true'},
+        headers=auth_header,
+        files=files,
+    )
+
+    assert resp.status_code == 202
+    job = resp.json()
+    assert job['photo_type'] == 'doc'
+    assert job['status'] == 'pending'
+
+    resp = await cli.get(f'/user/photo_jobs/{job["id"]}', headers=auth_header)
+    assert resp.status_code == 200
+    assert resp.json()['id'] == job['id']
+
+    resp = await cli.get('/user/photo_jobs/unknown', headers=auth_header)
+    assert resp.status_code == 404
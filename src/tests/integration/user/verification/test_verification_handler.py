@@ -0,0 +1,30 @@
+from unittest.mock import AsyncMock
+
+from sqlalchemy import select
+
+from src.app.external.db.models import UserModel
+from src.app.services.photo import PhotoService
+
+
+async def test_verification(app, cli, auth_header, session):
+    """Проверка одновременной валидации документа и лица, мокаем PhotoService через DI."""
+    files = {
+        'document': ('document.jpeg', b'document_content'),
+        'face': ('face.jpeg', b'face_content'),
+    }
+
+    service_photo_mock = AsyncMock(spec=PhotoService)
+    service_photo_mock.validate_photos.return_value = (True, False)
+
+    with app.state.container.photo_service.override(service_photo_mock):
+        resp = await cli.post('/user/verification', headers=auth_header, files=files)
+
+    assert resp.status_code == 400
+    assert resp.json() == {'status_document': True, 'status_face': False}
+
+    resp = await cli.get('/user', headers=auth_header)
+    user_in_db = await session.scalar(
+        select(UserModel).where(UserModel.email == resp.json()['email']),
+    )
+    assert user_in_db.status_document is True
+    assert user_in_db.status_face is False
@@ -1,16 +1,25 @@
+from unittest.mock import MagicMock
+
 import pytest
 
+from src.app.repositories.sql import SqlCreditCardRepository, SqlUserRepository
 from src.app.services.credit_cards import CreditCardService
 from src.app.services.security import SecurityService
 from src.app.services.users import UserService
 
 
+@pytest.fixture
+def metrics():
+    return MagicMock()
+
+
 @pytest.fixture(scope='session')
 def credit_card_service(config, db):
     return CreditCardService(
-        session_factory=db.session,
+        repository=SqlCreditCardRepository(session_factory=db.session),
         exp_date_in_years=config.credit_card.exp_date_in_years,
         default_limit=config.credit_card.default_limit,
+        metrics=MagicMock(),
     )
 
 
@@ -25,6 +34,7 @@ def security_service(config):
 @pytest.fixture(scope='session')
 def user_service(config, security_service, db):
     return UserService(
-        session_factory=db.session,
+        repository=SqlUserRepository(session_factory=db.session),
         security_service=security_service,
+        metrics=MagicMock(),
     )
@@ -0,0 +1,23 @@
+from types import SimpleNamespace
+
+import pytest
+from yarl import URL
+
+from src.app.external.metrics_config import OperationTemplates
+
+
+@pytest.mark.parametrize(('method', 'url', 'expected_operation'), [
+    ('POST', 'http://photo:8001/doc?token=secret', 'POST http://photo:8001/doc'),
+    ('GET', 'http://photo:8001/users/42/photos', 'GET http://photo:8001/users/{user_id}/photos'),
+    ('GET', 'http://photo:8001/users/42/photos/1', 'GET unmatched'),
+    ('GET', 'http://other:8001/doc', 'GET unmatched'),
+])
+def test_operation_templates(method, url, expected_operation):
+    """Проверка, что операция исходящего запроса строится по шаблону, а не по адресу запроса."""
+    templates = OperationTemplates()
+    templates.add('http://photo:8001', 'POST', '/doc')
+    templates.add('http://photo:8001', 'GET', '/users/{user_id}/photos')
+
+    params = SimpleNamespace(method=method, url=URL(url))
+
+    assert templates(None, None, params) == expected_operation
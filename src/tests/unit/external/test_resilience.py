@@ -0,0 +1,122 @@
+import asyncio
+
+import pytest
+
+from src.app.config import BulkheadConfig, CircuitBreakerConfig
+from src.app.external.http_errors import (
+    HttpClientError,
+    HttpClientServerError,
+    HttpClientUnavailableError,
+)
+from src.app.external.resilience import Bulkhead, CircuitBreaker, CircuitState
+
+
+def _circuit_breaker(metrics, **config) -> CircuitBreaker:
+    config = {'window_size': 4, 'minimum_calls': 2, 'half_open_max_calls': 1, **config}
+    return CircuitBreaker('PhotoService', CircuitBreakerConfig(**config), metrics)
+
+
+async def _fail(circuit_breaker: CircuitBreaker, error_class=HttpClientServerError):
+    with pytest.raises(error_class):
+        async with circuit_breaker.guard():
+            raise error_class()
+
+
+async def test_circuit_opens_on_errors(metrics):
+    """Проверка, что при превышении доли ошибок вызовы сразу отклоняются."""
+    circuit_breaker = _circuit_breaker(metrics)
+
+    await _fail(circuit_breaker)
+    await _fail(circuit_breaker)
+
+    assert circuit_breaker.state == CircuitState.open
+    with pytest.raises(HttpClientUnavailableError):
+        async with circuit_breaker.guard():
+            pytest.fail('Вызов не должен выполняться при разомкнутом выключателе')
+    metrics.write_resilience_rejection.assert_called_once_with('PhotoService', 'circuit_open')
+
+
+async def test_circuit_opens_on_slow_calls(metrics):
+    """Проверка, что медленные вызовы размыкают выключатель."""
+    circuit_breaker = _circuit_breaker(metrics, slow_call_duration=0)
+
+    for _ in range(2):
+        async with circuit_breaker.guard():
+            pass
+
+    assert circuit_breaker.state == CircuitState.open
+
+
+async def test_circuit_closes_after_successful_probe(metrics):
+    """Проверка перехода в полуоткрытое состояние и замыкания после успешного пробного вызова."""
+    circuit_breaker = _circuit_breaker(metrics, open_duration=0)
+    await _fail(circuit_breaker)
+    await _fail(circuit_breaker)
+
+    assert circuit_breaker.state == CircuitState.half_open
+    async with circuit_breaker.guard():
+        pass
+
+    assert circuit_breaker.state == CircuitState.closed
+
+
+async def test_client_errors_not_counted(metrics):
+    """Проверка, что ошибки, не связанные с внешним сервисом, не размыкают выключатель."""
+    circuit_breaker = _circuit_breaker(metrics)
+
+    for _ in range(2):
+        with pytest.raises(ValueError):
+            async with circuit_breaker.guard():
+                raise ValueError
+    # Ответы 4xx говорят об ошибке в запросе, а не о сбое сервиса
+    await _fail(circuit_breaker, HttpClientError)
+    await _fail(circuit_breaker, HttpClientError)
+
+    assert circuit_breaker.state == CircuitState.closed
+
+
+async def test_bulkhead_rejects_when_full(metrics):
+    """Проверка, что при занятых местах вызов отклоняется через max_wait."""
+    bulkhead = Bulkhead('PhotoService', BulkheadConfig(max_concurrent=1, max_wait=0.01), metrics)
+    acquired, release = asyncio.Event(), asyncio.Event()
+
+    async def hold():
+        async with bulkhead.acquire():
+            acquired.set()
+            await release.wait()
+
+    holder = asyncio.create_task(hold())
+    await acquired.wait()
+    assert bulkhead.in_use == 1
+
+    with pytest.raises(HttpClientUnavailableError):
+        async with bulkhead.acquire():
+            pass
+
+    release.set()
+    await holder
+    assert bulkhead.in_use == 0
+    metrics.write_resilience_rejection.assert_called_once_with('PhotoService', 'bulkhead_full')
+
+
+async def test_bulkhead_cancelled_wait_keeps_place(metrics):
+    """Проверка, что отменённое ожидание места не занимает место навсегда."""
+    bulkhead = Bulkhead('PhotoService', BulkheadConfig(max_concurrent=1, max_wait=1), metrics)
+    release = asyncio.Event()
+
+    async def hold():
+        async with bulkhead.acquire():
+            await release.wait()
+
+    holder = asyncio.create_task(hold())
+    waiter = asyncio.create_task(hold())
+    await asyncio.sleep(0)
+    waiter.cancel()
+    release.set()
+    await holder
+    with pytest.raises(asyncio.CancelledError):
+        await waiter
+
+    async with bulkhead.acquire():
+        assert bulkhead.in_use == 1
+    metrics.write_resilience_rejection.assert_not_called()
@@ -0,0 +1,91 @@
+import asyncio
+from unittest.mock import AsyncMock
+
+import pytest
+
+from src.app.config import RetryConfig
+from src.app.external.http_errors import (
+    HttpClientError,
+    HttpClientTimeoutError,
+    HttpClientTransientError,
+)
+from src.app.external.retries import LatencyTracker, RetryPolicy
+
+
+def _retry_policy(metrics, **config) -> RetryPolicy:
+    config = {'backoff_base': 0.001, 'backoff_max': 0.001, **config}
+    return RetryPolicy('PhotoService', RetryConfig(**config), metrics)
+
+
+async def test_transient_error_retried(metrics):
+    """Проверка, что после временной ошибки запрос повторяется."""
+    attempt = AsyncMock(side_effect=[HttpClientTransientError(), True])
+
+    assert await _retry_policy(metrics).call(attempt)
+
+    assert attempt.await_count == 2
+    metrics.write_retry_attempt.assert_called_once_with('PhotoService', 'retry')
+
+
+async def test_client_error_not_retried(metrics):
+    """Проверка, что ошибка, которую повтор не исправит, сразу возвращается."""
+    attempt = AsyncMock(side_effect=HttpClientError())
+
+    with pytest.raises(HttpClientError):
+        await _retry_policy(metrics).call(attempt)
+
+    attempt.assert_awaited_once()
+
+
+async def test_retries_limited_by_budget(metrics):
+    """Проверка, что при исчерпании бюджета повторы прекращаются."""
+    retry_policy = _retry_policy(metrics, attempts=5, budget_ratio=0, budget_max_tokens=2)
+    attempt = AsyncMock(side_effect=HttpClientTransientError())
+
+    with pytest.raises(HttpClientTransientError):
+        await retry_policy.call(attempt)
+
+    assert attempt.await_count == 3
+    metrics.write_resilience_rejection.assert_called_once_with('PhotoService', 'retry_budget')
+
+
+async def test_deadline(metrics):
+    """Проверка, что все попытки укладываются в общий deadline."""
+    async def attempt():
+        await asyncio.sleep(1)
+
+    with pytest.raises(HttpClientTimeoutError):
+        await _retry_policy(metrics, deadline=0.01).call(attempt)
+
+
+async def test_hedged_request_wins(metrics):
+    """Проверка, что при медленном ответе отправляется второй запрос и берётся первый ответ."""
+    retry_policy = _retry_policy(metrics, hedging=True, hedging_min_delay=0.01)
+    for _ in range(20):
+        await retry_policy.call(AsyncMock(return_value='fast'))
+    delays = iter([1, 0])
+    cancelled = []
+
+    async def attempt():
+        try:
+            await asyncio.sleep(next(delays))
+        except asyncio.CancelledError:
+            cancelled.append(True)
+            raise
+        return 'hedge'
+
+    assert await asyncio.wait_for(retry_policy.call(attempt), timeout=0.5) == 'hedge'
+    metrics.write_retry_attempt.assert_called_once_with('PhotoService', 'hedge')
+    # Медленная попытка отменена и завершена до возврата ответа
+    assert cancelled == [True]
+
+
+def test_latency_quantile_over_window():
+    """Проверка, что квантиль считается по последним задержкам окна."""
+    latencies = LatencyTracker(window=20)
+    for latency in range(40):
+        latencies.observe(latency)
+
+    assert latencies.quantile(0) == 20
+    assert latencies.quantile(0.5) == 30
+    assert latencies.quantile(1) == 39
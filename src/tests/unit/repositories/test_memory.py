@@ -0,0 +1,79 @@
+import datetime
+
+import pytest
+
+from src.app.external.db.models import CreditCardModel, UserModel
+from src.app.repositories.memory import (
+    InMemoryCreditCardRepository,
+    InMemoryStorage,
+    InMemoryUserRepository,
+)
+
+
+@pytest.fixture
+def storage():
+    return InMemoryStorage()
+
+
+@pytest.fixture
+def user_repository(storage):
+    return InMemoryUserRepository(storage)
+
+
+@pytest.fixture
+def credit_card_repository(storage):
+    return InMemoryCreditCardRepository(storage)
+
+
+async def test_add_user(user_repository):
+    """Проверка, что новому пользователю проставляются id и значения по умолчанию."""
+    user = await user_repository.add(UserModel(email='user@example.com', hashed_password='hash'))
+
+    assert user.id == 1
+    assert user.status_document is False
+    assert user.status_face is False
+    assert await user_repository.get_by_email('user@example.com') is user
+    assert await user_repository.get_by_email('unknown@example.com') is None
+
+
+async def test_add_existing_user(user_repository):
+    """Проверка уникальности email, как у индекса в PostgreSQL."""
+    await user_repository.add(UserModel(email='user@example.com', hashed_password='hash'))
+
+    with pytest.raises(ValueError):
+        await user_repository.add(UserModel(email='user@example.com', hashed_password='hash'))
+
+
+async def test_add_credit_card(storage, user_repository, credit_card_repository):
+    """Проверка, что карта становится доступна через пользователя, а в outbox пишется событие."""
+    user = await user_repository.add(UserModel(email='user@example.com', hashed_password='hash'))
+    credit_card = await credit_card_repository.add(CreditCardModel(
+        user_id=user.id,
+        limit=10_000_00,
+        balance=10_000_00,
+        exp_date=datetime.date.today(),
+    ), 'credit_card.issued')
+
+    assert credit_card.active is True
+    assert [event.event_type for event in storage.pending_events.values()] == ['credit_card.issued']
+    found_user = await user_repository.get_by_email('user@example.com')
+    assert found_user.credit_card is credit_card
+
+    with pytest.raises(ValueError):
+        await credit_card_repository.add(CreditCardModel(
+            user_id=user.id,
+            limit=10_000_00,
+            balance=10_000_00,
+            exp_date=datetime.date.today(),
+        ), 'credit_card.issued')
+
+
+async def test_update_statuses(user_repository):
+    """Проверка, что статусы документа и лица записываются вместе."""
+    user = await user_repository.add(UserModel(email='user@example.com', hashed_password='hash'))
+
+    await user_repository.update_statuses(user, status_document=True, status_face=False)
+
+    found_user = await user_repository.get_by_email('user@example.com')
+    assert found_user.status_document is True
+    assert found_user.status_face is False
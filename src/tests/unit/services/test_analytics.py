@@ -0,0 +1,69 @@
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from prometheus_client import CollectorRegistry
+
+from src.app.api.errors import CreditCardSmallLimitError
+from src.app.external.db.models import CreditCardModel, UserModel
+from src.app.services.analytics import BusinessMetrics
+from src.app.services.credit_cards import CreditCardService
+from src.app.services.users import UserService
+
+
+@pytest.fixture
+def registry():
+    return CollectorRegistry()
+
+
+@pytest.fixture
+def credit_card_service(registry):
+    return CreditCardService(
+        repository=AsyncMock(),
+        exp_date_in_years=2,
+        default_limit=20_000_00,
+        metrics=BusinessMetrics('service', registry),
+    )
+
+
+def _value(registry: CollectorRegistry, name: str, **labels) -> float | None:
+    return registry.get_sample_value(name, {'service': 'service', **labels})
+
+
+async def test_card_metrics(credit_card_service, registry):
+    """Проверка, что выпуск, отказ в увеличении лимита и закрытие карты попадают в метрики."""
+    user = UserModel(id=1)
+    card = CreditCardModel(limit=20_000_00, balance=20_000_00, active=True)
+    credit_card_service.repository.add.return_value = card
+
+    await credit_card_service.issue(50_000_00, user)
+    with pytest.raises(CreditCardSmallLimitError):
+        await credit_card_service.increase_limit(10_000_00, user=user, credit_card_db=card)
+    await credit_card_service.close_card(card)
+
+    assert _value(registry, 'dp_business_credit_cards_issued_total') == 1
+    assert _value(
+        registry, 'dp_business_credit_card_limit_sum', operation='issue', kind='requested',
+    ) == 50_000_00
+    assert _value(
+        registry, 'dp_business_credit_card_limit_sum', operation='issue', kind='granted',
+    ) == 20_000_00
+    assert _value(
+        registry, 'dp_business_credit_card_limit_rejections_total', reason='limit_not_greater',
+    ) == 1
+    assert _value(registry, 'dp_business_credit_cards_closed_total') == 1
+
+
+async def test_verification_metrics(registry):
+    """Проверка, что результаты проверки фотографий считаются по типу и результату."""
+    user_service = UserService(
+        repository=AsyncMock(),
+        security_service=MagicMock(),
+        metrics=BusinessMetrics('service', registry),
+    )
+
+    await user_service.update_statuses(UserModel(id=1), status_document=True, status_face=False)
+    await user_service.update_status_doc(UserModel(id=1), status=True)
+
+    verifications = 'dp_business_photo_verifications_total'
+    assert _value(registry, verifications, photo_type='doc', result='passed') == 2
+    assert _value(registry, verifications, photo_type='face', result='failed') == 1
@@ -1,5 +1,5 @@
 import datetime
-from unittest.mock import AsyncMock
+from unittest.mock import AsyncMock, MagicMock
 
 import pytest
 from dateutil.relativedelta import relativedelta
@@ -11,9 +11,10 @@ from app.services.credit_cards import CreditCardService
 @pytest.fixture
 def credit_card_service(config):
     return CreditCardService(
-        session_factory=AsyncMock(),
+        repository=AsyncMock(),
         exp_date_in_years=config.credit_card.exp_date_in_years,
         default_limit=config.credit_card.default_limit,
+        metrics=MagicMock(),
     )
 
 
@@ -0,0 +1,84 @@
+import datetime
+from unittest.mock import MagicMock
+
+import pytest
+
+from src.app.external.db.models import CreditCardModel
+from src.app.external.outbox_publishers import InMemoryPublisher
+from src.app.repositories.memory import (
+    InMemoryCreditCardRepository,
+    InMemoryOutboxRepository,
+    InMemoryStorage,
+)
+from src.app.services.credit_cards import CreditCardService
+from src.app.services.outbox import CreditCardEventType, OutboxDispatcher
+
+
+@pytest.fixture
+def storage():
+    return InMemoryStorage()
+
+
+@pytest.fixture
+def credit_card_service(storage):
+    return CreditCardService(
+        repository=InMemoryCreditCardRepository(storage),
+        exp_date_in_years=2,
+        default_limit=20_000_00,
+        metrics=MagicMock(),
+    )
+
+
+@pytest.fixture
+def publisher():
+    return InMemoryPublisher()
+
+
+@pytest.fixture
+def dispatcher(storage, publisher, metrics):
+    return OutboxDispatcher(
+        repository=InMemoryOutboxRepository(storage),
+        publisher=publisher,
+        metrics=metrics,
+        batch_size=2,
+        poll_interval=0,
+    )
+
+
+async def test_card_lifecycle_events(credit_card_service, dispatcher, publisher, metrics):
+    """Проверка, что изменения карты публикуются пачками в порядке записи."""
+    credit_card = await credit_card_service.add(limit=20_000_00, user_id=1)
+    await credit_card_service.update_limit(limit=30_000_00, credit_card_db=credit_card)
+    await credit_card_service.close_card(credit_card_db=credit_card)
+
+    assert await dispatcher.dispatch_batch() == 2
+    assert await dispatcher.dispatch_batch() == 1
+    assert await dispatcher.dispatch_batch() == 0
+
+    assert [message['event_type'] for message in publisher.messages] == [
+        CreditCardEventType.issued.value,
+        CreditCardEventType.limit_changed.value,
+        CreditCardEventType.closed.value,
+    ]
+    assert publisher.messages[1]['payload']['limit'] == 30_000_00
+    assert publisher.messages[2]['payload']['active'] is False
+    assert metrics.write_message_bus_producer_timing.call_count == 2
+
+
+async def test_failed_publish_keeps_events(storage, dispatcher, publisher, metrics, monkeypatch):
+    """Проверка, что при ошибке публикации события остаются в outbox."""
+    await InMemoryCreditCardRepository(storage).add(
+        CreditCardModel(user_id=1, limit=1, balance=1, exp_date=datetime.date.today()),
+        CreditCardEventType.issued.value,
+    )
+
+    async def publish_error(events):
+        raise ConnectionError
+
+    monkeypatch.setattr(publisher, 'publish', publish_error)
+    with pytest.raises(ConnectionError):
+        await dispatcher.dispatch_batch()
+
+    assert len(storage.pending_events) == 1
+    labels = metrics.write_message_bus_producer_timing.call_args.args[1]
+    assert labels.error is True
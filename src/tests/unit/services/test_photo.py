@@ -1,21 +1,40 @@
+import asyncio
+import io
 from asyncio import TimeoutError
-from unittest.mock import AsyncMock
+from unittest.mock import AsyncMock, MagicMock
 
 import pytest
+from fastapi import UploadFile
+from starlette.datastructures import Headers
 
-from app.external.http_errors import HttpClientTimeoutError
-from app.services.photo import PhotoService, PhotoServiceConfig
+from app.services.photo import PhotoService, PhotoServiceConfig, _iter_chunks
+from app.services.photo_cache import PhotoVerdictCache
+# Сервис бросает исключения, импортированные из src.app
+from src.app.api.errors import PhotoTooLargeError
+from src.app.external.http_errors import (
+    HttpClientError,
+    HttpClientServerError,
+    HttpClientTimeoutError,
+)
+
+
+def _upload_file(content: bytes, size: int | None) -> UploadFile:
+    return UploadFile(
+        file=io.BytesIO(content),
+        size=size,
+        filename='photo.jpg',
+        headers=Headers({'content-type': 'image/jpeg'}),
+    )
+
+
+def _read_chunks(photo_service: PhotoService, photo: UploadFile, read_lock: asyncio.Lock):
+    return _iter_chunks(photo, read_lock, photo_service._chunk_size, photo_service.check_size)
 
 
 @pytest.fixture
 def image_mock():
-    """Мок файла для отправки в PhotoService."""
-    image = AsyncMock()
-    image.read.return_value = b'photo_content'
-    image.content_type = 'image/jpeg'
-    image.filename = 'photo.jpg'
-
-    return image
+    """Файл для отправки в PhotoService."""
+    return _upload_file(b'photo_content', size=len(b'photo_content'))
 
 
 @pytest.fixture
@@ -23,14 +42,16 @@ def photo_service_config(config):
     """Базовая конфигурация объекта PhotoService."""
     return PhotoServiceConfig(
         url=config.photo_service.url,
-        timeout=config.photo_service.timeout
+        timeout=config.photo_service.timeout,
+        chunk_size=4,
+        max_photo_size=16,
     )
 
 
 async def test_photo_service_timeout_error(photo_service_config, image_mock, caplog):
     """Проверка поведения при TimeoutError запросов к сервису валидации фотографий."""
 
-    photo_service_session = AsyncMock()
+    photo_service_session = MagicMock()
     photo_service_session.post.side_effect = TimeoutError
 
     photo_service = PhotoService(photo_service_session, photo_service_config)
@@ -39,3 +60,152 @@ async def test_photo_service_timeout_error(photo_service_config, image_mock, cap
         await photo_service.validate_photo(image_mock, 'doc')
 
     assert f'PhotoService unavailable by {photo_service._request_timeout} secs timeout.' in caplog.messages
+
+
+async def test_photo_too_large(photo_service_config):
+    """Проверка, что слишком большая фотография не отправляется в сервис."""
+    photo_service_session = MagicMock()
+    photo_service = PhotoService(photo_service_session, photo_service_config)
+
+    with pytest.raises(PhotoTooLargeError):
+        await photo_service.validate_photo(_upload_file(b'x' * 17, size=17), 'doc')
+
+    photo_service_session.post.assert_not_called()
+
+
+async def test_photo_streamed_by_chunks(photo_service_config, image_mock):
+    """Проверка, что фотография читается частями не больше chunk_size."""
+    photo_service = PhotoService(AsyncMock(), photo_service_config)
+
+    chunks = [chunk async for chunk in _read_chunks(photo_service, image_mock, asyncio.Lock())]
+
+    assert b''.join(chunks) == b'photo_content'
+    assert max(len(chunk) for chunk in chunks) == photo_service_config.chunk_size
+
+
+async def test_photo_size_checked_while_streaming(photo_service_config):
+    """Проверка размера фотографии при чтении, если он не известен заранее."""
+    photo_service = PhotoService(AsyncMock(), photo_service_config)
+
+    with pytest.raises(PhotoTooLargeError):
+        async for _ in _read_chunks(
+            photo_service,
+            _upload_file(b'x' * 17, size=None),
+            asyncio.Lock(),
+        ):
+            pass
+
+
+async def test_photo_verdict_cached_by_content(photo_service_config):
+    """Проверка, что повторная проверка той же фотографии не уходит в сервис."""
+    photo_service_session = MagicMock()
+    photo_service_session.post.return_value.__aenter__.return_value = MagicMock(
+        status=200,
+        json=AsyncMock(return_value={'status': 'OK'}),
+    )
+    cache = PhotoVerdictCache(max_size=10, ttl=60, metrics=MagicMock())
+    photo_service = PhotoService(photo_service_session, photo_service_config, cache=cache)
+
+    assert await photo_service.validate_photo(_upload_file(b'photo', size=5), 'doc')
+    assert await photo_service.validate_photo(_upload_file(b'photo', size=5), 'doc')
+    assert await photo_service.validate_photo(_upload_file(b'photo', size=5), 'face')
+
+    assert photo_service_session.post.call_count == 2
+
+
+async def test_response_released_on_error_status(photo_service_config, image_mock):
+    """Проверка, что ответ с ошибкой освобождается и соединение возвращается в пул."""
+    response_context = MagicMock()
+    response_context.__aenter__.return_value = MagicMock(
+        status=500,
+        text=AsyncMock(return_value='error'),
+    )
+    photo_service_session = MagicMock()
+    photo_service_session.post.return_value = response_context
+    photo_service = PhotoService(photo_service_session, photo_service_config)
+
+    with pytest.raises(HttpClientError):
+        await photo_service.validate_photo(image_mock, 'doc')
+
+    response_context.__aexit__.assert_awaited_once()
+
+
+@pytest.mark.parametrize(('status', 'is_server_error'), [(400, False), (503, True)])
+async def test_error_status_classified(photo_service_config, image_mock, status, is_server_error):
+    """Проверка, что сбоем сервиса считаются только ответы 5xx."""
+    response_context = MagicMock()
+    response_context.__aenter__.return_value = MagicMock(
+        status=status,
+        text=AsyncMock(return_value='error'),
+    )
+    photo_service_session = MagicMock()
+    photo_service_session.post.return_value = response_context
+    photo_service = PhotoService(photo_service_session, photo_service_config)
+
+    with pytest.raises(HttpClientError) as exc_info:
+        await photo_service.validate_photo(image_mock, 'doc')
+
+    assert isinstance(exc_info.value, HttpClientServerError) is is_server_error
+
+
+async def test_concurrent_readers_get_whole_photo(photo_service_config, image_mock):
+    """Проверка, что одновременные попытки читают фотографию независимо друг от друга."""
+    photo_service = PhotoService(AsyncMock(), photo_service_config)
+    read_lock = asyncio.Lock()
+
+    async def read_all():
+        chunks = [chunk async for chunk in _read_chunks(photo_service, image_mock, read_lock)]
+        return b''.join(chunks)
+
+    assert await asyncio.gather(read_all(), read_all()) == [b'photo_content', b'photo_content']
+
+
+async def test_validate_photos_concurrently(photo_service_config):
+    """Проверка, что документ и лицо проверяются одновременно и статусы не путаются."""
+    both_sent = asyncio.Event()
+    sent = []
+
+    async def validate_photo(photo, photo_type):
+        sent.append(photo_type)
+        if len(sent) == 2:
+            both_sent.set()
+        await both_sent.wait()
+        return photo_type == 'doc'
+
+    photo_service = PhotoService(MagicMock(), photo_service_config)
+    photo_service.validate_photo = validate_photo
+
+    statuses = await asyncio.wait_for(
+        photo_service.validate_photos(
+            document=_upload_file(b'doc', size=3),
+            face=_upload_file(b'face', size=4),
+        ),
+        timeout=1,
+    )
+
+    assert statuses == (True, False)
+
+
+async def test_validate_photos_cancelled_on_error(photo_service_config):
+    """Проверка, что при ошибке одной проверки вторая отменяется."""
+    face_cancelled = asyncio.Event()
+
+    async def validate_photo(photo, photo_type):
+        if photo_type == 'doc':
+            raise HttpClientTimeoutError(service_name='PhotoService', timeout=1)
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            face_cancelled.set()
+            raise
+
+    photo_service = PhotoService(MagicMock(), photo_service_config)
+    photo_service.validate_photo = validate_photo
+
+    with pytest.raises(HttpClientTimeoutError):
+        await photo_service.validate_photos(
+            document=_upload_file(b'doc', size=3),
+            face=_upload_file(b'face', size=4),
+        )
+
+    assert face_cancelled.is_set()
@@ -0,0 +1,84 @@
+import asyncio
+from unittest.mock import AsyncMock
+
+import pytest
+
+from src.app.services.photo_cache import PhotoVerdictCache
+
+
+async def test_cache_hit(metrics):
+    """Проверка, что повторный запрос с тем же ключом берётся из кэша."""
+    cache = PhotoVerdictCache(max_size=10, ttl=60, metrics=metrics)
+    compute = AsyncMock(return_value=True)
+
+    assert await cache.get_or_compute('key', compute)
+    assert await cache.get_or_compute('key', compute)
+
+    compute.assert_awaited_once()
+    assert [c.args for c in metrics.write_cache_request.call_args_list] == [
+        ('photo_verdict', 'miss'),
+        ('photo_verdict', 'hit'),
+    ]
+    metrics.write_cache_saved_time.assert_called_once()
+
+
+async def test_concurrent_requests_coalesced(metrics):
+    """Проверка, что одновременные запросы с одним ключом выполняются один раз."""
+    cache = PhotoVerdictCache(max_size=10, ttl=60, metrics=metrics)
+    release = asyncio.Event()
+
+    async def compute():
+        await release.wait()
+        return False
+
+    compute_mock = AsyncMock(side_effect=compute)
+    waiters = [asyncio.create_task(cache.get_or_compute('key', compute_mock)) for _ in range(3)]
+    await asyncio.sleep(0)
+    release.set()
+
+    assert await asyncio.gather(*waiters) == [False, False, False]
+    compute_mock.assert_awaited_once()
+
+
+async def test_waiters_recompute_when_leader_cancelled(metrics):
+    """Проверка, что при отмене первого запроса ожидающие проверяют фотографию по своему файлу."""
+    cache = PhotoVerdictCache(max_size=10, ttl=60, metrics=metrics)
+    leader_compute = AsyncMock(side_effect=asyncio.Event().wait)
+    waiter_compute = AsyncMock(return_value=True)
+
+    leader = asyncio.create_task(cache.get_or_compute('key', leader_compute))
+    await asyncio.sleep(0)
+    waiter = asyncio.create_task(cache.get_or_compute('key', waiter_compute))
+    await asyncio.sleep(0)
+    leader.cancel()
+
+    assert await waiter
+    assert leader.cancelled()
+    waiter_compute.assert_awaited_once()
+
+async def test_expired_and_evicted_entries_recomputed(metrics):
+    """Проверка вытеснения устаревших и давно не используемых записей."""
+    compute = AsyncMock(return_value=True)
+
+    expiring_cache = PhotoVerdictCache(max_size=10, ttl=0, metrics=metrics)
+    await expiring_cache.get_or_compute('key', compute)
+    await expiring_cache.get_or_compute('key', compute)
+    assert compute.await_count == 2
+
+    compute.reset_mock()
+    small_cache = PhotoVerdictCache(max_size=1, ttl=60, metrics=metrics)
+    await small_cache.get_or_compute('first', compute)
+    await small_cache.get_or_compute('second', compute)
+    await small_cache.get_or_compute('first', compute)
+    assert compute.await_count == 3
+
+
+async def test_errors_not_cached(metrics):
+    """Проверка, что ошибка запроса в сервис не сохраняется в кэше."""
+    cache = PhotoVerdictCache(max_size=10, ttl=60, metrics=metrics)
+    compute = AsyncMock(side_effect=[RuntimeError, True])
+
+    with pytest.raises(RuntimeError):
+        await cache.get_or_compute('key', compute)
+
+    assert await cache.get_or_compute('key', compute)
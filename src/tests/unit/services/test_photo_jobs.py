@@ -0,0 +1,118 @@
+import asyncio
+import io
+from contextlib import suppress
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from fastapi import UploadFile
+
+from src.app.api.errors import PhotoJobNotFoundError, PhotoJobQueueFullError
+from src.app.api.schemas.photo_job import PhotoJobStatus
+from src.app.external.db.models import UserModel
+from src.app.external.http_errors import HttpClientTimeoutError
+from src.app.services.photo_jobs import PhotoJob, PhotoJobService, _JobStore
+
+
+@pytest.fixture
+def photo_service():
+    photo_service = MagicMock()
+    photo_service.validate_photo = AsyncMock(return_value=True)
+    return photo_service
+
+
+@pytest.fixture
+def user_service():
+    return AsyncMock()
+
+
+@pytest.fixture
+def user():
+    return UserModel(id=1, email='user@example.com')
+
+
+def _photo_job_service(photo_service, user_service, queue_size=10) -> PhotoJobService:
+    return PhotoJobService(
+        photo_service=photo_service,
+        user_service=user_service,
+        metrics=MagicMock(),
+        queue_size=queue_size,
+        workers=2,
+        job_ttl=60,
+        chunk_size=4,
+    )
+
+
+async def _stop(task: asyncio.Task) -> None:
+    task.cancel()
+    with suppress(asyncio.CancelledError):
+        await task
+
+
+def _photo() -> UploadFile:
+    return UploadFile(file=io.BytesIO(b'photo_content'), size=13, filename='photo.jpg')
+
+
+async def test_photo_job_processed(photo_service, user_service, user):
+    """Проверка, что фотография копируется, проверяется в фоне и статус сохраняется."""
+    photo_job_service = _photo_job_service(photo_service, user_service)
+    workers = asyncio.create_task(photo_job_service.run())
+
+    job = await photo_job_service.submit(_photo(), 'doc', user)
+    assert job.status == PhotoJobStatus.pending
+    await photo_job_service._queue.join()
+    await _stop(workers)
+
+    assert photo_job_service.get(job.id, user).status == PhotoJobStatus.validated
+    spooled_photo = photo_service.validate_photo.call_args.args[0]
+    assert spooled_photo.size == 13
+    user_service.update_status_doc.assert_awaited_once_with(user_db=user, status=True)
+
+
+async def test_photo_job_failed(photo_service, user_service, user):
+    """Проверка, что ошибка сервиса сохраняется в задаче, а статус пользователя не меняется."""
+    photo_service.validate_photo.side_effect = HttpClientTimeoutError('PhotoService', 2)
+    photo_job_service = _photo_job_service(photo_service, user_service)
+    workers = asyncio.create_task(photo_job_service.run())
+
+    job = await photo_job_service.submit(_photo(), 'face', user)
+    await photo_job_service._queue.join()
+    await _stop(workers)
+
+    assert job.status == PhotoJobStatus.failed
+    assert 'PhotoService' in job.detail
+    user_service.update_status_face.assert_not_awaited()
+
+
+async def test_photo_job_queue_full(photo_service, user_service, user):
+    """Проверка, что при заполненной очереди задача не принимается."""
+    photo_job_service = _photo_job_service(photo_service, user_service, queue_size=1)
+    await photo_job_service.submit(_photo(), 'doc', user)
+
+    with pytest.raises(PhotoJobQueueFullError):
+        await photo_job_service.submit(_photo(), 'doc', user)
+
+
+async def test_photo_job_of_another_user(photo_service, user_service, user):
+    """Проверка, что задача другого пользователя не отдаётся."""
+    photo_job_service = _photo_job_service(photo_service, user_service)
+    job = await photo_job_service.submit(_photo(), 'doc', user)
+
+    with pytest.raises(PhotoJobNotFoundError):
+        photo_job_service.get(job.id, UserModel(id=2, email='other@example.com'))
+
+
+def test_finished_jobs_expire_behind_unfinished(user):
+    """Проверка, что незавершённая задача не мешает удалять завершённые после неё."""
+    jobs = _JobStore(job_ttl=0)
+    pending, finished = (
+        PhotoJob(id=job_id, user=user, photo_type='doc', photo=_photo(), created_at=0)
+        for job_id in ('pending', 'finished')
+    )
+    jobs.add(pending)
+    jobs.add(finished)
+    jobs.finish(finished)
+
+    jobs.add(PhotoJob(id='next', user=user, photo_type='doc', photo=_photo(), created_at=0))
+
+    assert jobs.get('finished') is None
+    assert jobs.get('pending') is pending
@@ -0,0 +1,75 @@
+import io
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import MagicMock
+
+import pytest
+from fastapi import UploadFile
+
+from src.app.api.errors import PhotoTooLargeError
+from src.app.services.photo_preprocessing import PhotoPreprocessor, downscale_image
+
+Image = pytest.importorskip('PIL.Image')
+
+
+def _image(width: int, height: int, image_format: str = 'PNG') -> bytes:
+    output = io.BytesIO()
+    Image.effect_noise((width, height), 64).convert('RGB').save(output, format=image_format)
+    return output.getvalue()
+
+
+@pytest.fixture
+def executor():
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        yield executor
+
+
+def _preprocessor(executor, metrics, min_size=0) -> PhotoPreprocessor:
+    return PhotoPreprocessor(
+        executor=executor,
+        metrics=metrics,
+        max_side=100,
+        quality=80,
+        min_size=min_size,
+        max_photo_size=1024 * 1024,
+    )
+
+
+def test_downscale_image():
+    """Проверка уменьшения изображения по большей стороне."""
+    downscaled = downscale_image(_image(400, 200), max_side=100, quality=80)
+
+    with Image.open(io.BytesIO(downscaled)) as image:
+        assert image.format == 'JPEG'
+        assert image.size == (100, 50)
+
+
+async def test_large_photo_downscaled(executor, metrics):
+    """Проверка, что большая фотография заменяется уменьшенной, а экономия записывается."""
+    data = _image(400, 400)
+    photo = UploadFile(file=io.BytesIO(data), size=len(data), filename='photo.png')
+
+    prepared = await _preprocessor(executor, metrics).prepare(photo)
+
+    assert prepared.size < len(data)
+    assert prepared.content_type == 'image/jpeg'
+    timing_s, saved_bytes = metrics.write_photo_preprocessing.call_args.args
+    assert saved_bytes == len(data) - prepared.size
+
+
+async def test_small_or_broken_photo_kept(executor, metrics):
+    """Проверка, что маленькие и нераспознанные фотографии отправляются как есть."""
+    small_photo = UploadFile(file=io.BytesIO(b'small'), size=5, filename='photo.jpg')
+    assert await _preprocessor(executor, metrics, min_size=10).prepare(small_photo) is small_photo
+
+    broken_photo = UploadFile(file=io.BytesIO(b'not an image'), size=12, filename='photo.jpg')
+    assert await _preprocessor(executor, metrics).prepare(broken_photo) is broken_photo
+
+
+async def test_photo_over_max_size_not_read(executor, metrics):
+    """Проверка, что фотография больше max_photo_size не читается в память."""
+    photo = UploadFile(file=MagicMock(), size=2 * 1024 * 1024, filename='photo.jpg')
+
+    with pytest.raises(PhotoTooLargeError):
+        await _preprocessor(executor, metrics).prepare(photo)
+
+    photo.file.read.assert_not_called()
@@ -0,0 +1,98 @@
+from contextvars import copy_context
+
+from fastapi import HTTPException
+from prometheus_client.openmetrics.exposition import generate_latest as generate_openmetrics
+
+from app.system.mdw_fastapi.middlewares.errors import classify_error
+from app.system.mdw_prometheus_metrics import exemplars
+from app.system.mdw_prometheus_metrics.service.collector import ServiceCollector
+from app.system.mdw_prometheus_metrics.service.labels import RequestDuration
+from src.app.external.http_errors import HttpClientTimeoutError
+
+
+def test_label_sets_limited():
+    """Проверка, что наборы лейблов сверх лимита пишутся в серию overflow."""
+    collector = ServiceCollector('service', max_label_sets=2)
+
+    for operation in ['GET /a', 'GET /b', 'GET /c', 'GET /d', 'GET /a']:
+        collector.write_timing(0.1, RequestDuration(operation=operation, http_status_code=200))
+
+    metrics = collector.export_activity_metrics().decode()
+    assert 'operation="GET /a"' in metrics
+    assert 'operation="GET /b"' in metrics
+    assert 'operation="GET /c"' not in metrics
+    assert (
+        'dp_service_http_request_duration_seconds_count{error="overflow",'
+        'http_status_code="overflow",operation="overflow",service="service",'
+        'span_kind="overflow"} 2.0'
+    ) in metrics
+    assert (
+        'dp_service_metric_series{metric="dp_service_http_request_duration_seconds",'
+        'service="service"} 3.0'
+    ) in metrics
+
+
+def test_children_cached_by_labels():
+    """Проверка, что серия метрики берётся из кэша по равному объекту лейблов."""
+    collector = ServiceCollector('service')
+
+    collector.write_timing(0.1, RequestDuration(operation='GET /a', http_status_code=200))
+    collector.write_timing(0.2, RequestDuration(operation='GET /a', http_status_code=200))
+
+    assert len(collector._activity.children) == 1
+    metrics = collector.export_activity_metrics().decode()
+    assert (
+        'dp_service_http_request_duration_seconds_count{error="False",http_status_code="200",'
+        'operation="GET /a",service="service",span_kind="server"} 2.0'
+    ) in metrics
+
+    collector.new_activity_metrics()
+    assert collector._activity.children == {}
+
+
+def test_snapshot_resets_activity_metrics():
+    """Проверка, что выгрузка со сбросом отдаёт накопленные значения и начинает отсчёт заново."""
+    collector = ServiceCollector('service')
+    count_sample = (
+        'dp_service_http_request_duration_seconds_count{error="False",http_status_code="200",'
+        'operation="GET /a",service="service",span_kind="server"}'
+    )
+    collector.write_timing(0.1, RequestDuration(operation='GET /a', http_status_code=200))
+    collector.write_timing(0.1, RequestDuration(operation='GET /a', http_status_code=200))
+
+    snapshot = collector.snapshot_activity_metrics().decode()
+    collector.write_timing(0.1, RequestDuration(operation='GET /a', http_status_code=200))
+
+    assert f'{count_sample} 2.0' in snapshot
+    assert f'{count_sample} 1.0' in collector.export_activity_metrics().decode()
+
+
+def test_timing_exemplar_carries_request_id():
+    """Проверка, что в OpenMetrics у бакета наблюдения есть exemplar с айди запроса."""
+    collector = ServiceCollector('service')
+
+    def write_request_timing():
+        exemplars.set_request_id('request-uid')
+        collector.write_timing(0.3, RequestDuration(operation='GET /a', http_status_code=200))
+
+    copy_context().run(write_request_timing)
+    collector.write_timing(0.03, RequestDuration(operation='GET /a', http_status_code=200))
+
+    metrics = collector.export_activity_metrics(generate_openmetrics).decode()
+    assert (
+        'dp_service_http_request_duration_seconds_bucket{error="False",http_status_code="200",'
+        'le="0.3",operation="GET /a",service="service",span_kind="server"} 2.0 '
+        '# {request_id="request-uid"} 0.3'
+    ) in metrics
+    assert (
+        'dp_service_http_request_duration_seconds_bucket{error="False",http_status_code="200",'
+        'le="0.05",operation="GET /a",service="service",span_kind="server"} 1.0\n'
+    ) in metrics
+    assert '# {' not in collector.export_activity_metrics().decode()
+
+
+def test_classify_error():
+    """Проверка, что в метрику ошибок попадает код ошибки, а не её текст."""
+    assert classify_error(HTTPException(status_code=404, detail='/user/123')) == 'not_found'
+    assert classify_error(HttpClientTimeoutError('PhotoService', 2)) == 'http_client_timeout_error'
+    assert classify_error(ValueError('user 123')) == 'value_error'
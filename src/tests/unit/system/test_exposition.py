@@ -0,0 +1,58 @@
+import gzip
+
+from prometheus_client.exposition import CONTENT_TYPE_LATEST
+from prometheus_client.openmetrics.exposition import CONTENT_TYPE_LATEST as OPENMETRICS_TYPE
+
+from app.system.mdw_prometheus_metrics.exposition import MetricsExposition
+from app.system.mdw_prometheus_metrics.service.collector import ServiceCollector
+
+
+def _metric_value(collector: ServiceCollector, name: str, labels: dict) -> float | None:
+    return collector._activity.registry.get_sample_value(name, {'service': 'service', **labels})
+
+
+def test_render_cached_until_ttl():
+    """Проверка, что в пределах ttl метрики не рендерятся повторно."""
+    collector = ServiceCollector('service')
+    exposition = MetricsExposition(ttl=60, metrics=collector)
+    calls = []
+
+    def export(encoder):
+        calls.append(encoder)
+        return b'metrics\n'
+
+    first = exposition.render('activity', export, accept=None, accept_encoding=None)
+    second = exposition.render('activity', export, accept=None, accept_encoding=None)
+
+    assert first.body == second.body == b'metrics\n'
+    assert first.content_type == CONTENT_TYPE_LATEST
+    assert len(calls) == 1
+    render_labels = {'registry': 'activity', 'format': 'prometheus'}
+    assert _metric_value(
+        collector, 'dp_service_metrics_render_duration_seconds_count', render_labels,
+    ) == 1
+
+    exposition.clear()
+    exposition.render('activity', export, accept=None, accept_encoding=None)
+    assert len(calls) == 2
+
+
+def test_render_openmetrics_gzip():
+    """Проверка выбора формата OpenMetrics по Accept и сжатия по Accept-Encoding."""
+    collector = ServiceCollector('service')
+    exposition = MetricsExposition(ttl=60, metrics=collector)
+
+    rendered = exposition.render(
+        'activity',
+        collector.export_activity_metrics,
+        accept='application/openmetrics-text; version=1.0.0',
+        accept_encoding='gzip, deflate',
+    )
+
+    assert rendered.content_type == OPENMETRICS_TYPE
+    assert rendered.content_encoding == 'gzip'
+    assert gzip.decompress(rendered.body).endswith(b'# EOF\n')
+    payload_labels = {'registry': 'activity', 'format': 'openmetrics', 'encoding': 'gzip'}
+    assert _metric_value(
+        collector, 'dp_service_metrics_payload_bytes', payload_labels,
+    ) == len(rendered.body)
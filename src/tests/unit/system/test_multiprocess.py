@@ -0,0 +1,57 @@
+import pytest
+from prometheus_client import values
+
+from app.system.mdw_prometheus_metrics import multiprocess
+from app.system.mdw_prometheus_metrics.service.collector import ServiceCollector
+from app.system.mdw_prometheus_metrics.service.labels import RequestDuration
+
+_COUNT_SAMPLE = (
+    'dp_service_http_request_duration_seconds_count{error="False",http_status_code="200",'
+    'operation="GET /a",service="service",span_kind="server"}'
+)
+
+
+@pytest.fixture
+def workers(tmp_path, monkeypatch):
+    """Коллекторы двух воркеров, которые пишут метрики в файлы общей директории."""
+    monkeypatch.setenv(multiprocess.MULTIPROC_DIR_ENV, str(tmp_path))
+    collectors = []
+    for pid in (1, 2):
+        monkeypatch.setattr(values, 'ValueClass', values.MultiProcessValue(lambda pid=pid: pid))
+        collectors.append(ServiceCollector('service'))
+    return collectors
+
+
+def test_metrics_aggregated_across_workers(workers):
+    """Проверка, что экспорт любого воркера содержит сумму значений всех воркеров."""
+    for collector in workers:
+        collector.write_timing(0.1, RequestDuration(operation='GET /a', http_status_code=200))
+
+    metrics = workers[0].export_activity_metrics().decode()
+
+    assert f'{_COUNT_SAMPLE} 2.0' in metrics
+    assert 'dp_service_metric_series{' in metrics
+
+
+def test_reset_across_workers(workers):
+    """Проверка, что сброс метрик в одном воркере обнуляет значения всех воркеров."""
+    for collector in workers:
+        collector.write_timing(0.1, RequestDuration(operation='GET /a', http_status_code=200))
+
+    workers[0].reset_activity_metrics()
+    workers[1].write_timing(0.1, RequestDuration(operation='GET /a', http_status_code=200))
+
+    assert f'{_COUNT_SAMPLE} 1.0' in workers[0].export_activity_metrics().decode()
+    assert f'{_COUNT_SAMPLE} 1.0' in workers[1].export_activity_metrics().decode()
+
+
+def test_snapshot_across_workers(workers):
+    """Проверка, что выгрузка со сбросом возвращает сумму воркеров и обнуляет её."""
+    for collector in workers:
+        collector.write_timing(0.1, RequestDuration(operation='GET /a', http_status_code=200))
+
+    snapshot = workers[0].snapshot_activity_metrics().decode()
+    workers[1].write_timing(0.1, RequestDuration(operation='GET /a', http_status_code=200))
+
+    assert f'{_COUNT_SAMPLE} 2.0' in snapshot
+    assert f'{_COUNT_SAMPLE} 1.0' in workers[0].export_activity_metrics().decode()
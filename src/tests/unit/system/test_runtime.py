@@ -0,0 +1,62 @@
+import asyncio
+import gc
+import time
+
+from app.system.mdw_prometheus_metrics.runtime import RuntimeMonitor
+from app.system.mdw_prometheus_metrics.service.collector import ServiceCollector
+
+
+async def test_probe_records_event_loop_lag():
+    """Проверка, что блокировка event loop попадает в метрику задержки."""
+    collector = ServiceCollector('service')
+    monitor = RuntimeMonitor(collector, interval=0.01)
+
+    probe = asyncio.create_task(monitor.probe())
+    await asyncio.sleep(0)
+    time.sleep(0.05)  # noqa: WPS432 блокирует event loop
+    await probe
+
+    lag_sum = collector._activity.registry.get_sample_value(
+        'dp_service_event_loop_lag_seconds_sum',
+        {'service': 'service'},
+    )
+    assert lag_sum >= 0.03
+    assert collector._health.registry.get_sample_value(
+        'dp_service_process_resident_memory_bytes',
+        {'name': 'service', 'type': 'backend'},
+    ) > 0
+
+
+async def test_run_records_gc_pauses():
+    """Проверка, что паузы сборщика мусора пишутся в метрику и колбэк снимается при отмене."""
+    collector = ServiceCollector('service')
+    monitor = RuntimeMonitor(collector, interval=0.01)
+
+    task = asyncio.create_task(monitor.run())
+    await asyncio.sleep(0)
+    gc.collect()
+    await asyncio.sleep(0.05)
+    task.cancel()
+    await asyncio.gather(task, return_exceptions=True)
+
+    assert collector._activity.registry.get_sample_value(
+        'dp_service_gc_pause_seconds_count',
+        {'service': 'service', 'generation': '2'},
+    ) >= 1
+    assert monitor._on_gc not in gc.callbacks
+
+
+def test_track_in_flight():
+    """Проверка, что запрос учитывается в обрабатываемых только на время обработки."""
+    collector = ServiceCollector('service')
+    labels = {'service': 'service', 'operation': 'GET /a'}
+
+    with collector.track_in_flight('GET /a'):
+        in_flight = collector._activity.registry.get_sample_value(
+            'dp_service_http_requests_in_flight', labels,
+        )
+
+    assert in_flight == 1
+    assert collector._activity.registry.get_sample_value(
+        'dp_service_http_requests_in_flight', labels,
+    ) == 0
@@ -0,0 +1,56 @@
+import random
+
+import pytest
+
+from app.system.mdw_prometheus_metrics.service.sketch import (
+    DDSketch,
+    LatencySketches,
+    RollingSketch,
+)
+
+
+def test_quantile_relative_accuracy():
+    """Проверка, что квантили отличаются от точных не больше чем на relative_accuracy."""
+    values = sorted(random.lognormvariate(-3, 1) for _ in range(10000))
+    sketch = DDSketch(relative_accuracy=0.01, max_bins=2048)
+    for value in values:
+        sketch.add(value)
+
+    for q in (0.5, 0.9, 0.99, 0.999):
+        exact = values[int(q * (len(values) - 1))]
+        assert sketch.quantile(q) == pytest.approx(exact, rel=0.01)
+
+
+def test_bins_limited():
+    """Проверка, что число бинов не растёт сверх max_bins, а верхние квантили сохраняются."""
+    sketch = DDSketch(relative_accuracy=0.01, max_bins=16)
+    for power in range(-60, 5):
+        sketch.add(1.5 ** power)
+
+    assert len(sketch._bins) == 16
+    assert sketch.quantile(1) == pytest.approx(1.5 ** 4, rel=0.01)
+
+
+def test_rolling_window_drops_old_slots():
+    """Проверка, что значения старше окна не попадают в квантили."""
+    sketch = RollingSketch(window=10, slots=5, relative_accuracy=0.01, max_bins=2048)
+    sketch.add(1.0, now=0)
+    sketch.add(2.0, now=9)
+
+    assert sketch.merged(now=9).count == 2
+    assert sketch.merged(now=11).count == 1
+    assert sketch.merged(now=11).quantile(0.5) == pytest.approx(2.0, rel=0.01)
+
+
+def test_operations_limited():
+    """Проверка, что операции сверх лимита пишутся в overflow."""
+    sketches = LatencySketches(max_operations=1)
+    sketches.observe('server', 'GET /a', 0.1)
+    sketches.observe('server', 'GET /b', 0.2)
+
+    report = sketches.quantiles([0.5])
+
+    assert [(kind, operation, count) for kind, operation, count, _ in report] == [
+        ('server', 'GET /a', 1),
+        ('server', 'overflow', 1),
+    ]
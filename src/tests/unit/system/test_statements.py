@@ -0,0 +1,124 @@
+import asyncio
+import logging
+
+import pytest
+from fastapi import APIRouter, FastAPI
+from fastapi.responses import StreamingResponse
+from httpx import AsyncClient
+
+import app.system.mdw_prometheus_metrics as prometheus_metrics
+from app.system.mdw_fastapi.api.route import LoggedRoute, statements_budget
+from app.system.mdw_prometheus_metrics.service.collector import ServiceCollector
+from app.system.mdw_sqlalchemy import statements
+from app.system.mdw_sqlalchemy.timing import statement_kind
+
+
+def _execute_statement():
+    statements._on_before_cursor_execute(None, None, 'SELECT 1', (), None, False)
+
+
+async def _execute_statement_async():
+    _execute_statement()
+
+
+@pytest.fixture
+def service_registry(monkeypatch):
+    registry = ServiceCollector('service')
+    monkeypatch.setattr(prometheus_metrics, '_service_registry', registry)
+    return registry
+
+
+def _budget_app(statements_count: int) -> FastAPI:
+    """Приложение с хендлерами с бюджетом в один запрос, выполняющими statements_count запросов.
+
+    Потоковый хендлер выполняет запросы при отдаче тела, обычный - в самом хендлере.
+    """
+    router = APIRouter(route_class=LoggedRoute)
+
+    async def rows():
+        for _ in range(statements_count):
+            _execute_statement()
+            yield 'row\n'
+
+    @router.get('/export')
+    @statements_budget(1)
+    async def export():
+        return StreamingResponse(rows())
+
+    @router.get('/user')
+    @statements_budget(1)
+    async def user():
+        for _ in range(statements_count):
+            _execute_statement()
+        return {'id': 1}
+
+    budget_app = FastAPI()
+    budget_app.include_router(router)
+    return budget_app
+
+
+async def test_statements_counted_in_child_tasks():
+    """Проверка, что запросы из дочерних задач попадают в счётчик запроса."""
+    counter = statements.start_counting()
+
+    _execute_statement()
+    await asyncio.gather(
+        asyncio.create_task(_execute_statement_async()),
+        asyncio.to_thread(_execute_statement),
+    )
+
+    assert counter.count == 3
+
+
+async def test_statements_not_counted_outside_request():
+    """Проверка, что без начатого подсчёта запросы не учитываются."""
+    statements.statements_counter.set(None)
+
+    _execute_statement()
+
+    assert statements.statements_counter.get() is None
+
+
+async def test_streamed_statements_counted(service_registry):
+    """Проверка, что запросы при отдаче потокового ответа попадают в метрику запроса."""
+    async with AsyncClient(app=_budget_app(1), base_url='http://testserver') as client:
+        resp = await client.get('/export')
+
+    assert resp.text == 'row\n'
+    exported = service_registry.export_activity_metrics().decode()
+    assert (
+        'dp_service_http_request_db_statements_sum{operation="GET /export",service="service"} 1.0'
+        in exported
+    )
+
+
+async def test_streamed_statements_budget_checked(service_registry, monkeypatch, caplog):
+    """Проверка, что бюджет потокового хендлера сверяется после отдачи тела."""
+    monkeypatch.setattr(statements, '_strict_budget', False)
+    caplog.set_level(logging.INFO, logger='app.api')
+    async with AsyncClient(app=_budget_app(2), base_url='http://testserver') as client:
+        await client.get('/export')
+
+    messages = [record.msg for record in caplog.records if record.name == 'app.api']
+    assert messages[-2] == 'GET /export executed 2 sql statements, budget 1'
+    assert messages[-1]['db_statements'] == 2
+
+
+async def test_strict_budget_logged_as_error(service_registry, monkeypatch, caplog):
+    """Проверка, что ответ хендлера сверх строгого бюджета логируется со статусом 500."""
+    monkeypatch.setattr(statements, '_strict_budget', True)
+    caplog.set_level(logging.INFO, logger='app.api')
+    async with AsyncClient(app=_budget_app(2), base_url='http://testserver') as client:
+        with pytest.raises(statements.StatementsBudgetExceeded):
+            await client.get('/user')
+
+    response_log = [record.msg for record in caplog.records if record.name == 'app.api'][-1]
+    assert response_log['status_code'] == 500
+    assert response_log['db_statements'] == 2
+
+
+def test_statement_kind():
+    """Проверка, что в лейбл метрики попадает тип запроса, а не его текст."""
+    assert statement_kind('SELECT users.id FROM users WHERE users.id = $1') == 'SELECT'
+    assert statement_kind('\n  insert into users (id) values ($1)') == 'INSERT'
+    assert statement_kind('') == 'UNKNOWN'
@@ -0,0 +1,127 @@
+import asyncio
+
+from app.system.mdw_prometheus_metrics.service.collector import ServiceCollector
+from app.system.mdw_tracing import Tracer
+from app.system.mdw_tracing.export import (
+    BatchSpanProcessor,
+    InMemorySpanExporter,
+    OtlpSpanExporter,
+)
+from app.system.mdw_tracing.spans import CLIENT, child_span, finish_span, start_span
+
+
+def _processor(max_queue_size: int = 100) -> tuple[BatchSpanProcessor, InMemorySpanExporter]:
+    exporter = InMemorySpanExporter()
+    processor = BatchSpanProcessor(
+        exporter=exporter,
+        metrics=ServiceCollector('service'),
+        batch_size=2,
+        flush_interval=1,
+        max_queue_size=max_queue_size,
+    )
+    return processor, exporter
+
+
+def _sql_span():
+    span = start_span('postgresql SELECT', CLIENT)
+    finish_span(span, {'db.statement': 'SELECT 1'})
+
+
+async def _sql_span_async():
+    _sql_span()
+
+
+async def test_trace_collects_spans_of_child_tasks():
+    """Проверка, что спаны дочерних задач и потоков попадают в трейс запроса."""
+    processor, exporter = _processor()
+    tracer = Tracer(processor=processor, slow_threshold=10, tail_sample_rate=1)
+
+    with tracer.trace('GET /user') as root:
+        with child_span('handler') as handler:
+            _sql_span()
+            await asyncio.gather(
+                asyncio.to_thread(_sql_span),
+                asyncio.create_task(_sql_span_async()),
+            )
+    await processor.flush()
+
+    assert {span['trace_id'] for span in exporter.spans} == {root.trace_id}
+    parents = {span['name']: span['parent_id'] for span in exporter.spans}
+    assert parents == {
+        'GET /user': None,
+        'handler': root.span_id,
+        'postgresql SELECT': handler.span_id,
+    }
+    assert len(exporter.spans) == 5
+    assert start_span('outside', CLIENT) is None
+
+
+async def test_tail_sampling_keeps_errors():
+    """Проверка, что трейсы с ошибкой отправляются, а быстрые без ошибок - отбрасываются."""
+    processor, exporter = _processor()
+    tracer = Tracer(processor=processor, slow_threshold=10, tail_sample_rate=0)
+
+    with tracer.trace('GET /fast'):
+        _sql_span()
+    with tracer.trace('GET /failed'):
+        span = start_span('GET http://photo/verify', CLIENT)
+        finish_span(span, error=True)
+    await processor.flush()
+
+    assert [span['name'] for span in exporter.spans] == ['GET http://photo/verify', 'GET /failed']
+
+
+async def test_head_sampling_skips_trace():
+    """Проверка, что трейс не в выборке не создаёт спанов."""
+    processor, exporter = _processor()
+    tracer = Tracer(processor=processor, head_sample_rate=0)
+
+    with tracer.trace('GET /user') as root:
+        assert start_span('postgresql SELECT', CLIENT) is None
+    await processor.flush()
+
+    assert root is None
+    assert exporter.spans == []
+
+
+async def test_spans_over_limits_dropped():
+    """Проверка ограничений числа спанов в трейсе и в очереди отправки."""
+    processor, exporter = _processor(max_queue_size=6)
+    tracer = Tracer(processor=processor, slow_threshold=0, max_spans=3)
+
+    with tracer.trace('GET /user') as root:
+        for _ in range(5):
+            _sql_span()
+    # Второй трейс не помещается в очередь и отбрасывается целиком
+    with tracer.trace('GET /user/cards'):
+        for _ in range(5):
+            _sql_span()
+    await processor.flush()
+
+    assert root.tags['dropped_spans'] == 2
+    assert {span['trace_id'] for span in exporter.spans} == {root.trace_id}
+    assert [span['name'] for span in exporter.spans][-1] == 'GET /user'
+    assert len(exporter.spans) == 4
+    metrics = processor._metrics.export_activity_metrics().decode()
+    assert 'dp_service_trace_spans_total{result="exported",service="service"} 4.0' in metrics
+    assert 'dp_service_trace_spans_total{result="dropped",service="service"} 4.0' in metrics
+
+
+def test_otlp_payload():
+    """Проверка, что спаны переводятся в формат OTLP/JSON."""
+    tracer = Tracer(processor=_processor()[0], slow_threshold=0)
+    with tracer.trace('GET /user') as root:
+        root.tags['http.status_code'] = 200
+
+    payload = OtlpSpanExporter('http://collector', 'credit_card', 1).payload([root])
+
+    resource_spans = payload['resourceSpans'][0]
+    assert resource_spans['resource']['attributes'] == [
+        {'key': 'service.name', 'value': {'stringValue': 'credit_card'}},
+    ]
+    otlp_span = resource_spans['scopeSpans'][0]['spans'][0]
+    assert otlp_span['traceId'] == root.trace_id
+    assert otlp_span['kind'] == 2
+    assert 'parentSpanId' not in otlp_span
+    assert otlp_span['attributes'] == [{'key': 'http.status_code', 'value': {'intValue': '200'}}]
+    assert int(otlp_span['endTimeUnixNano']) >= int(otlp_span['startTimeUnixNano'])
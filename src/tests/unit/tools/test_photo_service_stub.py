@@ -0,0 +1,30 @@
+import aiohttp
+from aiohttp.test_utils import TestClient, TestServer
+
+from src.tools.photo_service_stub import StubSettings, create_app
+
+
+async def _post_photo(client: TestClient, path: str) -> aiohttp.ClientResponse:
+    form = aiohttp.FormData()
+    form.add_field('photo', b'photo_content', filename='photo.jpg', content_type='image/jpeg')
+    return await client.post(path, data=form)
+
+
+async def test_stub_validates_photo():
+    """Проверка ответов заглушки PhotoService."""
+    settings = StubSettings(median=0, reject_rate=1)
+    async with TestClient(TestServer(create_app(settings))) as client:
+        resp = await _post_photo(client, '/doc')
+        assert resp.status == 200
+        assert (await resp.json())['status'] == 'NOT OK'
+
+        resp = await client.get('/healthz/up')
+        assert resp.status == 200
+
+
+async def test_stub_errors():
+    """Проверка, что заглушка отвечает ошибкой с заданной долей."""
+    settings = StubSettings(median=0, error_rate=1)
+    async with TestClient(TestServer(create_app(settings))) as client:
+        resp = await _post_photo(client, '/face')
+        assert resp.status == 500
@@ -0,0 +1,90 @@
+"""Микробенчмарк записи метрик запроса в ServiceCollector.
+
+Сравнивает запись с поиском серии через labels(**asdict(...)), как до кэширования серий,
+с текущими write_timing, write_external_timing и write_error. Операции берутся по кругу
+из небольшого набора, как у сервиса с несколькими маршрутами.
+
+Запуск:
+    python -m src.tools.metrics_benchmark --calls 200000 --operations 20
+"""
+import argparse
+import time
+from dataclasses import asdict
+from http import HTTPStatus
+from typing import Callable
+
+from src.app.system.mdw_prometheus_metrics.service.collector import ServiceCollector
+from src.app.system.mdw_prometheus_metrics.service.labels import ErrorsCount, RequestDuration
+
+_SERVICE = 'benchmark'
+# Длительность, которая записывается в гистограммы, секунды
+_LATENCY = 0.01
+
+Write = Callable[[int], None]
+
+
+def measure(write: Write, calls: int) -> float:
+    """Среднее время одного вызова write в наносекундах."""
+    start_time = time.perf_counter_ns()
+    for index in range(calls):
+        write(index)
+    return (time.perf_counter_ns() - start_time) / calls
+
+
+def build_cases(collector: ServiceCollector, operations: int) -> dict[str, tuple[Write, Write]]:
+    """Для каждого метода коллектора: запись с поиском серии через labels и запись методом."""
+    requests = [
+        RequestDuration(operation=f'GET /route/{index}', http_status_code=HTTPStatus.OK.value)
+        for index in range(operations)
+    ]
+    errors = [
+        ErrorsCount(
+            operation=f'GET /route/{index}',
+            http_status_code=HTTPStatus.NOT_FOUND.value,
+            error_text='not_found',
+        )
+        for index in range(operations)
+    ]
+    # Метрики без кэша серий доступны только через внутренний реестр коллектора
+    activity = collector._activity
+    server = activity.request_latency_histogram
+    client = activity.external_request_latency_histogram
+    return {
+        'write_timing': (
+            lambda index: server.labels(
+                service=_SERVICE, **asdict(requests[index % operations]), span_kind='server',
+            ).observe(_LATENCY),
+            lambda index: collector.write_timing(_LATENCY, requests[index % operations]),
+        ),
+        'write_external_timing': (
+            lambda index: client.labels(
+                service=_SERVICE, **asdict(requests[index % operations]), span_kind='client',
+            ).observe(_LATENCY),
+            lambda index: collector.write_external_timing(_LATENCY, requests[index % operations]),
+        ),
+        'write_error': (
+            lambda index: activity.errors_counter.labels(
+                service=_SERVICE, **asdict(errors[index % operations]),
+            ).inc(),
+            lambda index: collector.write_error(errors[index % operations]),
+        ),
+    }
+
+
+def main():
+    """Выводит среднее время записи метрик без кэша серий и с ним."""
+    ap = argparse.ArgumentParser(description='Стоимость записи метрик запроса')
+    ap.add_argument('--calls', type=int, default=200_000, help='Вызовов на каждый замер')
+    ap.add_argument('--operations', type=int, default=20, help='Разных операций')
+    options = ap.parse_args()
+
+    cases = build_cases(ServiceCollector(_SERVICE), options.operations)
+    for name, (uncached, cached) in cases.items():
+        before = measure(uncached, options.calls)
+        after = measure(cached, options.calls)
+        speedup = before / after
+        print(f'{name}: labels(**asdict) {before:.0f}ns, cached {after:.0f}ns, x{speedup:.1f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,93 @@
+"""Локальная замена PhotoService для нагрузочного тестирования.
+
+Реализует /doc, /face и /healthz/up. Задержка ответа берётся из заданного распределения,
+часть запросов завершается ошибкой 500 или отклонением фотографии.
+
+Запуск: python -m src.tools.photo_service_stub --latency lognormal --median 0.2 --error-rate 0.01
+"""
+import argparse
+import asyncio
+import random
+from dataclasses import dataclass
+
+from aiohttp import web
+
+
+@dataclass
+class StubSettings:
+    latency: str = 'fixed'
+    median: float = 0.1
+    sigma: float = 0.5
+    error_rate: float = 0
+    reject_rate: float = 0
+    seed: int | None = None
+
+
+class LatencyDistribution:
+    """Распределение задержки ответа: fixed, uniform (от 0 до 2 * median) или lognormal."""
+
+    def __init__(self, settings: StubSettings):
+        self._settings = settings
+        self._random = random.Random(settings.seed)
+
+    def sample(self) -> float:
+        if self._settings.latency == 'uniform':
+            return self._random.uniform(0, 2 * self._settings.median)
+        if self._settings.latency == 'lognormal':
+            return self._settings.median * self._random.lognormvariate(0, self._settings.sigma)
+        return self._settings.median
+
+    def chance(self, rate: float) -> bool:
+        return self._random.random() < rate
+
+
+def create_app(settings: StubSettings) -> web.Application:
+    """Создаёт приложение заглушки PhotoService."""
+    distribution = LatencyDistribution(settings)
+
+    async def validate(request: web.Request) -> web.Response:
+        # Тело читается целиком, как это делает настоящий сервис
+        received = 0
+        async for chunk in request.content.iter_any():
+            received += len(chunk)
+        await asyncio.sleep(distribution.sample())
+        if distribution.chance(settings.error_rate):
+            return web.json_response({'error': 'stub error'}, status=500)
+        status = 'NOT OK' if distribution.chance(settings.reject_rate) else 'OK'
+        return web.json_response({'status': status, 'received': received})
+
+    async def up(request: web.Request) -> web.Response:
+        return web.json_response({'status': 'UP'})
+
+    app = web.Application()
+    app.router.add_post('/doc', validate)
+    app.router.add_post('/face', validate)
+    app.router.add_get('/healthz/up', up)
+    return app
+
+
+def main():
+    ap = argparse.ArgumentParser(description='Заглушка PhotoService')
+    ap.add_argument('--host', default='127.0.0.1')
+    ap.add_argument('--port', type=int, default=8001)
+    ap.add_argument('--latency', choices=['fixed', 'uniform', 'lognormal'], default='fixed')
+    ap.add_argument('--median', type=float, default=0.1, help='Медиана задержки в секундах')
+    ap.add_argument('--sigma', type=float, default=0.5, help='Разброс для lognormal')
+    ap.add_argument('--error-rate', type=float, default=0, help='Доля ответов 500')
+    ap.add_argument('--reject-rate', type=float, default=0, help='Доля ответов NOT OK')
+    ap.add_argument('--seed', type=int, default=None)
+    options = ap.parse_args()
+
+    settings = StubSettings(
+        latency=options.latency,
+        median=options.median,
+        sigma=options.sigma,
+        error_rate=options.error_rate,
+        reject_rate=options.reject_rate,
+        seed=options.seed,
+    )
+    web.run_app(create_app(settings), host=options.host, port=options.port, access_log=None)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,180 @@
+"""Нагрузочный сценарий загрузки фотографий.
+
+Регистрирует пользователя, получает токен и отправляет фотографии разных размеров
+в /user/document или /user/face запущенного сервиса. Для каждого размера выводит пропускную
+способность, перцентили задержки и память процессов сервиса (если указан --server-pid).
+
+Запуск:
+    python -m src.tools.photo_service_stub --latency lognormal --median 0.2 &
+    ./start.sh &
+    python -m src.tools.upload_benchmark --sizes 100k,1m,5m --requests 200 --concurrency 20 \\
+        --server-pid $(pgrep -d, -f src.app.service)
+
+При service.workers > 1 pgrep находит мастер и все воркеры: --server-pid принимает PID через
+запятую, память выводится суммой по процессам, а пиковая - суммой пиков каждого процесса.
+"""
+import argparse
+import asyncio
+import os
+import time
+import uuid
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import aiohttp
+
+_SIZE_SUFFIXES = {'k': 1024, 'm': 1024 * 1024}
+
+
+@dataclass
+class SizeReport:
+    size: int
+    latencies: list[float] = field(default_factory=list)
+    statuses: dict[int, int] = field(default_factory=dict)
+    duration: float = 0
+    rss_before: int | None = None
+    rss_after: int | None = None
+    rss_peak: int | None = None
+
+    def percentile(self, q: float) -> float:
+        latencies = sorted(self.latencies)
+        return latencies[min(len(latencies) - 1, int(q * len(latencies)))]
+
+
+def parse_size(raw: str) -> int:
+    raw = raw.strip().lower()
+    if raw[-1] in _SIZE_SUFFIXES:
+        return int(float(raw[:-1]) * _SIZE_SUFFIXES[raw[-1]])
+    return int(raw)
+
+
+def parse_pids(raw: str) -> list[int]:
+    return [int(pid) for pid in raw.replace(',', ' ').split()]
+
+
+def read_memory(pids: list[int] | None) -> tuple[int | None, int | None]:
+    """Суммарный текущий и пиковый RSS процессов в байтах из /proc/<pid>/status."""
+    if not pids:
+        return None, None
+    values = {'VmRSS': 0, 'VmHWM': 0}
+    for pid in pids:
+        for line in Path(f'/proc/{pid}/status').read_text().splitlines():
+            key, _, value = line.partition(':')
+            if key in values:
+                values[key] += int(value.split()[0]) * 1024
+    return values['VmRSS'], values['VmHWM']
+
+
+async def get_auth_header(session: aiohttp.ClientSession, url: str) -> dict[str, str]:
+    email = f'bench-{uuid.uuid4().hex[:8]}@example.com'
+    password = uuid.uuid4().hex
+    async with session.post(f'{url}/user/register', json={'email': email, 'password': password}):
+        pass
+    async with session.post(
+        f'{url}/auth/access_token',
+        data={'username': email, 'password': password},
+    ) as response:
+        response.raise_for_status()
+        token = (await response.json())['access_token']
+    return {'Authorization': f'Bearer {token}'}
+
+
+def make_payload(size: int, unique: bool) -> bytes:
+    """Случайные байты: одинаковое содержимое попало бы в кэш результатов проверки."""
+    if unique:
+        return os.urandom(size)
+    return b'\xff' * size
+
+
+async def run_size(
+    session: aiohttp.ClientSession,
+    options: argparse.Namespace,
+    headers: dict[str, str],
+    size: int,
+) -> SizeReport:
+    report = SizeReport(size=size)
+    report.rss_before, _ = read_memory(options.server_pid)
+    endpoint = f'{options.url}/user/{options.endpoint}'
+    params = {'async': 'true'} if options.async_mode else {}
+
+    async def worker(requests: int):
+        for _ in range(requests):
+            form = aiohttp.FormData()
+            form.add_field(
+                'file',
+                make_payload(size, unique=not options.same_payload),
+                filename='photo.jpg',
+                content_type='image/jpeg',
+            )
+            start_time = time.monotonic()
+            async with session.post(endpoint, data=form, headers=headers, params=params) as resp:
+                await resp.read()
+            report.latencies.append(time.monotonic() - start_time)
+            report.statuses[resp.status] = report.statuses.get(resp.status, 0) + 1
+
+    start_time = time.monotonic()
+    # Запросы делятся между обработчиками поровну, остаток достаётся первым
+    per_worker, extra = divmod(options.requests, options.concurrency)
+    await asyncio.gather(*(
+        worker(per_worker + (index < extra))
+        for index in range(options.concurrency)
+    ))
+    report.duration = time.monotonic() - start_time
+    report.rss_after, report.rss_peak = read_memory(options.server_pid)
+    return report
+
+
+def format_bytes(value: int | None) -> str:
+    if value is None:
+        return '-'
+    if value < _SIZE_SUFFIXES['m']:
+        return f'{value / 1024:.0f}KiB'
+    return f'{value / 1024 / 1024:.1f}MiB'
+
+
+def print_report(report: SizeReport) -> None:
+    print(
+        f'size={format_bytes(report.size)} requests={len(report.latencies)} '
+        f'rps={len(report.latencies) / report.duration:.1f} '
+        f'p50={report.percentile(0.5) * 1000:.0f}ms '
+        f'p90={report.percentile(0.9) * 1000:.0f}ms '
+        f'p99={report.percentile(0.99) * 1000:.0f}ms '
+        f'max={max(report.latencies) * 1000:.0f}ms '
+        f'statuses={report.statuses} '
+        f'rss={format_bytes(report.rss_before)}->{format_bytes(report.rss_after)} '
+        f'peak_rss={format_bytes(report.rss_peak)}',
+    )
+
+
+async def run(options: argparse.Namespace) -> None:
+    timeout = aiohttp.ClientTimeout(total=options.timeout)
+    connector = aiohttp.TCPConnector(limit=options.concurrency)
+    async with aiohttp.ClientSession(timeout=timeout, connector=connector) as session:
+        headers = await get_auth_header(session, options.url)
+        for size in options.sizes:
+            print_report(await run_size(session, options, headers, size))
+
+
+def main():
+    ap = argparse.ArgumentParser(description='Нагрузка на загрузку фотографий')
+    ap.add_argument('--url', default='http://127.0.0.1:8000', help='Адрес сервиса')
+    ap.add_argument('--endpoint', choices=['document', 'face'], default='document')
+    ap.add_argument('--sizes', default='100k,1m,5m', help='Размеры фотографий через запятую')
+    ap.add_argument('--requests', type=int, default=100, help='Запросов на каждый размер')
+    ap.add_argument('--concurrency', type=int, default=10)
+    ap.add_argument('--timeout', type=float, default=30)
+    ap.add_argument('--async-mode', action='store_true', help='Загрузка с ?async=true')
+    ap.add_argument('--same-payload', action='store_true', help='Одинаковое содержимое файлов')
+    ap.add_argument(
+        '--server-pid',
+        type=parse_pids,
+        default=None,
+        help='PID процессов сервиса через запятую для замера памяти',
+    )
+    options = ap.parse_args()
+    options.sizes = [parse_size(size) for size in options.sizes.split(',')]
+    asyncio.run(run(options))
+
+
+if __name__ == '__main__':
+    main()